@@ -0,0 +1,242 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Benchmark of data processing core - synthetic fonts of various sizes, widths and layouts
+Results are written as JSON, run with --compare to see regressions against saved run.
+
+    python benchmarks/benchmark_core.py -o before.json
+    python benchmarks/benchmark_core.py --compare before.json -o after.json
+"""
+
+################
+# IMPORTS
+import io
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from optparse import OptionParser
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.core import DataProcessing
+
+try: timer = time.perf_counter
+except AttributeError: timer = time.time # python 2
+
+################
+# CONSTANTS
+GLYPH_COUNTS = [95, 256, 1024, 4096, 16384, 65536]
+WIDTHS = [1, 5, 8, 16, 32]
+LAYOUTS = ["lines", "single", "comments"]
+QUICK_GLYPH_COUNTS = [95, 1024, 16384]
+QUICK_WIDTHS = [5, 16]
+OPERATIONS = ["importData", "parseTextToGlyphList", "updateCurrentDataset", "insertToRight", "insertToLeft", "eraseFromRight", "eraseFromLeft", "exportDict"]
+DATASET_UPDATES = 1000 # single byte edits timed by updateCurrentDataset, time per edit is reported
+FORMAT_VERSION = 1 # of JSON results
+
+################
+# SYNTHETIC FONTS
+def generateFont(glyphs, width, layout, seed=0):
+    """Returns str - C array of glyphs of width random bytes
+    layout - lines: one glyph per line, single: everything on one line, comments: glyph per line with comments around"""
+    rand = random.Random(seed)
+    values = ["0x%02X" % rand.randrange(256) for i in range(glyphs * width)]
+    rows = [", ".join(values[first:first + width]) for first in range(0, len(values), width)]
+    if layout == "single": body = ", ".join(rows) + "\n"
+    elif layout == "comments":
+        lines = []
+        for index, row in enumerate(rows):
+            if index % 16 == 0: lines.append("    /* glyphs %d - %d, block of characters with longer comment text */\n" % (index, index + 15))
+            lines.append("    %s, // %3d '%s'\n" % (row, index & 0xFF, chr(32 + index % 95))) # no hex in comments - parser would take it as data
+        body = "".join(lines)
+    else: body = "".join(["    %s,\n" % row for row in rows])
+    return "// synthetic font %d x %d, %s\nconst uint8_t font[] PROGMEM = {\n%s};\n" % (glyphs, width, layout, body)
+
+################
+# MEASUREMENTS
+def best(function, repeat):
+    """Returns float - best seconds of repeated call, setup returned by function is not timed"""
+    times = []
+    for i in range(repeat):
+        times.append(function())
+    return min(times)
+
+def timeImport(text, repeat):
+    """Returns float seconds of importData"""
+    def run():
+        processing = DataProcessing(None, 0)
+        started = timer()
+        processing.importData(text)
+        return timer() - started
+    return best(run, repeat)
+
+def timeParse(processing, repeat):
+    """Returns float seconds of parseTextToGlyphList of imported text"""
+    def run():
+        started = timer()
+        processing.parseTextToGlyphList()
+        return timer() - started
+    return best(run, repeat)
+
+def timeDatasetUpdates(processing, repeat, seed=0):
+    """Returns float seconds per single value written by updateCurrentDataset"""
+    table = processing.getGlyphTable()
+    tokenCount = len(table.values)
+    rand = random.Random(seed)
+    tokens = [rand.randrange(tokenCount) for i in range(min(DATASET_UPDATES, tokenCount))]
+    def run():
+        started = timer()
+        for tokenIndex in tokens:
+            processing.updateCurrentDataset(table.starts[tokenIndex], table.ends[tokenIndex], (table.values[tokenIndex] + 1) & 0xFF)
+        return timer() - started
+    return best(run, repeat) / len(tokens)
+
+def timeColumnEdit(processing, name, repeat):
+    """Returns float seconds of column insert / erase of every glyph, each insert is followed by untimed erase and vice versa"""
+    undo = {"insertToRight" : "eraseFromRight", "insertToLeft" : "eraseFromLeft", "eraseFromRight" : "insertToRight", "eraseFromLeft" : "insertToLeft"}[name]
+    def run():
+        if name.startswith("erase") and processing.getFontByteWidth() < 2: getattr(processing, undo)() # width 1 can not be erased
+        started = timer()
+        getattr(processing, name)()
+        seconds = timer() - started
+        getattr(processing, undo)()
+        return seconds
+    return best(run, repeat)
+
+def timeExport(processing, exportFormat, repeat):
+    """Returns float seconds of export of whole font to memory"""
+    def run():
+        stream = io.StringIO()
+        started = timer()
+        processing.exportFont(exportFormat, stream)
+        return timer() - started
+    return best(run, repeat)
+
+def runCase(glyphs, width, layout, repeat):
+    """Returns list of dicts - results of all operations on one synthetic font"""
+    text = generateFont(glyphs, width, layout)
+    processing = DataProcessing(None, 0)
+    processing.importData(text)
+    if processing.getFontByteWidth() != width and layout != "single": # single line has no width to detect
+        sys.stderr.write("warning: detected width %d instead of %d\n" % (processing.getFontByteWidth(), width))
+    processing.setFontByteWidth(width)
+    seconds = {}
+    seconds["importData"] = timeImport(text, repeat)
+    seconds["parseTextToGlyphList"] = timeParse(processing, repeat)
+    processing.setFontByteWidth(width)
+    seconds["updateCurrentDataset"] = timeDatasetUpdates(processing, repeat)
+    for name in ("insertToRight", "insertToLeft", "eraseFromRight", "eraseFromLeft"): seconds[name] = timeColumnEdit(processing, name, repeat)
+    seconds["exportDict"] = timeExport(processing, "dict", repeat)
+    results = []
+    for operation in OPERATIONS:
+        result = {"layout" : layout, "width" : width, "glyphs" : glyphs, "textBytes" : len(text), "operation" : operation, "seconds" : seconds[operation]}
+        if operation == "updateCurrentDataset": result["valuesPerSecond"] = 1.0 / max(seconds[operation], 1e-12)
+        else:
+            result["megabytesPerSecond"] = len(text) / 1048576.0 / max(seconds[operation], 1e-12)
+            result["glyphsPerSecond"] = glyphs / max(seconds[operation], 1e-12)
+        results.append(result)
+    return results
+
+################
+# REPORT
+def scalingCurves(results):
+    """Returns list of dicts - seconds by glyph count of every operation, layout and width with exponent of log-log fit (1.0 linear)"""
+    curves = {}
+    for result in results:
+        curves.setdefault((result["operation"], result["layout"], result["width"]), []).append((result["glyphs"], result["seconds"]))
+    scaling = []
+    for key in sorted(curves):
+        points = sorted(curves[key])
+        scaling.append({"operation" : key[0], "layout" : key[1], "width" : key[2], "points" : points, "exponent" : fitExponent(points)})
+    return scaling
+
+def fitExponent(points):
+    """Returns float slope of least squares line through log glyphs, log seconds, None for less than 2 points"""
+    points = [(math.log(glyphs), math.log(seconds)) for glyphs, seconds in points if seconds > 0]
+    if len(points) < 2: return None
+    meanX = sum([x for x, y in points]) / len(points)
+    meanY = sum([y for x, y in points]) / len(points)
+    variance = sum([(x - meanX) ** 2 for x, y in points])
+    if not variance: return None
+    return sum([(x - meanX) * (y - meanY) for x, y in points]) / variance
+
+def resultKey(result):
+    """Returns tuple identifying measurement across runs"""
+    return (result["operation"], result["layout"], result["width"], result["glyphs"])
+
+def compare(previous, results, threshold):
+    """Returns list of str lines comparing results with previous run, regressions slower by more than threshold are marked"""
+    old = dict([(resultKey(result), result) for result in previous["results"]])
+    lines = []
+    for result in results:
+        before = old.get(resultKey(result))
+        if before is None or not before["seconds"]: continue
+        ratio = result["seconds"] / before["seconds"]
+        mark = " REGRESSION" if ratio > 1.0 + threshold else ""
+        lines.append("%-22s %-8s w%-3d %6d glyphs  %10.6f s -> %10.6f s  x%.2f%s" % (result["operation"], result["layout"], result["width"], result["glyphs"], before["seconds"], result["seconds"], ratio, mark))
+    return lines
+
+def formatResult(result):
+    """Returns one line summary of measurement"""
+    if "valuesPerSecond" in result: rate = "%12.0f values/s" % result["valuesPerSecond"]
+    else: rate = "%8.2f MB/s %10.0f glyphs/s" % (result["megabytesPerSecond"], result["glyphsPerSecond"])
+    return "%-22s %-8s w%-3d %6d glyphs  %10.6f s  %s" % (result["operation"], result["layout"], result["width"], result["glyphs"], result["seconds"], rate)
+
+################
+# COMMAND LINE
+def intList(text):
+    """Returns list of ints from comma separated text"""
+    return [int(item) for item in text.split(",") if item.strip()]
+
+def main(argv=None):
+    """Returns int exit status - 0 ok, 1 regression found by --compare"""
+    parser = OptionParser(usage="%prog [options]")
+    parser.add_option("-o", "--output", dest="output", metavar="FILE", help="write results as JSON to FILE")
+    parser.add_option("-c", "--compare", dest="compare", metavar="FILE", help="compare with results saved to FILE by earlier run")
+    parser.add_option("-t", "--threshold", dest="threshold", type="float", default=0.10, help="slowdown reported as regression by --compare [default: %default]")
+    parser.add_option("-f", "--full", dest="full", action="store_true", default=False, help="all glyph counts and widths, takes minutes")
+    parser.add_option("-g", "--glyphs", dest="glyphs", help="comma separated glyph counts")
+    parser.add_option("-w", "--widths", dest="widths", help="comma separated bytes per glyph")
+    parser.add_option("-l", "--layouts", dest="layouts", default=",".join(LAYOUTS), help="comma separated layouts [default: %default]")
+    parser.add_option("-r", "--repeat", dest="repeat", type="int", default=3, help="best of N runs [default: %default]")
+    parser.add_option("-q", "--quiet", dest="quiet", action="store_true", default=False, help="no progress on stderr")
+    options, args = parser.parse_args(argv)
+    glyphCounts = intList(options.glyphs) if options.glyphs else (GLYPH_COUNTS if options.full else QUICK_GLYPH_COUNTS)
+    widths = intList(options.widths) if options.widths else (WIDTHS if options.full else QUICK_WIDTHS)
+    layouts = [layout for layout in options.layouts.split(",") if layout]
+    for layout in layouts:
+        if layout not in LAYOUTS: parser.error("unknown layout: %s" % layout)
+    if options.repeat < 1: parser.error("--repeat requires positive number")
+
+    started = timer()
+    results = []
+    for layout in layouts:
+        for width in widths:
+            for glyphs in glyphCounts:
+                for result in runCase(glyphs, width, layout, options.repeat):
+                    results.append(result)
+                    if not options.quiet: sys.stderr.write(formatResult(result) + "\n")
+    report = {"version" : FORMAT_VERSION, "created" : time.strftime("%Y-%m-%d %H:%M:%S"), "python" : platform.python_version(), "platform" : platform.platform(), "repeat" : options.repeat, "seconds" : timer() - started, "results" : results, "scaling" : scalingCurves(results)}
+    if not options.quiet:
+        for curve in report["scaling"]:
+            if curve["exponent"] is not None: sys.stderr.write("scaling %-22s %-8s w%-3d exponent %.2f\n" % (curve["operation"], curve["layout"], curve["width"], curve["exponent"]))
+    if options.output:
+        stream = open(options.output, "w")
+        try: json.dump(report, stream, indent=1, sort_keys=True)
+        finally: stream.close()
+
+    status = 0
+    if options.compare:
+        stream = open(options.compare, "r")
+        try: previous = json.load(stream)
+        finally: stream.close()
+        lines = compare(previous, results, options.threshold)
+        for line in lines: sys.stdout.write(line + "\n")
+        if [line for line in lines if line.endswith("REGRESSION")]: status = 1
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
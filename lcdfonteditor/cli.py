@@ -0,0 +1,398 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+
+"""Command line converter - reuses data processing of editor, does not import wx."""
+
+################
+# IMPORTS
+import fnmatch
+import io
+import multiprocessing
+import os
+import re
+import sys
+import time
+from optparse import OptionParser, OptionValueError
+
+from .ui.dataprocessing.core import DataProcessing
+from .ui.dataprocessing.transforms import OPERATIONS as TRANSFORMS
+from .ui.dataprocessing.tracing import TRACER
+from .ui.dataprocessing.exporters import FORMATS as EXPORT_FORMATS, BINARY_FORMATS, EXTENSIONS
+
+try: textType = unicode # python 2 - io streams take unicode only
+except NameError: textType = str
+
+################
+# CONSTANTS
+USAGE = "%prog [options] [FILE|DIR...]\n\nReformat, resize and validate hard-coded fonts. Reads stdin when no FILE or - is given, DIR is searched for files matching --pattern."
+LINE_INDENT = "    " # indent of glyph lines written by --reformat
+
+################################################################
+class ConsoleLog():
+    """Stands for main window of editor - debug info of data processing goes to stderr"""
+    def __init__(self, enabled):
+        self.enabled = enabled
+
+    def debugInfo(self, *text):
+        if self.enabled: sys.stderr.write(" ".join([str(item) for item in text]) + "\n")
+################################################################
+
+################
+# OPERATIONS
+def insertRight(processing, count):
+    """Returns True if done"""
+    return processing.insertColumns(processing.getGlyphColumns(), count)
+
+def insertLeft(processing, count):
+    """Returns True if done"""
+    return processing.insertColumns(0, count)
+
+def eraseRight(processing, count):
+    """Returns True if done"""
+    return processing.eraseColumns(processing.getGlyphColumns() - count, count)
+
+def eraseLeft(processing, count):
+    """Returns True if done"""
+    return processing.eraseColumns(0, count)
+
+def setWidth(processing, width):
+    """Returns True if done - regroups glyphs, text is left as is"""
+    if width < 1: return False
+    processing.setFontByteWidth(width)
+    return True
+
+def transform(processing, operation):
+    """Returns True - transform of whole font, see transforms"""
+    processing.transformGlyphs(operation)
+    return True
+
+def convert(processing, layout):
+    """Returns True if converted - data rewritten one glyph per line in vertical or horizontal layout, see rowmajor"""
+    return processing.convertLayout(layout == "horizontal")
+
+def deduplicate(processing, argument):
+    """Returns True if repeated glyphs were dropped - remap table is kept by processing, see writeRemap"""
+    return processing.deduplicateGlyphs() is not None
+
+OPERATIONS = {"insert-right" : insertRight, "insert-left" : insertLeft, "erase-right" : eraseRight, "erase-left" : eraseLeft, "width" : setWidth, "transform" : transform, "convert" : convert, "dedup" : deduplicate} # option name -> function(processing, argument)
+
+def addOperation(option, optionString, value, parser):
+    """Optparse callback - keeps operations in order given on command line"""
+    if value < 1: raise OptionValueError("%s requires positive number" % optionString)
+    parser.values.operations.append((option.dest, value))
+
+def addTransform(option, optionString, value, parser):
+    """Optparse callback - transform goes to operations in order given on command line"""
+    parser.values.operations.append(("transform", value))
+
+def addDeduplicate(option, optionString, value, parser):
+    """Optparse callback - deduplication goes to operations in order given on command line"""
+    parser.values.operations.append(("dedup", ""))
+
+def addConvert(option, optionString, value, parser):
+    """Optparse callback - conversion goes to operations in order given on command line"""
+    parser.values.operations.append(("convert", value))
+
+################
+# VALIDATION
+def validate(processing):
+    """Returns list of str - problems found in parsed data"""
+    problems = []
+    glyphCount = processing.getGlyphCount()
+    if not glyphCount:
+        problems.append("no hex data found")
+        return problems
+    byteCount = processing.getGlyphTable().getByteCount()
+    width = processing.getFontByteWidth()
+    if byteCount % width: problems.append("last glyph incomplete, %d of %d bytes" % (byteCount % width, width))
+    detection = processing.getWidthDetection()
+    if detection["alternatives"] and detection["alternatives"][0]["lines"] == detection["histogram"].get(detection["width"]):
+        problems.append("byte width ambiguous, %d or %d" % (detection["width"], detection["alternatives"][0]["width"]))
+    return problems
+
+def report(processing):
+    """Returns dict describing parsed font"""
+    detection = processing.getWidthDetection()
+    return {"glyphs" : processing.getGlyphCount(), "bytes" : processing.getGlyphTable().getByteCount(), "width" : processing.getFontByteWidth(), "confidence" : detection["confidence"]}
+
+def reportDuplicates(processing, distance):
+    """Returns dict - groups of identical glyphs, glyphs deduplication drops and pairs differing by up to distance pixels"""
+    index = processing.getGlyphIndex()
+    return {"groups" : index.getDuplicateGroups(), "redundant" : index.getRedundantCount(), "near" : index.findNearGroups(distance) if distance > 0 else [], "distance" : distance}
+
+################
+# OUTPUT
+def glyphLines(processing):
+    """Yields lines of reformatted data - one glyph per line, upper case hex values"""
+    values = processing.getFontValues()
+    width = processing.getFontByteWidth()
+    last = len(values) - 1
+    for first in range(0, len(values), width):
+        items = ", ".join(["0x%02X" % value for value in values[first:first + width]])
+        yield LINE_INDENT + items + ("," if first + width <= last else "") + "\n"
+
+def writeResult(processing, stream, reformat):
+    """Write complete text to stream part by part - parsed text is never joined with start and end text"""
+    stream.write(textType(processing.getStartText()))
+    if reformat:
+        stream.write(textType("\n"))
+        for line in glyphLines(processing): stream.write(textType(line))
+    else:
+        for chunk in processing.textBuffer.chunks(): stream.write(textType(chunk))
+    stream.write(textType(processing.getEndText()))
+
+def writeRemap(processing, path, output, options):
+    """Write remap table of last deduplication as C array - glyph index before -> index in deduplicated font"""
+    remap = processing.glyphRemap
+    if remap is None: remap = list(range(processing.getGlyphCount())) # nothing dropped
+    valueType = "uint8_t" if not remap or max(remap) < 256 else "uint16_t"
+    stream = io.open(output, "w", encoding=options.encoding, newline="")
+    try:
+        stream.write(textType("const %s %s_remap[%d] = { // glyph index -> index in deduplicated font\n" % (valueType, exportName(path, options), len(remap))))
+        lines = [", ".join(["%d" % value for value in remap[first:first + 16]]) for first in range(0, len(remap), 16)]
+        stream.write(textType(",\n".join([LINE_INDENT + line for line in lines]) + "\n};\n"))
+    finally: stream.close()
+
+def exportName(path, options):
+    """Returns str C identifier of exported font - --name or base name of input"""
+    if options.name: return options.name
+    if path == "-": return "font"
+    name = re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+    return "_" + name if not name or name[0].isdigit() else name
+
+def writeExport(processing, path, output, options):
+    """Write font in --export format to output or stdout straight from font model, returns int flash bytes"""
+    if options.export in BINARY_FORMATS: mode, settings = "wb", {}
+    else: mode, settings = "w", {"encoding" : options.encoding, "newline" : ""}
+    if output is None: stream = io.open(sys.stdout.fileno(), mode, closefd=False, **settings)
+    else: stream = io.open(output, mode, **settings)
+    try: return processing.exportFont(options.export, stream, exportName(path, options), options.firstChar, options.baseline)
+    finally: stream.close()
+
+def outputPath(inputPath, name, options):
+    """Returns str path of output file, None for stdout - name is path relative to output directory"""
+    if options.inPlace and inputPath != "-": return inputPath
+    if options.outputDir:
+        path = os.path.join(options.outputDir, name)
+        directory = os.path.dirname(path)
+        if not os.path.isdir(directory):
+            try: os.makedirs(directory) # subtree of searched directory
+            except OSError:
+                if not os.path.isdir(directory): raise # other worker may have created it meanwhile
+        return path
+    return options.output # None - stdout
+
+################
+# FILE PROCESSING
+def readText(path, encoding):
+    """Returns text of file or stdin, line endings kept"""
+    if path == "-": stream = io.open(sys.stdin.fileno(), "r", encoding=encoding, newline="", closefd=False)
+    else: stream = io.open(path, "r", encoding=encoding, newline="")
+    try: return stream.read()
+    finally: stream.close()
+
+def processFile(path, operations, options, name=None):
+    """Parse file, apply operations and write it, returns dict with results - never raises on bad input
+    name - path of output relative to output directory, base name of input by default"""
+    if name is None: name = os.path.basename(path) if path != "-" else "stdin.txt"
+    if options.export: name = os.path.splitext(name)[0] + EXTENSIONS[options.export]
+    result = {"input" : path, "output" : None, "problems" : [], "error" : None, "seconds" : 0.0}
+    started = time.time()
+    try:
+        processing = DataProcessing(ConsoleLog(options.verbose), 0)
+        processing.setSelectedArray(options.array)
+        processing.setFontPages(options.height // 8)
+        processing.setFontRowBytes(options.rowBytes)
+        processing.importData(readText(path, options.encoding))
+        for operation, argument in operations:
+            if not OPERATIONS[operation](processing, argument): result["problems"].append("%s %s not applied" % (operation, argument))
+        result.update(report(processing))
+        result["problems"].extend(validate(processing))
+        if options.duplicates is not None: result["duplicates"] = reportDuplicates(processing, options.duplicates)
+        if options.remap: writeRemap(processing, path, options.remap, options)
+        if options.sizes: result["sizes"] = processing.getExportSizes(options.firstChar, options.baseline)
+        if options.export and not options.check:
+            result["output"] = outputPath(path, name, options)
+            try: writeExport(processing, path, result["output"], options)
+            except ValueError as error: result["error"] = "export %s: %s" % (options.export, error) # font does not fit format
+        elif not options.check:
+            result["output"] = outputPath(path, name, options)
+            if result["output"] is None:
+                stream = io.open(sys.stdout.fileno(), "w", encoding=options.encoding, newline="", closefd=False)
+            else:
+                stream = io.open(result["output"], "w", encoding=options.encoding, newline="")
+            try: writeResult(processing, stream, options.reformat)
+            finally: stream.close()
+    except (IOError, OSError, UnicodeError) as error:
+        result["error"] = str(error)
+    result["seconds"] = time.time() - started
+    return result
+
+def processTask(task):
+    """Pool worker - task is tuple (path, name, operations, options), returns result dict even on unexpected failure"""
+    path, name, operations, options = task
+    try: return processFile(path, operations, options, name)
+    except Exception as error:
+        return {"input" : path, "output" : None, "problems" : [], "error" : "internal error: %s" % error, "seconds" : 0.0}
+
+################
+# BATCH
+def collectInputs(paths, pattern):
+    """Returns list of tuples (path, name) - directories are walked in sorted order, name is path relative to searched directory"""
+    inputs = []
+    for path in paths:
+        if path != "-" and os.path.isdir(path):
+            for root, directories, files in os.walk(path):
+                directories.sort() # deterministic walk
+                for fileName in sorted(fnmatch.filter(files, pattern)):
+                    fullPath = os.path.join(root, fileName)
+                    inputs.append((fullPath, os.path.relpath(fullPath, path)))
+        else:
+            inputs.append((path, os.path.basename(path) if path != "-" else "stdin.txt"))
+    return inputs
+
+def processInputs(inputs, operations, options):
+    """Yields result dicts in order of inputs, spread over pool of processes when options.jobs is not 1"""
+    tasks = [(path, name, operations, options) for path, name in inputs]
+    jobs = options.jobs or multiprocessing.cpu_count()
+    jobs = min(jobs, len(tasks))
+    if jobs <= 1:
+        for task in tasks: yield processTask(task)
+        return
+    pool = multiprocessing.Pool(jobs)
+    try:
+        for result in pool.imap(processTask, tasks): yield result # imap keeps order of tasks
+    finally:
+        pool.close()
+        pool.join()
+
+def writeSummary(path, results, seconds):
+    """Write tab separated per file summary - status, seconds, glyphs, width, input, message"""
+    stream = io.open(path, "w", encoding="utf-8")
+    try:
+        stream.write(textType("status\tseconds\tglyphs\twidth\tinput\tmessage\n"))
+        for result in results:
+            if result["error"]: status, message = "error", result["error"]
+            elif result["problems"]: status, message = "problems", "; ".join(result["problems"])
+            else: status, message = "ok", ""
+            stream.write(textType("%s\t%.4f\t%s\t%s\t%s\t%s\n" % (status, result["seconds"], result.get("glyphs", ""), result.get("width", ""), result["input"], message)))
+        stream.write(textType("# %d files, wall %.3f s, sum of files %.3f s\n" % (len(results), seconds, sum([result["seconds"] for result in results]))))
+    finally: stream.close()
+
+def formatResult(result):
+    """Returns one line summary of processed file"""
+    if result["error"]: return "%s: error: %s" % (result["input"], result["error"])
+    text = "%s: %d glyphs, %d bytes per glyph" % (result["input"], result["glyphs"], result["width"])
+    if "duplicates" in result:
+        duplicates = result["duplicates"]
+        text += ", %d duplicate glyphs in %d groups" % (duplicates["redundant"], len(duplicates["groups"]))
+        if duplicates["distance"]: text += ", %d near pairs within %d pixels" % (len(duplicates["near"]), duplicates["distance"])
+    if "sizes" in result: text += ", flash " + ", ".join(["%s %s" % (exportFormat, result["sizes"][exportFormat] if result["sizes"][exportFormat] is not None else "n/a") for exportFormat in EXPORT_FORMATS])
+    if result["problems"]: text += " - " + "; ".join(result["problems"])
+    return text
+
+################
+# COMMAND LINE
+def buildParser():
+    """Returns OptionParser"""
+    parser = OptionParser(usage=USAGE)
+    parser.set_defaults(operations=[])
+    parser.add_option("-o", "--output", dest="output", metavar="FILE", help="write result to FILE instead of stdout, single input only")
+    parser.add_option("-d", "--output-dir", dest="outputDir", metavar="DIR", help="write results to DIR under input file names")
+    parser.add_option("-i", "--in-place", dest="inPlace", action="store_true", default=False, help="overwrite input files")
+    parser.add_option("-c", "--check", dest="check", action="store_true", default=False, help="validate only, nothing is written, exit status 1 on problems")
+    parser.add_option("-r", "--reformat", dest="reformat", action="store_true", default=False, help="rewrite data one glyph per line, upper case hex")
+    parser.add_option("-w", "--width", dest="width", type="int", action="callback", callback=addOperation, metavar="N", help="use N bytes per glyph instead of detected width")
+    parser.add_option("--insert-right", dest="insert-right", type="int", action="callback", callback=addOperation, metavar="N", help="insert N empty columns to right of every glyph")
+    parser.add_option("--insert-left", dest="insert-left", type="int", action="callback", callback=addOperation, metavar="N", help="insert N empty columns to left of every glyph")
+    parser.add_option("--erase-right", dest="erase-right", type="int", action="callback", callback=addOperation, metavar="N", help="erase N rightmost columns of every glyph")
+    parser.add_option("--erase-left", dest="erase-left", type="int", action="callback", callback=addOperation, metavar="N", help="erase N leftmost columns of every glyph")
+    parser.add_option("-t", "--transform", type="choice", choices=list(TRANSFORMS), action="callback", callback=addTransform, metavar="NAME", help="transform every glyph: %s" % ", ".join(TRANSFORMS))
+    parser.add_option("-H", "--height", dest="height", type="int", default=8, metavar="N", help="font height N pixels, multiple of 8 - glyph columns of N/8 bytes [default: %default]")
+    parser.add_option("-R", "--row-bytes", dest="rowBytes", type="int", default=0, metavar="N", help="data is horizontal, N bytes per pixel row - height is detected from width, 0 - vertical data [default: %default]")
+    parser.add_option("--convert", type="choice", choices=["vertical", "horizontal"], action="callback", callback=addConvert, metavar="LAYOUT", help="rewrite data in LAYOUT: vertical, horizontal")
+    parser.add_option("-D", "--dedup", action="callback", callback=addDeduplicate, help="drop repeated glyphs, see --remap")
+    parser.add_option("--remap", dest="remap", metavar="FILE", help="write C table glyph index -> index in deduplicated font to FILE, single input only")
+    parser.add_option("--duplicates", dest="duplicates", type="int", metavar="N", help="report identical glyphs and pairs differing by up to N pixels")
+    parser.add_option("-x", "--export", type="choice", choices=list(EXPORT_FORMATS), metavar="FORMAT", help="write font as %s instead of text - bin raw bytes, gfx Adafruit GFX header, u8g2 font array, dict column dictionary with C decoder" % ", ".join(EXPORT_FORMATS))
+    parser.add_option("--name", dest="name", metavar="NAME", help="C name of exported font [default: input file name]")
+    parser.add_option("--first-char", dest="firstChar", type="int", default=0, metavar="N", help="encoding of first glyph in exported font [default: %default]")
+    parser.add_option("--baseline", dest="baseline", type="int", metavar="N", help="pixel row under glyphs sitting on the line for exported font [default: glyph height]")
+    parser.add_option("-S", "--sizes", dest="sizes", action="store_true", default=False, help="report flash bytes of every export format")
+    parser.add_option("-a", "--array", dest="array", type="int", default=0, metavar="N", help="edit N-th array holding hex values when file has more of them [default: %default]")
+    parser.add_option("-j", "--jobs", dest="jobs", type="int", default=1, metavar="N", help="process files in N processes, 0 - one per cpu [default: %default]")
+    parser.add_option("-p", "--pattern", dest="pattern", default="*.h", help="files searched in DIR [default: %default]")
+    parser.add_option("-s", "--summary", dest="summary", metavar="FILE", help="write per file timing and error summary to FILE")
+    parser.add_option("-e", "--encoding", dest="encoding", default="utf-8", help="encoding of input and output [default: %default]")
+    parser.add_option("-q", "--quiet", dest="quiet", action="store_true", default=False, help="no summary on stderr")
+    parser.add_option("-T", "--trace", dest="trace", metavar="FILE", help="write latency histogram of parse and edit spans to FILE as JSON")
+    parser.add_option("-v", "--verbose", dest="verbose", action="store_true", default=False, help="debug info of data processing on stderr")
+    return parser
+
+def main(argv=None):
+    """Returns int exit status - 0 ok, 1 problems found, 2 errors"""
+    parser = buildParser()
+    options, paths = parser.parse_args(argv)
+    if not paths: paths = ["-"]
+    inputs = collectInputs(paths, options.pattern)
+    if options.output and len(inputs) > 1: parser.error("--output takes single input, use --output-dir")
+    if options.outputDir and not os.path.isdir(options.outputDir): parser.error("no such directory: %s" % options.outputDir)
+    if options.height < 8 or options.height % 8: parser.error("--height requires positive multiple of 8")
+    if options.export and options.inPlace: parser.error("--export can not overwrite input, use --output or --output-dir")
+    if options.remap and len(inputs) > 1: parser.error("--remap takes single input")
+    if options.duplicates is not None and options.duplicates < 0: parser.error("--duplicates requires zero or positive number")
+    if options.firstChar < 0: parser.error("--first-char requires zero or positive number")
+    if options.rowBytes < 0: parser.error("--row-bytes requires zero or positive number")
+    if options.array < 0: parser.error("--array requires zero or positive number")
+    if options.jobs < 0: parser.error("--jobs requires zero or positive number")
+    if options.jobs != 1 and len(inputs) > 1 and not (options.check or options.inPlace or options.outputDir):
+        parser.error("parallel processing writes files only, use --output-dir, --in-place or --check")
+    if options.trace and options.jobs != 1: parser.error("--trace requires --jobs 1, spans of worker processes are not collected")
+    if options.jobs != 1 and "-" in paths: parser.error("stdin can not be processed in parallel")
+
+    if options.trace: TRACER.enable()
+    status = 0
+    results = []
+    started = time.time()
+    for result in processInputs(inputs, options.operations, options):
+        results.append(result)
+        if not options.quiet: sys.stderr.write(formatResult(result) + "\n")
+        if result["error"]: status = 2
+        elif result["problems"] and options.check and status == 0: status = 1
+    seconds = time.time() - started
+    if options.summary: writeSummary(options.summary, results, seconds)
+    if options.trace: TRACER.writeReport(options.trace)
+    if not options.quiet and len(results) > 1:
+        errors = len([result for result in results if result["error"]])
+        sys.stderr.write("%d files, %d errors, %.3f s\n" % (len(results), errors, seconds))
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
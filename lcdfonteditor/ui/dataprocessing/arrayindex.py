@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+from .core import DataProcessing, findArrays
+
+################################################################
+class ArrayIndex():
+    """Index of all arrays in source holding more fonts and bitmaps, array gets parsed when selected and parse is kept for next selection"""
+    def __init__(self, mainwindow=None):
+        self.mainwindow = mainwindow # passed to DataProcessing instances, None without ui
+        self.text = ""
+        self.arrays = []
+        self.parsed = {} # (name, length, hash of contents) -> DataProcessing
+        self.fontPages = 1 # bytes per glyph column of new parses
+        self.fontRowBytes = 0 # bytes per glyph row of new parses, 0 - vertical data
+
+    ################
+    # SCAN
+    def scan(self, text, current=None):
+        """Index arrays of text, contents are not tokenized - see findArrays
+        current - DataProcessing edited since last scan, its parse is kept for its new contents"""
+        if current is not None: self.keep(current)
+        self.text = text
+        self.arrays = findArrays(text)
+        # drop parses of arrays no longer present
+        keys = set([self.arrayKey(array) for array in self.arrays])
+        for key in list(self.parsed):
+            if key not in keys: del self.parsed[key]
+        return self.arrays
+
+    def keep(self, processing):
+        """Store parse under key of its current contents"""
+        contents = processing.parsedText
+        for key in [key for key in self.parsed if self.parsed[key] is processing]: del self.parsed[key] # key of contents before edits
+        self.parsed[(self.arrayName(processing), len(contents), hash(contents))] = processing
+
+    def setFontPages(self, pages):
+        """Set bytes per glyph column, parses kept for other height are dropped"""
+        if pages != self.fontPages: self.parsed = {}
+        self.fontPages = pages
+
+    def setFontRowBytes(self, rowBytes):
+        """Set bytes per glyph row of horizontal data, 0 - vertical, parses kept for other layout are dropped"""
+        if rowBytes != self.fontRowBytes: self.parsed = {}
+        self.fontRowBytes = rowBytes
+
+    ################
+    # ACCESS
+    def getArrays(self):
+        """Returns list of dicts - name, declaration, start, end, bytes, width"""
+        return self.arrays
+
+    def getCount(self):
+        """Returns int count of arrays found"""
+        return len(self.arrays)
+
+    def getProcessing(self, index):
+        """Returns DataProcessing of array - parsed on first selection, cached one with surrounding text updated later"""
+        array = self.arrays[index]
+        key = self.arrayKey(array)
+        processing = self.parsed.get(key)
+        if processing is not None and processing.parsedText == self.text[array["start"]:array["end"]]:
+            processing.rebase(self.text, array["start"], array["end"]) # other arrays may have changed meanwhile
+            processing.setSelectedArray(index)
+            return processing
+        processing = DataProcessing(self.mainwindow, 0)
+        processing.setSelectedArray(index) # full reimports after edits stay in this array
+        processing.setFontPages(self.fontPages)
+        processing.setFontRowBytes(self.fontRowBytes)
+        processing.importRange(self.text, array["start"], array["end"])
+        processing.arrays = self.arrays
+        self.parsed[key] = processing
+        return processing
+
+    def getCacheSize(self):
+        """Returns int count of parsed arrays kept"""
+        return len(self.parsed)
+
+    ################
+    # HELPERS
+    def arrayKey(self, array):
+        """Returns tuple identifying contents of array"""
+        contents = self.text[array["start"]:array["end"]]
+        return (array["name"], len(contents), hash(contents))
+
+    def arrayName(self, processing):
+        """Returns str name of array parsed by processing"""
+        arrays = processing.getArrays()
+        index = processing.getSelectedArray()
+        if index < len(arrays): return arrays[index]["name"]
+        return "array %d" % index
+################################################################
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+from array import array
+
+from .glyphtable import GlyphTable, STATE_MODIFIED
+
+################################################################
+# COLUMN ENGINE - works on token table, new text is emitted in one join and offsets are computed while emitting
+
+def copyTokens(table, newTable, first, end, delta):
+    """Append tokens first up to end of table to newTable, offsets shifted by delta"""
+    if first >= end: return
+    if delta:
+        newTable.starts.extend(array('I', [offset + delta for offset in table.starts[first:end]]))
+        newTable.ends.extend(array('I', [offset + delta for offset in table.ends[first:end]]))
+    else:
+        newTable.starts.extend(table.starts[first:end])
+        newTable.ends.extend(table.ends[first:end])
+    newTable.values += table.values[first:end]
+    newTable.states += table.states[first:end]
+
+def insertColumns(text, table, position, count=1, value=0):
+    """Insert count columns of value before column position of every glyph having that column, position equal to glyph length appends
+    Returns tuple (new text, new GlyphTable) with byte width raised by count"""
+    bytewidth = table.bytewidth
+    if position < 0 or position > bytewidth or count < 1: raise ValueError("can not insert %d columns at %d of glyph %d bytes wide" % (count, position, bytewidth))
+    starts, ends = table.starts, table.ends
+    tokenText = "0x%02X" % (value)
+    step = len(tokenText) + 2 # value and ", "
+    insertBefore = (tokenText + ", ") * count # goes before existing value
+    insertAfter = (", " + tokenText) * count # goes after last value of glyph
+
+    newTable = GlyphTable(bytewidth + count)
+    pieces = []
+    cursor = 0 # position in text up to which pieces were emitted
+    delta = 0 # offset change of text after cursor
+    tokenCount = len(table.values)
+    for glyphStart in range(0, tokenCount, bytewidth):
+        glyphEnd = min(glyphStart + bytewidth, tokenCount)
+        splitIndex = glyphStart + position
+        if splitIndex > glyphEnd:
+            copyTokens(table, newTable, glyphStart, glyphEnd, delta) # incomplete last glyph ends before position - stays as it is
+            continue
+        if splitIndex < glyphEnd:
+            anchor = starts[splitIndex] # new values before existing one
+            insertion = insertBefore
+            newOffset = anchor + delta
+        else:
+            anchor = ends[glyphEnd - 1] # append after last value of glyph
+            insertion = insertAfter
+            newOffset = anchor + delta + 2
+        pieces.append(text[cursor:anchor])
+        pieces.append(insertion)
+        cursor = anchor
+
+        copyTokens(table, newTable, glyphStart, splitIndex, delta)
+        for inserted in range(count):
+            newTable.starts.append(newOffset)
+            newTable.ends.append(newOffset + len(tokenText))
+            newOffset += step
+        newTable.values += bytearray([value]) * count
+        newTable.states += bytearray([STATE_MODIFIED]) * count
+        delta += len(insertion)
+        copyTokens(table, newTable, splitIndex, glyphEnd, delta)
+    pieces.append(text[cursor:])
+    return ("".join(pieces), newTable)
+
+def eraseColumns(text, table, position, count=1):
+    """Erase count columns from column position of every glyph having that column, separator following erased values goes too
+    Returns tuple (new text, new GlyphTable) with byte width lowered by count"""
+    bytewidth = table.bytewidth
+    if position < 0 or count < 1 or position + count > bytewidth or count >= bytewidth: raise ValueError("can not erase %d columns at %d of glyph %d bytes wide" % (count, position, bytewidth))
+    starts, ends = table.starts, table.ends
+
+    newTable = GlyphTable(bytewidth - count)
+    pieces = []
+    cursor = 0
+    delta = 0
+    tokenCount = len(table.values)
+    for glyphStart in range(0, tokenCount, bytewidth):
+        glyphEnd = min(glyphStart + bytewidth, tokenCount)
+        eraseFirst = glyphStart + position
+        if eraseFirst >= glyphEnd:
+            copyTokens(table, newTable, glyphStart, glyphEnd, delta) # nothing to erase in this glyph
+            continue
+        eraseEnd = min(eraseFirst + count, glyphEnd) # shorter only in incomplete last glyph
+        # erased run of values with its separator - the one after it, or the one before it when no comma follows
+        removeStart, removeEnd = starts[eraseFirst], ends[eraseEnd - 1]
+        if text[removeEnd:removeEnd + 1] == ",":
+            removeEnd += 1
+            if text[removeEnd:removeEnd + 1] == " ": removeEnd += 1
+        elif removeStart - 2 >= cursor and text[removeStart - 2:removeStart] == ", ": removeStart -= 2
+        elif removeStart - 1 >= cursor and text[removeStart - 1:removeStart] == ",": removeStart -= 1
+
+        copyTokens(table, newTable, glyphStart, eraseFirst, delta)
+        pieces.append(text[cursor:removeStart])
+        cursor = removeEnd
+        delta -= removeEnd - removeStart
+        copyTokens(table, newTable, eraseEnd, glyphEnd, delta)
+    pieces.append(text[cursor:])
+    return ("".join(pieces), newTable)
+
+################
+# VALUE LEVEL - glyph keeps its width, used when only some glyphs get changed
+def insertColumnValues(data, position, count=1, value=0):
+    """Returns list of values with count values inserted at position, cut to original length"""
+    data = list(data)
+    return (data[:position] + [value] * count + data[position:])[:len(data)]
+
+def eraseColumnValues(data, position, count=1, value=0):
+    """Returns list of values with count values erased from position, padded with value to original length"""
+    data = list(data)
+    return (data[:position] + data[position + count:] + [value] * count)[:len(data)]
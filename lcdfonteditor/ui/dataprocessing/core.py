@@ -30,23 +30,184 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ################
 # IMPORTS
 import re
+from bisect import bisect_left, bisect_right
+
+from .lineindex import LineIndex
+from .glyphtable import GlyphTable, GlyphListView
+from .textbuffer import TextBuffer
+from . import columns
+from .pages import pagedWidth
+from .rowmajor import rowsToColumns, columnsToRows, rowGeometry
+from .journal import UndoJournal
+from .transforms import transformGlyphs, FLIP_VERTICAL, ROTATE_180, ROTATE_CW, SHIFT_UP, SHIFT_LEFT
+from .tracing import traced, Lazy
+from . import exporters
+from .glyphindex import GlyphIndex
+
+################
+# CONSTANTS
+HEXPATTERN = re.compile(r'(0x[a-fA-F0-9]{2})') # single byte token as found in text
+DECLARATION = re.compile(r'([A-Za-z_]\w*)\s*(?:\[[^\[\]{};=]*\]\s*)+[^{};=]*=\s*$') # name[...] ... = right before opening brace
+DECLARATION_WINDOW = 256 # chars before opening brace searched for declaration
+WIDTH_SAMPLE = 4096 # chars of array used to guess width by pre-scan
+
+################################################################
+class ParseCancelled(Exception):
+    """Raised when parse was cancelled by cancelCheck, eg. newer text arrived to worker"""
+    pass
+
+################################################################
+def detectByteWidth(text, maxAlternatives=4):
+    """Detects bytes per glyph from count of hex values per line, returns dict with width, confidence and alternatives"""
+    # single pass - histogram of hex token counts per line, dict keeps first line where count appeared to break ties
+    histogram = {}
+    firstSeen = {}
+    findall = HEXPATTERN.findall
+    for lineNumber, line in enumerate(text.splitlines()):
+        numOccurences = len(findall(line))
+        if numOccurences:
+            if numOccurences in histogram:
+                histogram[numOccurences] += 1
+            else:
+                histogram[numOccurences] = 1
+                firstSeen[numOccurences] = lineNumber
+    return rankByteWidths(histogram, firstSeen, maxAlternatives)
+
+def rankByteWidths(histogram, firstSeen=None, maxAlternatives=4):
+    """Returns dict with width, confidence and alternatives ranked from histogram of hex values per line"""
+    linesWithData = sum(histogram.values())
+    # most common count wins, tie goes to count found earlier in text - or to smaller count if order is unknown
+    if firstSeen: ranking = sorted(histogram, key=lambda value: (-histogram[value], firstSeen[value]))
+    else: ranking = sorted(histogram, key=lambda value: (-histogram[value], value))
+    candidates = [{"width" : value, "lines" : histogram[value], "share" : float(histogram[value]) / linesWithData} for value in ranking]
+
+    if candidates:
+        return {"width" : candidates[0]["width"], "confidence" : candidates[0]["share"], "alternatives" : candidates[1:1 + maxAlternatives], "lines" : linesWithData, "histogram" : histogram}
+    else: return {"width" : 0, "confidence" : 0.0, "alternatives" : [], "lines" : 0, "histogram" : histogram} # no data found
+
+def formatValues(values, width, indent="    "):
+    """Returns str - values as upper case hex, one glyph of width values per line"""
+    return ",\n".join([indent + ", ".join(["0x%02X" % value for value in values[first:first + width]]) for first in range(0, len(values), width)])
+
+################
+# ARRAY PRE-SCAN
+def findArrays(text, guessWidth=True):
+    """Returns list of dicts describing every top level {...} holding hex values - name, declaration, start, end, bytes, width
+    Contents are not tokenized - braces are found by str.find, bytes counted by str.count and width guessed from first lines only"""
+    arrays = []
+    position = 0
+    while True:
+        opening = text.find("{", position)
+        if opening < 0: break
+        # matching brace, nested braces of multidimensional arrays included
+        depth = 1
+        cursor = opening + 1
+        while depth:
+            nextClose = text.find("}", cursor)
+            if nextClose < 0: break
+            nextOpen = text.find("{", cursor, nextClose)
+            if nextOpen >= 0:
+                depth += 1
+                cursor = nextOpen + 1
+            else:
+                depth -= 1
+                cursor = nextClose + 1
+        if depth: break # unmatched brace - rest of text is not an array
+        closing = cursor - 1
+        position = cursor
+        byteCount = text.count("0x", opening + 1, closing)
+        if not byteCount: continue # function body, struct initializer...
+        match = DECLARATION.search(text, max(0, opening - DECLARATION_WINDOW), opening)
+        array = {"name" : (match.group(1) if match else "array %d" % len(arrays)), "declaration" : (match.start() if match else opening), "start" : opening + 1, "end" : closing, "bytes" : byteCount}
+        if guessWidth:
+            sample = text[opening + 1:min(closing, opening + 1 + WIDTH_SAMPLE)]
+            if closing > opening + 1 + WIDTH_SAMPLE: sample = sample[:sample.rfind("\n") + 1] or sample # whole lines only
+            array["width"] = detectByteWidth(sample)["width"]
+        arrays.append(array)
+    return arrays
+
+################
+# TEXT DIFF HELPERS
+def commonPrefixLength(a, b):
+    """Returns int length of common prefix of two strings, bisection compares slices so the scan runs in C"""
+    low, high = 0, min(len(a), len(b))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]: low = middle
+        else: high = middle - 1
+    return low
+
+def commonSuffixLength(a, b, limit):
+    """Returns int length of common suffix of two strings, not longer than limit"""
+    lengthA, lengthB = len(a), len(b)
+    low, high = 0, min(lengthA, lengthB, limit)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[lengthA - middle:lengthA - low] == b[lengthB - middle:lengthB - low]: low = middle
+        else: high = middle - 1
+    return low
 
 ################################################################
-class DataProcessing():
+class DataProcessing(object):
     def __init__(self, mainwindow, fontBytewidth):
-        self.mainwindow = mainwindow # main window reference
-        self.debug = self.mainwindow.debugInfo # debug info goes to main
+        self.mainwindow = mainwindow # main window reference, None when used without ui - from worker thread or command line
+        if self.mainwindow is not None: self.debug = self.mainwindow.debugInfo # debug info goes to main
+        else: self.debug = self.noDebug
+        self.cancelCheck = None # optional callable returning True when running parse should stop, see ParseCancelled
 
         self.startOffset = 0 # offset where the first data begins - most likely inside curly braces
         self.endOffset = 0 # offset of end of parsed data from end of input string
 
         # DATA
         self.importedText = "" # input from textfield
-        self.parsedText = "" # extracted from self.importedText
-        self.glyphList = [] # list of dicts extracted from self.parsedText, serves as metadata
-
+        self.textBuffer = TextBuffer("") # backs self.parsedText - extracted from self.importedText, spliced by edits
+        self.lineIndex = LineIndex() # newline offsets of self.parsedText, rebuilt once per parse
         self.fontBytewidth = fontBytewidth # DEFAULT, gets changed whenever data is loaded
+        self.fontPages = 1 # bytes per column, font height is 8 pixels per page - see pages
+        self.fontRowBytes = 0 # bytes per pixel row of horizontal data, 0 - vertical data - see rowmajor
+        self.glyphTable = GlyphTable(self.fontBytewidth) # offsets, values and states of bytes extracted from self.parsedText, serves as metadata
+        self.glyphList = GlyphListView(self.glyphTable, self) # list of lists of dicts built on demand from glyphTable - compatibility accessor
+        self.widthDetection = detectByteWidth("") # result of last autodetection, keeps alternatives for ui
         self.selectedGlyphIndex = 0 # index of selected glyph in data or ascii
+        self.selectedArray = 0 # index of array parsed when input holds more of them, see findArrays
+        self.arrays = [] # arrays found in input by last full import
+        self.journal = UndoJournal() # undo / redo deltas of edits done through updaters, cleared by parse
+        self.glyphIndex = GlyphIndex() # groups of identical glyphs, updated by writes of values, rebuilt on demand after parse
+        self.glyphRemap = None # glyph index -> index in font of last deduplicateGlyphs
+
+    ################
+    # PARSED TEXT
+    def getParsedText(self):
+        """Returns str - parsed text, joined from buffer only when edited since last call"""
+        return self.textBuffer.getText()
+
+    def setParsedText(self, text):
+        """Replace parsed text, offsets are left to caller - parse follows"""
+        self.textBuffer = TextBuffer(text)
+
+    parsedText = property(getParsedText, setParsedText)
+
+    def replaceText(self, startpos, endpos, text):
+        """Splice parsed text, keeps offsets of tokens and lines after splice valid even when length changes"""
+        self.textBuffer.splice(startpos, endpos, text)
+        delta = len(text) - (endpos - startpos)
+        if delta:
+            table = self.glyphTable
+            tokenIndex = table.findToken(startpos)
+            if tokenIndex is not None and table.ends[tokenIndex] == endpos:
+                table.ends[tokenIndex] = endpos + delta # replaced token itself
+            table.shiftOffsets(bisect_right(table.starts, startpos), delta)
+            self.lineIndex.shift(startpos, delta, len(self.textBuffer))
+        return delta
+
+    def noDebug(self, *text):
+        """Debug sink used without main window"""
+        pass
+
+    def checkCancelled(self):
+        """Raise ParseCancelled if cancelCheck says so"""
+        if self.cancelCheck is not None and self.cancelCheck():
+            raise ParseCancelled()
 
     ################
     # SETTERS & GETTERS
@@ -64,6 +225,49 @@ class DataProcessing():
         """Returns byte width"""
         return self.fontBytewidth
 
+    def setFontByteWidth(self, bytewidth):
+        """Set byte width manually, eg. to one of alternatives offered by autodetection, and regroup glyphs"""
+        if bytewidth < 1: return
+        self.fontBytewidth = bytewidth
+        self.glyphTable.setByteWidth(bytewidth) # regroup only, offsets and values stay
+        self.journal.clear() # recorded columns belong to previous grouping
+        self.glyphIndex.invalidate()
+        if self.selectedGlyphIndex >= self.glyphTable.getGlyphCount(): self.selectedGlyphIndex = 0
+
+    def setFontPages(self, pages):
+        """Set bytes per column - font height / 8, width is detected again by next import"""
+        self.fontPages = max(1, pages)
+
+    def getFontPages(self):
+        """Returns int bytes per column"""
+        return self.fontPages
+
+    def setFontRowBytes(self, rowBytes):
+        """Set bytes per pixel row of horizontal data, 0 - vertical data, width is detected again by next import"""
+        self.fontRowBytes = max(0, rowBytes)
+
+    def getFontRowBytes(self):
+        """Returns int bytes per pixel row, 0 for vertical data"""
+        return self.fontRowBytes
+
+    def getWidthUnit(self):
+        """Returns int bytes every glyph is made of - rows of horizontal data or columns of vertical data"""
+        return self.fontRowBytes or self.fontPages
+
+    def getFontHeight(self):
+        """Returns int height of glyph in pixels"""
+        if self.fontRowBytes: return self.fontBytewidth // self.fontRowBytes
+        return 8 * self.fontPages
+
+    def getGlyphColumns(self):
+        """Returns int columns per glyph"""
+        if self.fontRowBytes: return self.fontRowBytes * 8
+        return self.fontBytewidth // self.fontPages
+
+    def getWidthDetection(self):
+        """Returns dict with autodetected width, its confidence 0.0 - 1.0 and list of runner-up widths"""
+        return self.widthDetection
+
     def getStartText(self):
         """Returns part of input from beginning of input string up to startOffset, including curly brace if present"""
         return self.importedText[:self.startOffset] #
@@ -74,216 +278,553 @@ class DataProcessing():
 
     def getCompleteString(self):
         """Returns complete string"""
-        self.debug("core", "self.importedText[:self.startOffset]",self.importedText[:self.startOffset])
-        self.debug("core", "self.parsedText", self.parsedText)
-        self.debug("core", "self.importedText[-self.endOffset:]",self.importedText[-self.endOffset:])
+        self.debug("core", "self.importedText[:self.startOffset]", Lazy(lambda: self.importedText[:self.startOffset])) # lazy - slices and join only when printed
+        self.debug("core", "self.parsedText", Lazy(lambda: self.parsedText))
+        self.debug("core", "self.importedText[-self.endOffset:]", Lazy(lambda: self.importedText[-self.endOffset:]))
         return self.importedText[:self.startOffset] + self.parsedText + (self.importedText[-self.endOffset:] if self.endOffset else "") # Conditional Expressions require python 2.5 https://docs.python.org/2.5/whatsnew/pep-308.html
 
+    def getLineIndex(self):
+        """Returns LineIndex of parsed text - line <-> offset lookups"""
+        return self.lineIndex
+
+    def getTextPosition(self, offset):
+        """Returns tuple (column, line) of offset in parsed text translated to complete string, suitable for TextCtrl.XYToPosition"""
+        line, column = self.lineIndex.lineColumnOf(offset)
+        startText = self.getStartText()
+        startLines = startText.count('\n')
+        if line == 0:
+            column = column + len(startText) - (startText.rfind('\n') + 1) # first parsed line continues last line of start text
+        return (column, startLines + line)
+
     def getCompleteGlyphList(self):
         """Returns list of dicts containing parsed data with offsets in string"""
         return self.glyphList
 
+    def getGlyphTable(self):
+        """Returns GlyphTable - offsets, values and states in parallel arrays"""
+        return self.glyphTable
+
+    def getGlyphValues(self, index):
+        """Returns list of ints - bytes of glyph"""
+        return self.glyphTable.glyphValues(index)
+
+    def getGlyphSlice(self, index):
+        """Returns GlyphSlice - writable view of glyph bytes in font model, commit writes with commitValues"""
+        return self.glyphTable.glyphSlice(index)
+
+    def getFontValues(self):
+        """Returns bytearray - bytes of all glyphs in order, the font model itself - no copy"""
+        return self.glyphTable.values
+
     def getGlyphCount(self):
         """Returns count of glyphs on list"""
-        return len(self.glyphList)
+        return self.glyphTable.getGlyphCount()
+
+    def getMemoryReport(self):
+        """Returns dict - memory used by glyph table compared to list of dicts"""
+        return self.glyphTable.memoryReport()
 
     ################
     # PARSERS
+    @traced("core.importData")
     def importData(self, importedText):
-      """Import text to parse"""
-      currentInputText = "" #
+      """Import text to parse - selected array of input, or whole input if no array holds hex values"""
       self.importedText = importedText #
-      inputMatch = re.search(r'(?s)\{(.*?)\}', self.importedText) # search for strings inside curly braces first
-
-      # if found, scan extracted string further for hex values
-      if inputMatch:
-          currentInputText = inputMatch.group(1)
-          # set offsets of extracted string inside input from TextCtrl
-          self.startOffset = inputMatch.start(1)
-          self.endOffset = len(self.importedText) - inputMatch.end(1)
+      self.arrays = findArrays(self.importedText, guessWidth=False) # search for strings inside curly braces first
 
+      # if found, scan extracted string of selected array further for hex values
+      if self.arrays:
+          array = self.arrays[min(self.selectedArray, len(self.arrays) - 1)]
+          self.importRange(importedText, array["start"], array["end"])
       else:
           # text field erased completely or not found any hex values in curly braces
           # try to search hex strings in whole input then
-          currentInputText = self.importedText
-          # set PROPER OFFSETS!
-          self.startOffset = 0
-          self.endOffset = 0
-
-      # check if currentInputText is list - future - listable sets of fonts
-      if isinstance(currentInputText, list):
-        try:
-          self.parsedText = currentInputText[0] # 
-        except IndexError:
-          self.parsedText = currentInputText # 
-      else:
-          self.parsedText =  currentInputText # 
+          self.importRange(importedText, 0, len(importedText))
+
+    def importRange(self, importedText, start, end):
+      """Import text, parse only part from start up to end"""
+      self.importedText = importedText #
+      # set offsets of extracted string inside input from TextCtrl
+      self.startOffset = start
+      self.endOffset = len(importedText) - end
+      self.parsedText = importedText[start:end] #
+      self.journal.clear() # recorded token indexes belong to previous parse
+      self.glyphIndex.invalidate()
 
       self.debug("core", "Parse start offset:", self.startOffset)
       self.debug("core", "Parse end offset:", self.endOffset)
-      self.debug("core", "self.parsedText:", self.parsedText)
+      self.debug("core", "self.parsedText:", Lazy(lambda: self.parsedText))
 
       # detect bytes per glyph
-      splitLines = self.parsedText.splitlines()
-      occurenceList = []
-      for line in splitLines:
-          occurences = re.findall('(0x[a-fA-F0-9]{2})', line)
-          numOccurences = len(occurences)
-          if numOccurences: occurenceList.append(numOccurences)
-      self.debug("core", "occurenceList", occurenceList)
-
-      counter = 0
-      mostCommon = 0 
-      
-      for value in occurenceList: 
-          currentCount = occurenceList.count(value) 
-          if(currentCount> counter): 
-              counter = currentCount 
-              mostCommon = value 
-
-      self.debug("core", "info:", "Detected", mostCommon, "Bytes per glyph.")
+      self.widthDetection = detectByteWidth(self.parsedText)
+      self.debug("core", "widthDetection", self.widthDetection)
+
+      mostCommon = pagedWidth(self.widthDetection, self.getWidthUnit()) # width divisible by pages or bytes per row
+      self.debug("core", "info:", "Detected", mostCommon, "Bytes per glyph.", "Confidence", self.widthDetection["confidence"], "Pages", self.fontPages, "Row bytes", self.fontRowBytes)
       self.fontBytewidth = mostCommon # byte width set to autodetected -> most common count of Bytes per line of extracted string! ! !
+      self.checkCancelled()
 
       # finally do a scan on self.parsedText
       self.parseTextToGlyphList()
 
+    def rebase(self, importedText, start, end):
+      """Replace text around parsed data without parse - text from start up to end must equal parsed text"""
+      self.importedText = importedText
+      self.startOffset = start
+      self.endOffset = len(importedText) - end
+
+    def setSelectedArray(self, index):
+        """Set index of array parsed by next full import"""
+        self.selectedArray = index
+
+    def getSelectedArray(self):
+        """Returns int index of array parsed"""
+        return self.selectedArray
+
+    def getArrays(self):
+        """Returns list of dicts - arrays found in input by last full import, see findArrays"""
+        return self.arrays
+
+    @traced("core.importDataIncremental")
+    def importDataIncremental(self, importedText, allowFull=True):
+        """Import edited text, rescans only lines touched by edit, returns True if done incrementally, False if full import was required
+        With allowFull False the full import is left to caller, returns None and data stays untouched"""
+        oldText = self.getCompleteString() # self.importedText may be outdated by edits done in editor
+        if not self.glyphTable.getByteCount() or not self.fontBytewidth:
+            return self.fullImport(importedText, allowFull) # nothing to update
+
+        # find edited span - text between common prefix and common suffix
+        prefix = commonPrefixLength(oldText, importedText)
+        suffix = commonSuffixLength(oldText, importedText, min(len(oldText), len(importedText)) - prefix)
+        oldEditEnd = len(oldText) - suffix
+        newEditEnd = len(importedText) - suffix
+        delta = len(importedText) - len(oldText)
+        removedText = oldText[prefix:oldEditEnd]
+        insertedText = importedText[prefix:newEditEnd]
+        self.debug("core", "Incremental", "edit span", prefix, oldEditEnd, "> new end", newEditEnd, "delta", delta)
+
+        if ("{" in removedText) or ("}" in removedText) or ("{" in insertedText) or ("}" in insertedText):
+            # braces change the structure - extracted part of input may move
+            return self.fullImport(importedText, allowFull)
+
+        parsedStart = self.startOffset
+        parsedEnd = len(oldText) - self.endOffset
+        if oldEditEnd < parsedStart:
+            # edit in text before data, just move start
+            self.importedText = importedText
+            self.startOffset += delta
+            return True
+        elif prefix > parsedEnd:
+            # edit in text after data
+            self.importedText = importedText
+            self.endOffset += delta
+            return True
+        elif prefix < parsedStart or oldEditEnd > parsedEnd:
+            # edit crosses the border of data
+            return self.fullImport(importedText, allowFull)
+
+        # edit inside parsed text - rescan whole lines touched by edit, tokens never span lines
+        oldParsedText = self.parsedText
+        newParsedText = importedText[parsedStart:len(importedText) - self.endOffset]
+        editStart = prefix - parsedStart
+        editEnd = oldEditEnd - parsedStart
+        firstLine = self.lineIndex.lineOf(editStart)
+        lastLine = self.lineIndex.lineOf(editEnd)
+        regionStart = self.lineIndex.offsetOf(firstLine)
+        oldRegionEnd = oldParsedText.find('\n', editEnd)
+        if oldRegionEnd == -1: oldRegionEnd = len(oldParsedText)
+        newRegionEnd = oldRegionEnd + delta
+
+        # width check - histogram of values per line must keep the same winner
+        histogram = dict(self.widthDetection["histogram"])
+        findall = HEXPATTERN.findall
+        for line in oldParsedText[regionStart:oldRegionEnd].split('\n'):
+            numOccurences = len(findall(line))
+            if numOccurences:
+                if not histogram.get(numOccurences): return self.fullImport(importedText, allowFull) # histogram does not describe text, can not be updated
+                histogram[numOccurences] -= 1
+                if not histogram[numOccurences]: del histogram[numOccurences]
+        for line in newParsedText[regionStart:newRegionEnd].split('\n'):
+            numOccurences = len(findall(line))
+            if numOccurences: histogram[numOccurences] = histogram.get(numOccurences, 0) + 1
+        widthDetection = rankByteWidths(histogram)
+        alternatives = widthDetection["alternatives"]
+        tie = alternatives and alternatives[0]["lines"] == histogram[widthDetection["width"]] # full scan would decide by order in text
+        if pagedWidth(widthDetection, self.getWidthUnit()) != self.fontBytewidth or tie:
+            # detected width changed or became ambiguous - regroup everything
+            return self.fullImport(importedText, allowFull)
+
+        # replace tokens of region and move the rest
+        self.journal.clear() # token indexes after edit may move
+        table = self.glyphTable
+        first = bisect_left(table.starts, regionStart)
+        end = bisect_left(table.starts, oldRegionEnd)
+        count = table.replaceTokens(first, end, newParsedText, HEXPATTERN, regionStart, newRegionEnd, delta)
+        if count != end - first: self.glyphIndex.invalidate() # glyphs after edit moved
+        elif count and self.fontBytewidth: self.glyphIndex.updateGlyphs(range(first // self.fontBytewidth, (end - 1) // self.fontBytewidth + 1))
+        self.lineIndex.update(regionStart, oldRegionEnd, newParsedText[regionStart:newRegionEnd], len(newParsedText))
+        self.importedText = importedText
+        self.parsedText = newParsedText
+        self.widthDetection = widthDetection
+        if self.selectedGlyphIndex >= table.getGlyphCount(): self.selectedGlyphIndex = 0
+        self.debug("core", "Incremental", "lines", firstLine, lastLine, "tokens", first, end, "> glyph count", table.getGlyphCount())
+        return True
+
+    def fullImport(self, importedText, allowFull):
+        """Fallback of incremental import"""
+        if not allowFull: return None
+        self.importData(importedText)
+        return False
+
+    def adoptParse(self, other):
+        """Take over parsed data of another DataProcessing, eg. one filled by worker thread, selection is kept"""
+        self.importedText = other.importedText
+        self.textBuffer = other.textBuffer
+        self.startOffset = other.startOffset
+        self.endOffset = other.endOffset
+        self.arrays = other.arrays
+        self.lineIndex = other.lineIndex
+        self.fontBytewidth = other.fontBytewidth
+        self.fontPages = other.fontPages
+        self.fontRowBytes = other.fontRowBytes
+        self.widthDetection = other.widthDetection
+        self.glyphTable = other.glyphTable
+        self.glyphList = GlyphListView(self.glyphTable, self)
+        self.journal.clear()
+        self.glyphIndex.invalidate()
+        if self.selectedGlyphIndex >= self.glyphTable.getGlyphCount(): self.selectedGlyphIndex = 0
+
+    @traced("core.parseTextToGlyphList")
     def parseTextToGlyphList(self):
         """Parse text"""
-        self.currentDataset = [] # dataset is flat list of values
-        self.glyphList = [] # values sorted in order to be used along with other gathered parameters like their offsets in string
-        #prepare data to be read from the string
-        stringsfound = re.sub('(0x[a-fA-F0-9]{2})', self.foundhex ,self.parsedText) #
-        # done here, put items found into lists representing single glyph so it can be treated as it
-        # if self.fontBytewidth > 0
-        if self.fontBytewidth:
-            self.glyphList = [self.currentDataset[ i : i + self.fontBytewidth] for i in range(0, len(self.currentDataset), self.fontBytewidth)]
-            if self.selectedGlyphIndex >= len(self.glyphList):
-                # fix selection index if its beyond new data
-                self.debug("core", "Warning:", "Fixed selected index!", "self.selectedGlyphIndex", self.selectedGlyphIndex, "len(self.glyphList)", len(self.glyphList))
-                self.selectedGlyphIndex = 0
-        self.debug("\n\n\n\nself.glyphList:", self.glyphList, "\n\n\n\nglyphList size:", len(self.glyphList), "\n\n\n\n")
-
-    def foundhex(self, matchobj):
-        """Adds hex value to current array of dicts - glyph list"""
-        #self.debug("String comin in -->", str(matchobj.group(1)), "start -->", matchobj.start(1), "end -->", matchobj.end(1)) # ULTRA VERBOSE
-        #self.debug("String coming at pos -->", matchobj.span(1)) # ULTRA VERBOSE
-        tempdict = {}
-        tempdict['start'] =  matchobj.start(1)
-        tempdict['end'] =  matchobj.end(1)
-        tempdict['hexdata'] =  matchobj.group(1)
-        tempdict['state'] = "inserted"
-        tempdict['line'] = self.parsedText[:matchobj.end(1)].count('\n')
-        self.currentDataset.append(tempdict) # append data
-
-        return str(matchobj.group(1))
+        self.lineIndex.build(self.parsedText) # single scan for newlines, tokens query it by bisection
+        # scan string for values and their offsets, glyphs are groups of fontBytewidth items in table
+        self.glyphTable.setByteWidth(self.fontBytewidth) # zero width -> no glyphs
+        if not self.glyphTable.scan(self.parsedText, HEXPATTERN, self.cancelCheck): raise ParseCancelled()
+        if self.selectedGlyphIndex >= self.glyphTable.getGlyphCount():
+            # fix selection index if its beyond new data
+            self.debug("core", "Warning:", "Fixed selected index!", "self.selectedGlyphIndex", self.selectedGlyphIndex, "glyph count", self.glyphTable.getGlyphCount())
+            self.selectedGlyphIndex = 0
+        self.debug("core", "glyphTable", self.glyphTable.getByteCount(), "bytes", "glyph count", self.glyphTable.getGlyphCount(), "memory", Lazy(self.glyphTable.memoryReport))
 
     ################
     # DATA UPDATERS
     def updateSelectedGlyph(self, data):
-        """ """ # TODO add missing description
-        pass
-        
+        """Write list of values to selected glyph, returns list of changed text ranges - see updateGlyphs"""
+        return self.updateGlyph(self.selectedGlyphIndex, data)
+
+    def updateGlyph(self, index, data):
+        """Write list of values to glyph, returns list of changed text ranges - see updateGlyphs"""
+        return self.updateGlyphs([(index, data)])
+
+    def updateGlyphs(self, updates):
+        """Write values of glyphs given as list of tuples (glyph index, list of values) in one splice of parsed text
+        Returns list of dicts with start, end - range of complete string replaced by text, tokens - list of (start, end) of changed values in new text"""
+        table = self.glyphTable
+        newValues = {} # token index -> value, only values that differ
+        for index, data in updates:
+            first, end = table.glyphRange(index)
+            for tokenIndex, value in zip(range(first, end), data):
+                value = value & 0xFF
+                if table.values[tokenIndex] != value: newValues[tokenIndex] = value
+        return self.writeValues(newValues)
+
+    def commitValues(self, merge=None):
+        """Write text of values changed directly in font model through glyph slices, returns list of changed text ranges - see updateGlyphs
+        merge - key of undo step, commits with same key up to UndoJournal.seal are undone at once, eg. drag painting"""
+        oldValues = self.glyphTable.pending # values text still holds
+        return self.writeValues(self.glyphTable.takePending(), oldValues, merge)
+
+    @traced("core.writeValues")
+    def writeValues(self, newValues, oldValues=None, merge=None):
+        """Write dict token index -> value to table and parsed text in one splice, returns list of changed text ranges - see updateGlyphs
+        oldValues - dict token index -> value before change for values already written to table, change is recorded to journal"""
+        if not newValues: return []
+        table = self.glyphTable
+        tokens = list(newValues)
+        if oldValues is None: oldValues = {}
+        self.journal.recordValues(tokens, [oldValues.get(tokenIndex, table.values[tokenIndex]) for tokenIndex in tokens], [newValues[tokenIndex] for tokenIndex in tokens], merge)
+        firstToken, lastToken = min(newValues), max(newValues)
+        spanStart, spanEnd = table.starts[firstToken], table.ends[lastToken]
+        spanText = self.textBuffer.getSlice(spanStart, spanEnd) # only text between first and last changed value
+        pieces = []
+        changedTokens = []
+        cursor = 0 # position in spanText
+        delta = 0 # length change so far
+        starts, ends = table.starts, table.ends
+        for tokenIndex in range(firstToken, lastToken + 1):
+            if tokenIndex in newValues:
+                start, end = starts[tokenIndex], ends[tokenIndex]
+                text = "0x%02X" % (newValues[tokenIndex])
+                pieces.append(spanText[cursor:start - spanStart])
+                pieces.append(text)
+                cursor = end - spanStart
+                newStart = start + delta
+                starts[tokenIndex], ends[tokenIndex] = newStart, newStart + len(text)
+                delta += len(text) - (end - start)
+                table.setValue(tokenIndex, newValues[tokenIndex])
+                changedTokens.append((self.startOffset + newStart, self.startOffset + newStart + len(text)))
+            elif delta:
+                starts[tokenIndex] += delta
+                ends[tokenIndex] += delta
+        pieces.append(spanText[cursor:])
+        replacement = "".join(pieces)
+
+        self.textBuffer.splice(spanStart, spanEnd, replacement) # one splice for all values
+        if delta:
+            table.shiftOffsets(lastToken + 1, delta)
+            self.lineIndex.update(spanStart, spanEnd, replacement, len(self.textBuffer))
+        if self.fontBytewidth: self.glyphIndex.updateGlyphs(sorted(set([tokenIndex // self.fontBytewidth for tokenIndex in tokens]))) # values already written
+        self.debug("core", "updateGlyphs", len(newValues), "values changed in span", spanStart, spanEnd)
+        return [{"start" : self.startOffset + spanStart, "end" : self.startOffset + spanEnd, "text" : replacement, "tokens" : changedTokens}]
+
+    def getGlyphOffset(self, index):
+        """Returns int offset of first value of glyph in parsed text"""
+        first, end = self.glyphTable.glyphRange(index)
+        if first < end: return self.glyphTable.starts[first]
+        return 0
+
     def updateCurrentDataset(self, startpos, endpos, data):
         """Updates currently selected glyph in both input and glyphlist"""
-        # update raw string
-        self.parsedText = self.parsedText[:startpos] + "0x%02X" % (data) + self.parsedText[endpos:]
+        # update raw string - splice of buffer, no copy of whole text
+        self.replaceText(startpos, endpos, "0x%02X" % (data))
         # update data in parsed values
-        for glyphData in self.glyphList[self.selectedGlyphIndex]:
-            if glyphData.get('start') == startpos:
-                glyphData.update({'hexdata' : "0x%02X" % (data)})
-                glyphData.update({'state' : "modified"})
+        tokenIndex = self.glyphTable.findToken(startpos)
+        if tokenIndex is not None:
+            self.glyphTable.setValue(tokenIndex, data)
+            if self.fontBytewidth: self.glyphIndex.updateGlyphs([tokenIndex // self.fontBytewidth])
 
     ################
-    # DATA INSERTERS
-    def insertToRight(self):
-        """  """
-        if not self.parsedText or not self.glyphList:
-            # both checks required - parsedText can contain rest of non base 16 data - checking glyphlist empty ensures to avoid this operation
-            self.debug("core", "Warning:", "Insert right: no data to insert to!")
-            return
+    # TRANSFORMS
+    @traced("core.transformGlyphs")
+    def transformGlyphs(self, operation, amount=1, first=None, end=None):
+        """Apply transform to all glyphs or to glyphs first up to end in one pass over font model, text follows in one splice - undone as one step
+        Returns list of changed text ranges - see updateGlyphs, operations are listed in transforms.OPERATIONS"""
+        width = self.fontBytewidth
+        if not width or width % self.getWidthUnit(): return [] # glyph is not made of whole columns or rows
+        indexes = self.glyphIndexRange(first, end)
+        if not len(indexes): return []
+        values = self.glyphTable.values
+        firstByte = indexes[0] * width
+        endByte = min((indexes[-1] + 1) * width, len(values))
+        endByte -= (endByte - firstByte) % width # incomplete last glyph stays
+        oldData = values[firstByte:endByte]
+        if self.fontRowBytes: newData = self.transformRows(oldData, operation, amount)
+        else: newData = transformGlyphs(oldData, width // self.fontPages, self.fontPages, operation, amount)
+        newValues = dict([(firstByte + offset, value) for offset, (old, value) in enumerate(zip(oldData, newData)) if old != value])
+        self.debug("core", "Transform", operation, amount, "glyphs", indexes[0], indexes[-1] + 1, "> changed values", len(newValues))
+        return self.writeValues(newValues)
+
+    def transformRows(self, data, operation, amount):
+        """Returns bytearray - transform of horizontal glyphs done on vertical data, box of 8 * pages rows is aligned back to glyph height"""
+        columnCount, pages, height = rowGeometry(self.fontBytewidth, self.fontRowBytes)
+        data = transformGlyphs(rowsToColumns(data, self.fontRowBytes, height), columnCount, pages, operation, amount)
+        padding = 8 * pages - height # empty rows under glyph
+        if padding and operation in (FLIP_VERTICAL, ROTATE_180): data = transformGlyphs(data, columnCount, pages, SHIFT_UP, padding)
+        elif padding and operation == ROTATE_CW: data = transformGlyphs(data, columnCount, pages, SHIFT_LEFT, padding)
+        return columnsToRows(data, columnCount, pages, self.fontRowBytes, height)
+
+    @traced("core.convertLayout")
+    def convertLayout(self, horizontal):
+        """Convert data between vertical and horizontal layout in one pass, data is written again one glyph per line
+        Glyph box is rounded up to whole bytes, returns True if converted - undo history is cleared"""
+        width = self.fontBytewidth
+        if bool(self.fontRowBytes) == bool(horizontal) or not self.glyphTable.getByteCount(): return False
+        if not width or width % self.getWidthUnit(): return False
+        values = self.glyphTable.values
+        if horizontal:
+            columnCount, pages = self.getGlyphColumns(), self.fontPages
+            rowBytes = (columnCount + 7) // 8
+            newValues = columnsToRows(values, columnCount, pages, rowBytes)
+            newWidth = rowBytes * 8 * pages
         else:
-            self.currentInsertionIndex = 0
-            newString = re.sub('(0x[a-fA-F0-9]{2})', self.re_insertRight ,self.parsedText) #
-            self.fontBytewidth = self.fontBytewidth + 1
+            columnCount, pages, height = rowGeometry(width, self.fontRowBytes)
+            rowBytes = 0
+            newValues = rowsToColumns(values, self.fontRowBytes, height)
+            newWidth = columnCount * pages
+        self.fontRowBytes, self.fontPages = rowBytes, pages
+        self.rewriteValues(newValues, newWidth)
+        self.debug("core", "Converted to", "horizontal" if horizontal else "vertical", "data", "> bytes per glyph", newWidth)
+        return True
+
+    def rewriteValues(self, values, width):
+        """Replace data of array by values written one glyph of width values per line, text is parsed again"""
+        parsedText = "\n" + formatValues(values, width) + "\n"
+        importedText = self.getStartText() + parsedText + self.getEndText()
+        self.importRange(importedText, self.startOffset, self.startOffset + len(parsedText))
+        if self.fontBytewidth != width: self.setFontByteWidth(width)
 
-            self.parsedText = newString # <--------------------- update input!
-            self.parseTextToGlyphList() # <--------------------- scan it!
+    ################
+    # DUPLICATES
+    def getGlyphIndex(self):
+        """Returns GlyphIndex of current data - see glyphindex"""
+        self.glyphIndex.attach(self.glyphTable.values, self.fontBytewidth)
+        return self.glyphIndex
+
+    @traced("core.deduplicateGlyphs")
+    def deduplicateGlyphs(self):
+        """Drop repeated glyphs, data is written again one glyph per line and undo history is cleared
+        Returns list remap - glyph index before -> index in deduplicated font, None if there was no duplicate"""
+        index = self.getGlyphIndex()
+        if not index.getRedundantCount(): return None
+        values, remap = index.deduplicate()
+        selected = remap[self.selectedGlyphIndex] if self.selectedGlyphIndex < len(remap) else 0
+        self.rewriteValues(values, self.fontBytewidth)
+        self.selectedGlyphIndex = selected
+        self.glyphRemap = remap
+        self.debug("core", "Deduplicated", len(remap), "glyphs > kept", max(remap) + 1)
+        return remap
 
-    def re_insertRight(self, matchobj):
-        """  """
-        self.currentInsertionIndex = self.currentInsertionIndex + 1
-        if self.currentInsertionIndex % self.fontBytewidth == 0:
-            return matchobj.group(1) + ", 0x00"
-        else: return matchobj.group(1)
+    ################
+    # EXPORT
+    def getExportFont(self, first=0, baseline=None):
+        """Returns dict describing font for exporters - see exporters.describeFont"""
+        return exporters.describeFont(self.glyphTable.values, self.fontBytewidth, self.fontPages, self.fontRowBytes, first, baseline)
+
+    @traced("core.exportFont")
+    def exportFont(self, exportFormat, stream, name="font", first=0, baseline=None):
+        """Write font straight from font model to stream in format of exporters, text is not involved
+        Returns int flash bytes of written font, raises ValueError if font does not fit format"""
+        size = exporters.exportFont(self.getExportFont(first, baseline), exportFormat, stream, name)
+        self.debug("core", "Exported", exportFormat, "> flash bytes", size)
+        return size
+
+    def getExportSizes(self, first=0, baseline=None):
+        """Returns dict format -> int flash bytes, None where format can not hold font"""
+        return exporters.exportSizes(self.getExportFont(first, baseline))
 
-    def insertToLeft(self):
-        """  """
+    ################
+    # UNDO / REDO
+    def getJournal(self):
+        """Returns UndoJournal of edits"""
+        return self.journal
+
+    def undo(self):
+        """Revert last recorded edit, returns dict - see applyStep, None if nothing to undo"""
+        return self.journal.undo(self.applyStep)
+
+    def redo(self):
+        """Repeat last undone edit, returns dict - see applyStep, None if nothing to redo"""
+        return self.journal.redo(self.applyStep)
+
+    def applyStep(self, step, reverse):
+        """Apply journal step, reversed for undo, through the same batched updaters as edits - cost follows changed bytes only
+        Returns dict with kind, glyphs - indexes of glyphs changed, changes - list of changed text ranges, None when whole text changed"""
+        kind = step["kind"]
+        if kind == "values":
+            changes = self.writeValues(dict(zip(step["tokens"], step["old"] if reverse else step["new"])))
+            glyphs = sorted(set([tokenIndex // self.fontBytewidth for tokenIndex in step["tokens"]]))
+            return {"kind" : kind, "glyphs" : glyphs, "changes" : changes}
+        if (kind == "insert") != reverse: # insert or undo of erase
+            self.insertColumns(step["position"], step["count"])
+            if kind == "erase": self.restoreColumnValues(step["position"] * self.fontPages, step["count"] * self.fontPages, step["removed"])
+        else: self.eraseColumns(step["position"], step["count"])
+        return {"kind" : kind, "glyphs" : [], "changes" : None}
+
+    ################
+    # DATA INSERTERS
+    def insertColumns(self, position, count=1, first=None, end=None):
+        """Insert count empty columns at column position, to all glyphs or to glyphs first up to end - column has fontPages bytes
+        Glyphs of range keep their width - last columns drop out, returns True if data changed"""
         if not self.parsedText or not self.glyphList:
             # both checks required - parsedText can contain rest of non base 16 data - checking glyphlist empty ensures to avoid this operation
-            self.debug("core", "Warning:", "Insert left: no data to insert to!")
-            return
+            self.debug("core", "Warning:", "Insert: no data to insert to!")
+            return False
+        if self.fontRowBytes:
+            self.debug("core", "Warning:", "Insert: columns of horizontal data are bits, convert to vertical data first")
+            return False
+        if position < 0 or position > self.getGlyphColumns() or count < 1:
+            self.debug("core", "Warning:", "Insert: position", position, "count", count, "out of glyph columns", self.getGlyphColumns())
+            return False
+        pages = self.fontPages
+        if first is None and end is None:
+            newText, newTable = columns.insertColumns(self.parsedText, self.glyphTable, position * pages, count * pages)
+            self.applyColumnEdit(newText, newTable)
+            self.journal.recordColumns("insert", position, count)
         else:
-            self.currentInsertionIndex = 0
-            newString = re.sub('(0x[a-fA-F0-9]{2})', self.re_insertLeft , self.parsedText) #
-            self.fontBytewidth = self.fontBytewidth + 1
-
-            self.parsedText = newString # <--------------------- update input!
-            self.parseTextToGlyphList() # <--------------------- scan it!
-
-    def re_insertLeft(self, matchobj):
-        """  """
-        if self.currentInsertionIndex % self.fontBytewidth == 0:
-            self.currentInsertionIndex = self.currentInsertionIndex + 1
-            return "0x00, " + matchobj.group(1)
-        else:
-            self.currentInsertionIndex = self.currentInsertionIndex + 1
-            return matchobj.group(1)
+            self.updateGlyphs([(index, columns.insertColumnValues(self.getGlyphValues(index), position * pages, count * pages)) for index in self.glyphIndexRange(first, end)])
+        return True
+
+    def insertToRight(self):
+        """Add empty column after last column of every glyph"""
+        return self.insertColumns(self.getGlyphColumns())
+
+    def insertToLeft(self):
+        """Add empty column before first column of every glyph"""
+        return self.insertColumns(0)
 
     ################
     # DATA ERASERS
-    def eraseFromRight(self):
-        """  """
+    def eraseColumns(self, position, count=1, first=None, end=None):
+        """Erase count columns from column position, from all glyphs or from glyphs first up to end - column has fontPages bytes
+        Glyphs of range keep their width - padded with empty columns, returns True if data changed"""
         if not self.parsedText or not self.glyphList:
             # both checks required - parsedText can contain rest of non base 16 data - checking glyphlist empty ensures to avoid this operation
-            self.debug("core", "Warning:", "Erase from right: no data to erase!")
-            return
+            self.debug("core", "Warning:", "Erase: no data to erase!")
+            return False
+        if self.fontRowBytes:
+            self.debug("core", "Warning:", "Erase: columns of horizontal data are bits, convert to vertical data first")
+            return False
+        if position < 0 or position >= self.getGlyphColumns() or count < 1:
+            self.debug("core", "Warning:", "Erase: position", position, "count", count, "out of glyph columns", self.getGlyphColumns())
+            return False
+        count = min(count, self.getGlyphColumns() - position) # columns after last one do not exist
+        pages = self.fontPages
+        if first is None and end is None:
+            if self.getGlyphColumns() - count < 1: return False # this is floor where we can safely erase - up to zero
+            removed = self.columnValues(position * pages, count * pages) # kept for undo
+            newText, newTable = columns.eraseColumns(self.parsedText, self.glyphTable, position * pages, count * pages)
+            self.applyColumnEdit(newText, newTable)
+            self.journal.recordColumns("erase", position, count, removed)
         else:
-            if self.fontBytewidth > 1:
-                # this is floor where we can safely erase - up to zero
-                self.currentInsertionIndex = 0
-                newString = re.sub('( ?0x[a-fA-F0-9]{2},?)', self.re_eraseRight , self.parsedText) # including space before and comma after
-                self.fontBytewidth = self.fontBytewidth - 1
-                self.parsedText = newString # <--------------------- update input!
-                self.parseTextToGlyphList() # <--------------------- scan it!
-
-    def re_eraseRight(self, matchobj):
-        """  """
-        self.currentInsertionIndex = self.currentInsertionIndex + 1
-        if self.currentInsertionIndex % self.fontBytewidth == 0:
-            return ""
-        else: return matchobj.group(1)
+            self.updateGlyphs([(index, columns.eraseColumnValues(self.getGlyphValues(index), position * pages, count * pages)) for index in self.glyphIndexRange(first, end)])
+        return True
+
+    def eraseFromRight(self):
+        """Remove last column of every glyph"""
+        return self.eraseColumns(self.getGlyphColumns() - 1)
 
     def eraseFromLeft(self):
-        """  """
-        if not self.parsedText or not self.glyphList:
-            # both checks required - parsedText can contain rest of non base 16 data - checking glyphlist empty ensures to avoid this operation
-            self.debug("core", "Warning:", "Erase from left: no data to erase!")
-            return
-        else:
-            if self.fontBytewidth > 1:
-                # this is floor where we can safely erase - up to zero
-                self.currentInsertionIndex = 0
-                newString = re.sub('( ?0x[a-fA-F0-9]{2},? ?)', self.re_eraseLeft , self.parsedText) # eat right space and comma too
-                self.fontBytewidth = self.fontBytewidth - 1 # 
-                self.parsedText = newString # <--------------------- update input!
-                self.parseTextToGlyphList() # <--------------------- scan it!
-
-    def re_eraseLeft(self, matchobj):
-        """  """
-        if self.currentInsertionIndex % self.fontBytewidth == 0:
-            self.currentInsertionIndex = self.currentInsertionIndex + 1
-            return ""
-        else:
-            self.currentInsertionIndex = self.currentInsertionIndex + 1
-            return matchobj.group(1)
+        """Remove first column of every glyph"""
+        return self.eraseColumns(0)
+
+    ################
+    # COLUMN HELPERS
+    def applyColumnEdit(self, newText, newTable):
+        """Take text and token table emitted by column engine, no rescan of text"""
+        self.parsedText = newText # <--------------------- update input!
+        self.glyphTable = newTable
+        self.glyphList = GlyphListView(self.glyphTable, self)
+        self.fontBytewidth = newTable.bytewidth
+        self.widthDetection = detectByteWidth(newText) # values per line changed, incremental import updates this histogram
+        self.glyphIndex.invalidate()
+        self.lineIndex.build(newText)
+        if self.selectedGlyphIndex >= self.glyphTable.getGlyphCount(): self.selectedGlyphIndex = 0
+        self.debug("core", "Column edit", "> new width", self.fontBytewidth, "glyph count", self.glyphTable.getGlyphCount())
+
+    def columnValues(self, first, count):
+        """Returns bytearray of values of count bytes from byte first of every glyph"""
+        values, width = self.glyphTable.values, self.fontBytewidth
+        removed = bytearray()
+        for glyphStart in range(0, len(values), width):
+            removed += values[glyphStart + first:min(glyphStart + first + count, glyphStart + width)]
+        return removed
+
+    def restoreColumnValues(self, first, count, removed):
+        """Write values taken by columnValues back to count bytes from byte first of every glyph, returns list of changed text ranges"""
+        values, width = self.glyphTable.values, self.fontBytewidth
+        newValues = {}
+        cursor = 0
+        for glyphStart in range(0, len(values), width):
+            for tokenIndex in range(glyphStart + first, min(glyphStart + first + count, glyphStart + width, len(values))):
+                if cursor >= len(removed): break
+                if values[tokenIndex] != removed[cursor]: newValues[tokenIndex] = removed[cursor]
+                cursor += 1
+        return self.writeValues(newValues)
+
+    def glyphIndexRange(self, first, end):
+        """Returns range of glyph indexes clamped to data, None means from start or up to end"""
+        if first is None: first = 0
+        if end is None or end > self.getGlyphCount(): end = self.getGlyphCount()
+        return range(max(0, first), end)
 ################################################################
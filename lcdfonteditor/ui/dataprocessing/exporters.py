@@ -0,0 +1,450 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+import itertools
+from .rowmajor import columnsToRows
+from .transforms import REVERSED_BITS
+
+try:
+    import numpy # optional - column dictionary built by array operations
+except ImportError:
+    numpy = None
+
+try: textType = unicode # python 2 - io text streams take unicode only
+except NameError: textType = str
+
+################
+# CONSTANTS
+FORMAT_BIN, FORMAT_GFX, FORMAT_U8G2, FORMAT_DICT = "bin", "gfx", "u8g2", "dict"
+FORMATS = (FORMAT_BIN, FORMAT_GFX, FORMAT_U8G2, FORMAT_DICT)
+BINARY_FORMATS = (FORMAT_BIN,) # written to binary stream, others are C source
+EXTENSIONS = {FORMAT_BIN : ".bin", FORMAT_GFX : ".h", FORMAT_U8G2 : ".h", FORMAT_DICT : ".h"}
+CHUNK_SIZE = 65536 # bytes per write of raw data
+VALUES_PER_LINE = 16 # hex values per line of C array
+HEX_VALUES = ["0x%02X" % value for value in range(256)]
+GFX_GLYPH_BYTES = 7 # GFXglyph - uint16_t bitmapOffset, uint8_t width, height, xAdvance, int8_t xOffset, yOffset
+GFX_FONT_BYTES = 7 # GFXfont counted as fontconvert of Adafruit GFX does
+U8G2_HEADER_BYTES = 23
+U8G2_END = bytearray([0x00, 0x00]) # glyph with jump 0 ends 8 bit glyph list
+U8G2_UNICODE_END = bytearray([0x00, 0x04, 0xFF, 0xFF, 0x00, 0x00]) # lookup table entry pointing to empty unicode glyph list
+U8G2_RUN_BITS = range(1, 8) # tried bits per run of zeros / ones, smallest result wins
+DICT_INDEX_PADDING = 3 # zero bytes after packed indexes, decoder reads 4 bytes at once
+
+################
+# SOURCE - every format is written from horizontal copy of font model, see rowmajor
+def describeFont(values, bytewidth, pages=1, rowBytes=0, first=0, baseline=None):
+    """Returns dict describing font for exporters - rows of glyphs, glyph box, encoding of first glyph and baseline
+    values - font model in vertical layout of pages, or horizontal with rowBytes bytes per row, incomplete last glyph is padded
+    baseline - pixel row under glyphs sitting on the line, glyph height by default"""
+    unit = rowBytes or pages # bytes of column, row of horizontal data
+    if rowBytes:
+        columns, height = rowBytes * 8, bytewidth // rowBytes
+        rows = bytearray(values)
+    else:
+        columns, height = bytewidth // pages, 8 * pages
+        rowBytes = (columns + 7) // 8
+        rows = columnsToRows(values, columns, pages) if columns else bytearray()
+    glyphBytes = rowBytes * height
+    if glyphBytes: rows += bytearray(-len(rows) % glyphBytes)
+    count = len(rows) // glyphBytes if glyphBytes else 0
+    return {"values" : values, "bytewidth" : bytewidth, "unit" : unit, "rows" : rows, "rowBytes" : rowBytes, "columns" : columns, "height" : height, "count" : count,
+            "first" : first, "baseline" : height if baseline is None else baseline}
+
+def glyphRows(font, index):
+    """Returns list of int - pixel rows of glyph from top, bit columns - 1 is leftmost pixel"""
+    rows, rowBytes, height = font["rows"], font["rowBytes"], font["height"]
+    shift = 8 * rowBytes - font["columns"] # unused bits right of glyph
+    start = index * rowBytes * height
+    result = []
+    for first in range(start, start + rowBytes * height, rowBytes):
+        value = 0
+        for byte in rows[first:first + rowBytes]: value = (value << 8) | byte
+        result.append(value >> shift)
+    return result
+
+def bitLength(value):
+    """Returns int bits of non-negative value without leading zeros, 0 for 0 - int.bit_length is missing on python 2.6"""
+    return len(bin(value)) - 2 if value else 0
+
+def glyphBox(rows, columns):
+    """Returns tuple (left, top, width, height) of set pixels, None for empty glyph"""
+    occupied = [y for y, row in enumerate(rows) if row]
+    if not occupied: return None
+    merged = 0
+    for row in rows: merged |= row
+    lowest, highest = bitLength(merged & -merged) - 1, bitLength(merged) # rightmost set pixel, bits up to leftmost one
+    return (columns - highest, occupied[0], highest - lowest, occupied[-1] - occupied[0] + 1)
+
+def boxBits(rows, columns, box):
+    """Returns tuple (int, count) - pixels of box row by row, leftmost pixel of top row is the highest bit"""
+    left, top, width, height = box
+    shift, mask = columns - left - width, (1 << width) - 1
+    value = 0
+    for row in rows[top:top + height]: value = (value << width) | ((row >> shift) & mask)
+    return (value, width * height)
+
+def glyphMetrics(font):
+    """Yields tuple (index, rows, box) of every glyph, box is None for empty glyph"""
+    for index in range(font["count"]):
+        rows = glyphRows(font, index)
+        yield (index, rows, glyphBox(rows, font["columns"]))
+
+################
+# RAW BINARY
+def encodeBin(font):
+    """Yields bytes of font model as is - layout of editor, incomplete last glyph included"""
+    values = font["values"]
+    for start in range(0, len(values), CHUNK_SIZE): yield bytes(bytearray(values[start:start + CHUNK_SIZE]))
+
+def binSize(font):
+    """Returns int bytes of raw binary"""
+    return len(font["values"])
+
+################
+# ADAFRUIT GFX - glyphs cropped to set pixels, bits continue over rows, most significant bit first
+def gfxBitmap(rows, columns, box):
+    """Returns bytearray of cropped glyph, last byte padded with zeros"""
+    value, count = boxBits(rows, columns, box)
+    padding = -count % 8
+    value <<= padding
+    return bytearray([(value >> shift) & 0xFF for shift in range(count + padding - 8, -1, -8)])
+
+def encodeGfx(font, glyphs):
+    """Yields bytes of bitmap glyph by glyph, glyphs - list filled with glyph records as dicts"""
+    offset = 0
+    for index, rows, box in glyphMetrics(font):
+        left, top, width, height = box if box is not None else (0, font["baseline"], 0, 0)
+        bitmap = gfxBitmap(rows, font["columns"], box) if box is not None else bytearray()
+        glyphs.append({"offset" : offset, "width" : width, "height" : height, "advance" : font["columns"], "x" : left, "y" : top - font["baseline"], "encoding" : font["first"] + index})
+        offset += len(bitmap)
+        if bitmap: yield bytes(bitmap)
+
+def gfxSize(font):
+    """Returns int flash bytes of bitmap, glyph table and font record, raises ValueError if font does not fit format"""
+    if font["columns"] > 255 or font["height"] > 255: raise ValueError("gfx glyph is larger than 255 pixels")
+    bitmapBytes = 0
+    for index, rows, box in glyphMetrics(font):
+        if box is not None: bitmapBytes += (box[2] * box[3] + 7) // 8
+    if bitmapBytes > 0xFFFF: raise ValueError("gfx bitmap is larger than 64 kB")
+    return bitmapBytes + GFX_GLYPH_BYTES * font["count"] + GFX_FONT_BYTES
+
+def writeGfx(font, stream, name):
+    """Write Adafruit GFX font header - bitmap streamed glyph by glyph, glyph table follows"""
+    size = gfxSize(font) # checked before anything gets written
+    glyphs = []
+    write = lambda text: stream.write(textType(text))
+    write("const uint8_t %sBitmaps[] PROGMEM = {\n" % name)
+    writeHex(stream, encodeGfx(font, glyphs))
+    write("};\n\nconst GFXglyph %sGlyphs[] PROGMEM = {\n" % name)
+    for glyph in glyphs:
+        separator = "," if glyph is not glyphs[-1] else " "
+        write("  { %5d, %3d, %3d, %3d, %4d, %4d }%s  // 0x%02X\n" % (glyph["offset"], glyph["width"], glyph["height"], glyph["advance"], glyph["x"], glyph["y"], separator, glyph["encoding"]))
+    last = font["first"] + max(font["count"] - 1, 0)
+    write("};\n\nconst GFXfont %s PROGMEM = {\n  (uint8_t  *)%sBitmaps,\n  (GFXglyph *)%sGlyphs,\n  0x%02X, 0x%02X, %d };\n\n" % (name, name, name, font["first"], last, font["height"]))
+    write("// Approx. %d bytes\n" % size)
+    return size
+
+################
+# U8G2 - glyphs cropped to set pixels, run lengths of zeros and ones packed least significant bit first
+def unsignedBits(value):
+    """Returns int bits holding value, at least 1"""
+    return max(1, bitLength(value))
+
+def signedBits(low, high):
+    """Returns int bits holding values low to high stored with offset of half range, at least 1"""
+    bits = 1
+    while low < -(1 << (bits - 1)) or high > (1 << (bits - 1)) - 1: bits += 1
+    return bits
+
+def pixelRuns(rows, columns, box):
+    """Returns list of int - lengths of alternating runs of clear and set pixels, first run is clear"""
+    value, count = boxBits(rows, columns, box)
+    bits = ("{0:0%db}" % count).format(value)
+    runs = [len(list(group)) for key, group in itertools.groupby(bits)]
+    if bits[0] == "1": runs.insert(0, 0)
+    if len(runs) % 2: runs.append(0)
+    return runs
+
+def runPairs(runs, zeroBits, oneBits):
+    """Returns list of tuples (zeros, ones) - runs split to fit bits"""
+    maxZeros, maxOnes = (1 << zeroBits) - 1, (1 << oneBits) - 1
+    pairs = []
+    for position in range(0, len(runs), 2):
+        zeros, ones = runs[position], runs[position + 1]
+        while zeros > maxZeros:
+            pairs.append((maxZeros, 0))
+            zeros -= maxZeros
+        while ones > maxOnes:
+            pairs.append((zeros, maxOnes))
+            zeros, ones = 0, ones - maxOnes
+        if zeros or ones: pairs.append((zeros, ones))
+    return pairs
+
+def pairsBitCount(pairs, zeroBits, oneBits):
+    """Returns int bits of encoded pairs - repeated pair takes one bit, every other pair its bits and one end bit"""
+    bits = 0
+    for position, pair in enumerate(pairs):
+        if position and pair == pairs[position - 1]: bits += 1
+        else: bits += zeroBits + oneBits + 1
+    return bits
+
+class BitWriter():
+    """Packs unsigned values least significant bit first as u8g2 decoder reads them"""
+    def __init__(self):
+        self.value = 0
+        self.count = 0
+
+    def add(self, value, bits):
+        """Append value of bits"""
+        self.value |= (value & ((1 << bits) - 1)) << self.count
+        self.count += bits
+
+    def getBytes(self):
+        """Returns bytearray - last byte padded with zeros"""
+        return bytearray([(self.value >> shift) & 0xFF for shift in range(0, self.count, 8)])
+
+def planU8g2(font):
+    """Returns dict - glyph metrics, bit widths and run bits giving smallest font, see encodeU8g2"""
+    if font["first"] + font["count"] > 256: raise ValueError("u8g2 export covers encodings up to 255, first glyph is 0x%02X" % font["first"])
+    columns, baseline = font["columns"], font["baseline"]
+    glyphs = []
+    for index, rows, box in glyphMetrics(font):
+        if box is None: glyphs.append({"encoding" : font["first"] + index, "width" : 0, "height" : 0, "x" : 0, "y" : 0, "runs" : []})
+        else:
+            left, top, width, height = box
+            glyphs.append({"encoding" : font["first"] + index, "width" : width, "height" : height, "x" : left, "y" : baseline - top - height, "runs" : pixelRuns(rows, columns, box)})
+    drawn = [glyph for glyph in glyphs if glyph["width"]] or [{"width" : 0, "height" : 0, "x" : 0, "y" : 0}] # empty glyphs take no part in font box
+    plan = {"glyphs" : glyphs, "advance" : columns,
+            "maxWidth" : max([glyph["width"] for glyph in drawn]), "maxHeight" : max([glyph["height"] for glyph in drawn]),
+            "minX" : min([glyph["x"] for glyph in drawn]), "maxX" : max([glyph["x"] for glyph in drawn]),
+            "minY" : min([glyph["y"] for glyph in drawn]), "maxY" : max([glyph["y"] for glyph in drawn]),
+            "ascent" : max([glyph["y"] + glyph["height"] for glyph in drawn])}
+    plan["widthBits"], plan["heightBits"] = unsignedBits(plan["maxWidth"]), unsignedBits(plan["maxHeight"])
+    plan["xBits"], plan["yBits"] = signedBits(plan["minX"], plan["maxX"]), signedBits(plan["minY"], plan["maxY"]) # range around 0 holds empty glyphs too
+    plan["advanceBits"] = signedBits(0, columns)
+    headerBits = plan["widthBits"] + plan["heightBits"] + plan["xBits"] + plan["yBits"] + plan["advanceBits"]
+    best = None
+    for zeroBits in U8G2_RUN_BITS:
+        for oneBits in U8G2_RUN_BITS:
+            sizes = [2 + (headerBits + pairsBitCount(runPairs(glyph["runs"], zeroBits, oneBits), zeroBits, oneBits) + 7) // 8 for glyph in glyphs]
+            if best is None or sum(sizes) < sum(best[2]): best = (zeroBits, oneBits, sizes)
+    plan["zeroBits"], plan["oneBits"], plan["sizes"] = best
+    for glyph, size in zip(glyphs, plan["sizes"]):
+        if size > 255: raise ValueError("u8g2 glyph 0x%02X takes %d bytes, limit is 255" % (glyph["encoding"], size))
+    plan["size"] = U8G2_HEADER_BYTES + sum(plan["sizes"]) + len(U8G2_END) + len(U8G2_UNICODE_END)
+    return plan
+
+def u8g2Header(plan):
+    """Returns bytearray of 23 bytes font header"""
+    glyphs, sizes = plan["glyphs"], plan["sizes"]
+    def startOf(encoding):
+        """Returns int offset of first glyph at or after encoding, end of list if there is none"""
+        offset = 0
+        for glyph, size in zip(glyphs, sizes):
+            if glyph["encoding"] >= encoding: return offset
+            offset += size
+        return offset
+    byEncoding = dict([(glyph["encoding"], glyph) for glyph in glyphs if glyph["width"]])
+    upperA, lowerG = byEncoding.get(ord("A")), byEncoding.get(ord("g"))
+    ascentA = upperA["y"] + upperA["height"] if upperA else plan["ascent"]
+    descentG = lowerG["y"] if lowerG else plan["minY"]
+    unicodeStart = sum(sizes) + len(U8G2_END)
+    header = [min(len(glyphs), 255), 0, plan["zeroBits"], plan["oneBits"], plan["widthBits"], plan["heightBits"], plan["xBits"], plan["yBits"], plan["advanceBits"],
+              plan["maxWidth"], plan["maxHeight"], plan["minX"], plan["minY"], ascentA, descentG, plan["ascent"], plan["minY"]]
+    header = bytearray([value & 0xFF for value in header])
+    for offset in (startOf(ord("A")), startOf(ord("a")), unicodeStart): header += bytearray([offset >> 8, offset & 0xFF]) # big endian
+    return header
+
+def encodeU8g2(font, plan=None):
+    """Yields bytes - header, glyph records one by one and end of glyph lists"""
+    if plan is None: plan = planU8g2(font)
+    yield bytes(u8g2Header(plan))
+    zeroBits, oneBits = plan["zeroBits"], plan["oneBits"]
+    for glyph, size in zip(plan["glyphs"], plan["sizes"]):
+        writer = BitWriter()
+        writer.add(glyph["width"], plan["widthBits"])
+        writer.add(glyph["height"], plan["heightBits"])
+        writer.add(glyph["x"] + (1 << (plan["xBits"] - 1)), plan["xBits"]) # signed values stored with offset
+        writer.add(glyph["y"] + (1 << (plan["yBits"] - 1)), plan["yBits"])
+        writer.add(plan["advance"] + (1 << (plan["advanceBits"] - 1)), plan["advanceBits"])
+        pairs = runPairs(glyph["runs"], zeroBits, oneBits)
+        for position, pair in enumerate(pairs):
+            if position and pair == pairs[position - 1]:
+                writer.add(1, 1) # repeat previous pair
+                continue
+            if position: writer.add(0, 1) # next pair follows
+            writer.add(pair[0], zeroBits)
+            writer.add(pair[1], oneBits)
+        if pairs: writer.add(0, 1)
+        data = writer.getBytes()
+        yield bytes(bytearray([glyph["encoding"], size]) + data + bytearray(size - 2 - len(data)))
+    yield bytes(U8G2_END + U8G2_UNICODE_END)
+
+def u8g2Size(font):
+    """Returns int flash bytes of u8g2 font"""
+    return planU8g2(font)["size"]
+
+def writeU8g2(font, stream, name):
+    """Write u8g2 font as C array"""
+    plan = planU8g2(font)
+    write = lambda text: stream.write(textType(text))
+    write("/* %d glyphs, first 0x%02X, %d bytes */\n" % (font["count"], font["first"], plan["size"]))
+    write("const uint8_t %s[%d] U8G2_FONT_SECTION(\"%s\") = {\n" % (name, plan["size"], name))
+    writeHex(stream, encodeU8g2(font, plan))
+    write("};\n")
+    return plan["size"]
+
+################
+# COLUMN DICTIONARY - distinct columns (rows of horizontal data) stored once, glyphs are bit packed indexes to them
+DICT_DECODER = """
+/* decoder - writes %(name)s_GLYPH_COLUMNS * %(name)s_COLUMN_BYTES bytes of glyph to out, same layout as plain array */
+static void %(name)s_glyph(uint32_t glyph, uint8_t *out)
+{
+  uint32_t bit = glyph * %(name)s_GLYPH_COLUMNS * %(name)s_INDEX_BITS;
+  uint16_t column;
+  uint8_t i;
+  for (column = 0; column < %(name)s_GLYPH_COLUMNS; column++, bit += %(name)s_INDEX_BITS) {
+    const uint8_t *source = %(name)s_indexes + (bit >> 3);
+    uint32_t word = source[0] | ((uint32_t)source[1] << 8) | ((uint32_t)source[2] << 16) | ((uint32_t)source[3] << 24);
+    uint32_t index = (word >> (bit & 7)) & ((1UL << %(name)s_INDEX_BITS) - 1);
+    for (i = 0; i < %(name)s_COLUMN_BYTES; i++) *out++ = %(name)s_columns[index * %(name)s_COLUMN_BYTES + i];
+  }
+}
+"""
+
+def columnDictionary(font, useNumpy=True):
+    """Returns tuple (list of distinct columns as bytes in sorted order, indexes of every column of font to list) - one bulk pass over font model"""
+    unit, width = font["unit"], font["bytewidth"]
+    if not unit or width % unit: raise ValueError("dict glyph is not made of whole columns")
+    data = bytearray(font["values"])
+    data += bytearray(-len(data) % width) # incomplete last glyph padded
+    if not data: return ([], [])
+    if useNumpy and numpy is not None and unit <= 8:
+        # column as big endian integer sorts as its bytes do - one sort of plain integers
+        units = numpy.zeros((len(data) // unit, 8), dtype=numpy.uint8)
+        units[:, 8 - unit:] = numpy.frombuffer(bytes(data), dtype=numpy.uint8).reshape(-1, unit)
+        distinct, indexes = numpy.unique(units.view(">u8").reshape(-1), return_inverse=True)
+        distinct = distinct.astype(">u8").view(numpy.uint8).reshape(-1, 8)[:, 8 - unit:]
+        return ([bytes(bytearray(row.tobytes())) for row in distinct], indexes.reshape(-1))
+    if unit == 1:
+        distinct = sorted(set(data))
+        table = bytearray(256)
+        for index, value in enumerate(distinct): table[value] = index
+        return ([bytes(bytearray([value])) for value in distinct], data.translate(bytes(table))) # lookup done by translate
+    units = [bytes(data[start:start + unit]) for start in range(0, len(data), unit)]
+    distinct = sorted(set(units))
+    positions = dict([(column, index) for index, column in enumerate(distinct)])
+    return (distinct, [positions[column] for column in units])
+
+def packIndexes(indexes, bits, useNumpy=True):
+    """Returns bytearray of indexes of bits each, least significant bit first"""
+    count = len(indexes)
+    if useNumpy and numpy is not None:
+        words = numpy.asarray(indexes, dtype=">u4").view(numpy.uint8).reshape(-1, 4)
+        indexBits = numpy.unpackbits(words, axis=1)[:, ::-1][:, :bits] # least significant first, bitorder needs numpy 1.17
+        return bytearray(numpy.packbits(indexBits.reshape(-1)).tobytes()).translate(bytes(REVERSED_BITS))
+    packed = bytearray()
+    for start in range(0, count, 8): # 8 indexes fill whole bytes
+        word = 0
+        for position, index in enumerate(indexes[start:start + 8]): word |= index << (position * bits)
+        packed += bytearray([(word >> shift) & 0xFF for shift in range(0, 8 * bits, 8)])
+    return packed[:(count * bits + 7) // 8]
+
+def planDict(font, useNumpy=True):
+    """Returns dict - distinct columns, packed indexes, bits per index and size compared to plain array"""
+    distinct, indexes = columnDictionary(font, useNumpy)
+    bits = unsignedBits(len(distinct) - 1) if distinct else 1
+    if bits > 24: raise ValueError("dict has %d distinct columns, decoder reads 24 bit indexes at most" % len(distinct))
+    packed = packIndexes(indexes, bits, useNumpy) + bytearray(DICT_INDEX_PADDING)
+    columns = bytearray(b"".join(distinct))
+    plain = len(font["values"])
+    return {"columns" : columns, "distinct" : len(distinct), "indexes" : packed, "bits" : bits, "plain" : plain, "size" : len(columns) + len(packed)}
+
+def dictSize(font):
+    """Returns int flash bytes of column dictionary and packed indexes"""
+    return planDict(font)["size"]
+
+def writeDict(font, stream, name):
+    """Write column dictionary font with its decoder as C source"""
+    plan = planDict(font)
+    write = lambda text: stream.write(textType(text))
+    glyphColumns = font["bytewidth"] // font["unit"]
+    ratio = 100.0 * plan["size"] / plan["plain"] if plan["plain"] else 0.0
+    write("/* column dictionary font - %d glyphs of %d columns, %d distinct columns, %d bit indexes\n" % (font["count"], glyphColumns, plan["distinct"], plan["bits"]))
+    write("   plain array %d bytes, compressed %d bytes (%.1f %%) */\n" % (plan["plain"], plan["size"], ratio))
+    write("#define %s_GLYPH_COLUMNS %d\n#define %s_COLUMN_BYTES %d\n#define %s_INDEX_BITS %d\n\n" % (name, glyphColumns, name, font["unit"], name, plan["bits"]))
+    write("const uint8_t %s_columns[%d] = {\n" % (name, len(plan["columns"])))
+    writeHex(stream, [plan["columns"]])
+    write("};\n\nconst uint8_t %s_indexes[%d] = { /* %s_INDEX_BITS bits per column of every glyph, least significant bit first */\n" % (name, len(plan["indexes"]), name))
+    writeHex(stream, [plan["indexes"]])
+    write("};\n")
+    write(DICT_DECODER % {"name" : name})
+    return plan["size"]
+
+################
+# WRITERS
+def writeHex(stream, chunks, indent="  "):
+    """Write chunks of bytes as C hex values, VALUES_PER_LINE per line - returns int count of values"""
+    count = 0
+    pending = bytearray()
+    hexValue = HEX_VALUES.__getitem__
+    for chunk in chunks:
+        pending += chunk
+        whole = len(pending) - len(pending) % VALUES_PER_LINE
+        if not whole: continue
+        lines = [indent + ", ".join(map(hexValue, pending[first:first + VALUES_PER_LINE])) for first in range(0, whole, VALUES_PER_LINE)]
+        stream.write(textType(("," + "\n" if count else "") + ",\n".join(lines))) # comma of previous line, no trailing comma at the end
+        count += whole
+        del pending[:whole]
+    if pending:
+        stream.write(textType(("," + "\n" if count else "") + indent + ", ".join(map(hexValue, pending))))
+        count += len(pending)
+    if count: stream.write(textType("\n"))
+    return count
+
+def exportFont(font, exportFormat, stream, name="font"):
+    """Write font in format to stream - binary stream for BINARY_FORMATS, text stream for others, returns int flash bytes"""
+    if exportFormat == FORMAT_BIN:
+        for chunk in encodeBin(font): stream.write(chunk)
+        return binSize(font)
+    if exportFormat == FORMAT_GFX: return writeGfx(font, stream, name)
+    if exportFormat == FORMAT_U8G2: return writeU8g2(font, stream, name)
+    if exportFormat == FORMAT_DICT: return writeDict(font, stream, name)
+    raise ValueError("unknown export format: %s" % exportFormat)
+
+def exportSizes(font):
+    """Returns dict format -> int flash bytes, None where format can not hold font"""
+    sizes = {}
+    for exportFormat, size in ((FORMAT_BIN, binSize), (FORMAT_GFX, gfxSize), (FORMAT_U8G2, u8g2Size), (FORMAT_DICT, dictSize)):
+        try: sizes[exportFormat] = size(font)
+        except ValueError: sizes[exportFormat] = None
+    return sizes
+################################################################
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+from bisect import insort
+
+################
+# CONSTANTS
+POPCOUNT = bytearray([bin(value).count("1") for value in range(256)]) # set bits of byte
+
+################################################################
+class GlyphIndex():
+    """Hash index of glyph contents - groups of identical glyphs, kept up to date glyph by glyph as values are written
+    Built on first query after parse or regrouping, near duplicates are found by Hamming distance of glyph bytes"""
+    def __init__(self):
+        self.values = None # indexed font model, bytearray shared with GlyphTable
+        self.width = 0 # bytes per glyph
+        self.keys = [] # glyph index -> bytes of glyph contents
+        self.groups = {} # bytes of glyph contents -> ascending list of glyph indexes
+        self.duplicates = set() # keys of groups holding more glyphs
+        self.weights = {} # bytes of glyph contents -> count of set pixels
+        self.stale = True
+
+    ################
+    # SOURCE
+    def attach(self, values, width):
+        """Index values of width bytes per glyph, index is rebuilt on next query if source changed"""
+        if values is not self.values or width != self.width: self.stale = True
+        self.values, self.width = values, width
+
+    def invalidate(self):
+        """Drop index - values got rescanned or regrouped, rebuilt on next query"""
+        self.stale = True
+
+    def ensure(self):
+        """Rebuild index if stale - one pass hashing every glyph"""
+        if not self.stale: return
+        self.keys, self.groups, self.duplicates, self.weights = [], {}, set(), {}
+        values, width = self.values, self.width
+        if values is not None and width > 0:
+            for index, start in enumerate(range(0, len(values), width)):
+                key = bytes(values[start:start + width]) # incomplete last glyph gets its own shorter key
+                self.keys.append(key)
+                self.add(index, key)
+        self.stale = False
+
+    def updateGlyphs(self, glyphs):
+        """Rehash glyphs whose values changed, nothing is done while index is stale"""
+        if self.stale: return
+        values, width = self.values, self.width
+        for index in glyphs:
+            if index >= len(self.keys):
+                self.stale = True # glyph count changed
+                return
+            key = bytes(values[index * width:(index + 1) * width])
+            if key == self.keys[index]: continue
+            self.remove(index, self.keys[index])
+            self.keys[index] = key
+            self.add(index, key)
+
+    def add(self, index, key):
+        """Put glyph to group of key"""
+        group = self.groups.get(key)
+        if group is None:
+            self.groups[key] = [index]
+            self.weights[key] = sum(map(POPCOUNT.__getitem__, bytearray(key)))
+            return
+        insort(group, index)
+        self.duplicates.add(key)
+
+    def remove(self, index, key):
+        """Take glyph out of group of key"""
+        group = self.groups[key]
+        group.remove(index)
+        if not group:
+            del self.groups[key]
+            del self.weights[key]
+        elif len(group) == 1: self.duplicates.discard(key)
+
+    ################
+    # QUERIES
+    def getGroup(self, index):
+        """Returns list of glyph indexes with same contents as glyph index, glyph itself included"""
+        self.ensure()
+        return list(self.groups[self.keys[index]]) if index < len(self.keys) else []
+
+    def getDuplicateGroups(self):
+        """Returns list of lists of glyph indexes with same contents, ordered by first glyph"""
+        self.ensure()
+        return sorted([list(self.groups[key]) for key in self.duplicates])
+
+    def getRedundantCount(self):
+        """Returns int count of glyphs deduplication would drop"""
+        self.ensure()
+        return sum([len(self.groups[key]) - 1 for key in self.duplicates])
+
+    def getUniqueCount(self):
+        """Returns int count of distinct glyphs"""
+        self.ensure()
+        return len(self.groups)
+
+    def findNear(self, index, distance):
+        """Returns list of tuples (glyph index, distance) of other glyphs differing from glyph index by up to distance pixels, nearest first"""
+        self.ensure()
+        if index >= len(self.keys): return []
+        key = self.keys[index]
+        weight = self.weights[key]
+        near = []
+        for other, otherWeight in self.weights.items():
+            if abs(otherWeight - weight) > distance or len(other) != len(key): continue # pixel count alone differs more
+            pixels = hammingDistance(key, other)
+            if pixels <= distance: near.extend([(glyph, pixels) for glyph in self.groups[other] if glyph != index])
+        return sorted(near, key=lambda item: (item[1], item[0]))
+
+    def findNearGroups(self, distance):
+        """Returns list of tuples (glyph index, glyph index, distance) - first glyphs of distinct contents differing by 1 up to distance pixels
+        Contents are sorted by count of set pixels, only neighbours within distance of it are compared"""
+        self.ensure()
+        ranked = sorted(self.weights.items(), key=lambda item: item[1])
+        pairs = []
+        for position, (key, weight) in enumerate(ranked):
+            for other, otherWeight in ranked[position + 1:]:
+                if otherWeight - weight > distance: break
+                if len(other) != len(key): continue
+                pixels = hammingDistance(key, other)
+                if pixels <= distance: pairs.append(tuple(sorted((self.groups[key][0], self.groups[other][0]))) + (pixels,))
+        return sorted(pairs, key=lambda pair: (pair[2], pair[0], pair[1]))
+
+    ################
+    # DEDUPLICATION
+    def deduplicate(self):
+        """Returns tuple (bytearray of distinct glyphs in order of first occurrence, list remap - glyph index -> index in deduplicated font)"""
+        self.ensure()
+        values = bytearray()
+        remap = []
+        newIndexes = {} # key -> index in deduplicated font
+        for key in self.keys:
+            if key not in newIndexes:
+                newIndexes[key] = len(newIndexes)
+                values += bytearray(key)
+            remap.append(newIndexes[key])
+        return (values, remap)
+
+################
+# HELPERS
+def hammingDistance(a, b):
+    """Returns int count of differing bits of equally long byte strings - table lookup per byte"""
+    return sum([POPCOUNT[x ^ y] for x, y in zip(bytearray(a), bytearray(b))])
+################################################################
@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+import sys
+from array import array
+from bisect import bisect_left
+
+################
+# CONSTANTS
+STATE_INSERTED = 0 # value as found in parsed text
+STATE_MODIFIED = 1 # value changed by editor
+STATE_NAMES = ("inserted", "modified") # state code -> name used by list of dicts
+
+################################################################
+class GlyphTable():
+    def __init__(self, bytewidth=0):
+        self.bytewidth = bytewidth # bytes per glyph
+        # parallel arrays, one item per byte found in text
+        self.starts = array('I') # offset of token start in parsed text
+        self.ends = array('I') # offset of token end in parsed text
+        self.values = bytearray() # byte values
+        self.states = bytearray() # state codes, see STATE_NAMES
+        self.pending = {} # token index -> value still in text, for values written directly by views
+
+    ################
+    # BUILD
+    def clear(self):
+        """Remove all tokens"""
+        self.starts = array('I')
+        self.ends = array('I')
+        self.values = bytearray()
+        self.states = bytearray()
+        self.pending = {}
+
+    def scan(self, text, pattern, cancelCheck=None):
+        """Fill table with tokens matched by compiled pattern in text, group 1 must be hex value prefixed with 0x
+        Returns False if cancelCheck returned True during scan, table is incomplete then"""
+        self.clear()
+        starts, ends, values = self.starts, self.ends, self.values
+        for matchobj in pattern.finditer(text):
+            starts.append(matchobj.start(1))
+            ends.append(matchobj.end(1))
+            values.append(int(matchobj.group(1)[2:], 16))
+            if cancelCheck is not None and not (len(values) & 0xFFF) and cancelCheck(): return False # ask once per 4096 bytes
+        self.states = bytearray(len(values)) # all STATE_INSERTED
+        return True
+
+    def replaceTokens(self, first, end, text, pattern, regionStart, regionEnd, delta):
+        """Rescan region [regionStart, regionEnd) of new text, its tokens replace tokens first up to end, tokens after are shifted by delta"""
+        starts, ends, values = array('I'), array('I'), bytearray()
+        for matchobj in pattern.finditer(text, regionStart, regionEnd):
+            starts.append(matchobj.start(1))
+            ends.append(matchobj.end(1))
+            values.append(int(matchobj.group(1)[2:], 16))
+        self.starts[first:end] = starts
+        self.ends[first:end] = ends
+        self.values[first:end] = values
+        self.states[first:end] = bytearray(len(values)) # rescanned tokens are STATE_INSERTED
+        self.pending = {} # text is authoritative, uncommitted writes are dropped
+        self.shiftOffsets(first + len(values), delta)
+        return len(values)
+
+    def shiftOffsets(self, first, delta):
+        """Move offsets of tokens from index first up to the end by delta"""
+        if not delta: return
+        self.starts[first:] = array('I', [offset + delta for offset in self.starts[first:]])
+        self.ends[first:] = array('I', [offset + delta for offset in self.ends[first:]])
+
+    def setByteWidth(self, bytewidth):
+        """Set bytes per glyph, regroups glyphs"""
+        self.bytewidth = bytewidth
+
+    ################
+    # QUERIES
+    def getByteCount(self):
+        """Returns int count of bytes in table"""
+        return len(self.values)
+
+    def getGlyphCount(self):
+        """Returns int count of glyphs, last one may be incomplete"""
+        if self.bytewidth < 1: return 0
+        return (len(self.values) + self.bytewidth - 1) // self.bytewidth
+
+    def glyphRange(self, index):
+        """Returns tuple (first, end) of token indexes of glyph"""
+        first = index * self.bytewidth
+        return (first, min(first + self.bytewidth, len(self.values)))
+
+    def glyphSlice(self, index):
+        """Returns GlyphSlice - writable view of glyph bytes, no copy"""
+        first, end = self.glyphRange(index)
+        return GlyphSlice(self, first, end)
+
+    def glyphValues(self, index):
+        """Returns list of ints of glyph bytes"""
+        first, end = self.glyphRange(index)
+        return list(self.values[first:end])
+
+    def findToken(self, start):
+        """Returns int index of token starting at offset start or None, bisection over starts"""
+        index = bisect_left(self.starts, start)
+        if index < len(self.starts) and self.starts[index] == start: return index
+        return None
+
+    ################
+    # UPDATE
+    def setValue(self, tokenIndex, value):
+        """Set byte value and mark it modified"""
+        self.values[tokenIndex] = value
+        self.states[tokenIndex] = STATE_MODIFIED
+
+    def writeValue(self, tokenIndex, value):
+        """Set byte value only, text of token is updated later by DataProcessing.commitValues"""
+        if tokenIndex not in self.pending: self.pending[tokenIndex] = self.values[tokenIndex] # value text holds
+        self.values[tokenIndex] = value
+
+    def takePending(self):
+        """Returns dict token index -> value of values written since last call whose text differs"""
+        values = self.values
+        changed = dict((tokenIndex, values[tokenIndex]) for tokenIndex, textValue in self.pending.items() if values[tokenIndex] != textValue)
+        self.pending = {}
+        return changed
+
+    ################
+    # COMPATIBILITY
+    def glyphDicts(self, index, text, lineIndex=None):
+        """Returns list of dicts of glyph in format of former glyphList - start, end, hexdata, state, line
+        text is str or anything sliceable by offsets - TextBuffer"""
+        first, end = self.glyphRange(index)
+        glyph = []
+        for tokenIndex in range(first, end):
+            start = self.starts[tokenIndex]
+            tempdict = {}
+            tempdict['start'] = start
+            tempdict['end'] = self.ends[tokenIndex]
+            tempdict['hexdata'] = text[start:self.ends[tokenIndex]] # exact text of token, keeps case of digits
+            tempdict['state'] = STATE_NAMES[self.states[tokenIndex]]
+            if lineIndex is not None: tempdict['line'] = lineIndex.lineOf(start)
+            glyph.append(tempdict)
+        return glyph
+
+    def memoryReport(self):
+        """Returns dict comparing bytes used by table with former list of dicts holding same data"""
+        tokens = len(self.values)
+        tableBytes = sys.getsizeof(self.starts) + sys.getsizeof(self.ends) + sys.getsizeof(self.values) + sys.getsizeof(self.states)
+        # former layout - one dict per byte with 5 keys, hexdata string and boxed ints, plus list of lists of glyphs
+        sample = {'start' : 100000, 'end' : 100004, 'hexdata' : "0x00", 'state' : "inserted", 'line' : 1000}
+        perToken = sys.getsizeof(sample) + sys.getsizeof("0x00") + 3 * sys.getsizeof(100000) + sys.getsizeof(0) # dict + hexdata + start, end, line ints + list slot approx.
+        dictBytes = tokens * perToken + self.getGlyphCount() * sys.getsizeof([None] * max(self.bytewidth, 1))
+        return {"tokens" : tokens, "tableBytes" : tableBytes, "dictBytes" : dictBytes, "bytesPerToken" : (float(tableBytes) / tokens if tokens else 0.0), "ratio" : (float(dictBytes) / tableBytes if tableBytes else 0.0)}
+################################################################
+
+################################################################
+class GlyphListView():
+    """Read only list of lists of dicts built on demand from GlyphTable - compatibility accessor for former glyphList"""
+    def __init__(self, table, processing):
+        self.table = table
+        self.processing = processing # text and line index are taken from it at time of access
+
+    def __len__(self):
+        return self.table.getGlyphCount()
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0: index += len(self)
+        if index < 0 or index >= len(self): raise IndexError("glyph index out of range")
+        return self.table.glyphDicts(index, self.processing.textBuffer, self.processing.lineIndex) # slices of buffer, parsed text is not joined
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+################################################################
+
+################################################################
+class GlyphSlice():
+    """Writable view of bytes of one glyph inside GlyphTable.values, no copy
+    Items are ints on every python version and owner array can still be resized - unlike memoryview, writes stay pending until DataProcessing.commitValues"""
+    def __init__(self, table, first, end):
+        self.table = table
+        self.first = first # token index of first byte
+        self.end = end
+
+    def __len__(self):
+        return self.end - self.first
+
+    def __iter__(self):
+        return iter(self.table.values[self.first:self.end])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            return self.table.values[self.first + start:self.first + stop:step] if step > 0 else bytearray(list(self)[index])
+        return self.table.values[self.first + self.checkIndex(index)]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            positions = range(*index.indices(len(self)))
+            value = list(value)
+            if len(value) != len(positions): raise ValueError("glyph slice can not be resized")
+            for position, item in zip(positions, value):
+                self.table.writeValue(self.first + position, item & 0xFF)
+            return
+        self.table.writeValue(self.first + self.checkIndex(index), value & 0xFF)
+
+    def checkIndex(self, index):
+        """Returns index made positive, raises IndexError if out of glyph"""
+        if index < 0: index += len(self)
+        if index < 0 or index >= len(self): raise IndexError("glyph index out of range")
+        return index
+################################################################
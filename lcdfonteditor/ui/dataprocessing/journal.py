@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+from array import array
+from collections import deque
+
+################
+# CONSTANTS
+DEFAULT_CAPACITY = 1024 * 1024 # bytes of recorded steps, single pixel edit takes about 70 bytes
+STEP_OVERHEAD = 64 # estimated bytes of step dict itself
+
+################################################################
+class UndoJournal():
+    """Undo / redo history of font data kept as deltas, never as snapshots of text
+    Step is dict with kind - "values": tokens (token indexes), old, new (bytearrays of values)
+    or "insert" / "erase": position, count (columns of all glyphs), erase keeps removed values
+    Steps are applied by caller - see DataProcessing.applyStep, oldest steps are dropped over capacity"""
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity # bytes
+        self.undoSteps = deque() # oldest first
+        self.redoSteps = [] # newest undone last
+        self.size = 0 # bytes of all steps
+        self.merging = None # merge key of last step while it can still grow, eg. pixels painted by one drag
+        self.replaying = False # True while step gets applied - changes done by undo are not recorded
+        self.evictions = 0
+
+    ################
+    # RECORD
+    def recordValues(self, tokens, oldValues, newValues, merge=None):
+        """Record changed values, lists of token indexes, old and new values of same length
+        Step recorded with same merge key before seal grows instead of adding new step"""
+        if self.replaying or not tokens: return
+        last = self.undoSteps[-1] if self.undoSteps else None
+        if merge is not None and merge == self.merging and last is not None and last["kind"] == "values":
+            self.mergeValues(last, tokens, oldValues, newValues)
+            return
+        order = sorted(range(len(tokens)), key=tokens.__getitem__)
+        step = {"kind" : "values", "tokens" : array('I', [tokens[i] for i in order]), "old" : bytearray([oldValues[i] for i in order]), "new" : bytearray([newValues[i] for i in order])}
+        self.record(step, merge)
+
+    def recordColumns(self, kind, position, count, removed=None):
+        """Record insert or erase of count columns at column position of every glyph, removed - bytearray of erased values"""
+        if self.replaying: return
+        step = {"kind" : kind, "position" : position, "count" : count, "removed" : removed}
+        self.record(step, None)
+
+    def record(self, step, merge):
+        """Add step as newest, redo history is gone"""
+        self.dropRedo()
+        step["size"] = self.stepSize(step)
+        self.undoSteps.append(step)
+        self.size += step["size"]
+        self.merging = merge
+        self.evict()
+
+    def mergeValues(self, step, tokens, oldValues, newValues):
+        """Add values to step - first old value and last new value of every token are kept, tokens back at old value drop out"""
+        values = dict(zip(step["tokens"], zip(step["old"], step["new"])))
+        for tokenIndex, old, new in zip(tokens, oldValues, newValues):
+            if tokenIndex in values: values[tokenIndex] = (values[tokenIndex][0], new)
+            else: values[tokenIndex] = (old, new)
+        tokens = sorted([tokenIndex for tokenIndex in values if values[tokenIndex][0] != values[tokenIndex][1]])
+        self.undoSteps.pop()
+        self.size -= step["size"]
+        if not tokens: # stroke reverted itself
+            self.merging = None
+            return
+        step["tokens"] = array('I', tokens)
+        step["old"] = bytearray([values[tokenIndex][0] for tokenIndex in tokens])
+        step["new"] = bytearray([values[tokenIndex][1] for tokenIndex in tokens])
+        step["size"] = self.stepSize(step)
+        self.undoSteps.append(step)
+        self.size += step["size"]
+        self.evict()
+
+    def seal(self):
+        """End merging, next recorded change becomes new step - eg. on mouse up"""
+        self.merging = None
+
+    ################
+    # UNDO / REDO
+    def undo(self, apply):
+        """Apply last step reversed by apply(step, True), returns its result or None if nothing to undo"""
+        if not self.undoSteps: return None
+        step = self.undoSteps.pop()
+        self.merging = None
+        result = self.replay(apply, step, True)
+        self.redoSteps.append(step)
+        return result
+
+    def redo(self, apply):
+        """Apply last undone step again by apply(step, False), returns its result or None if nothing to redo"""
+        if not self.redoSteps: return None
+        step = self.redoSteps.pop()
+        self.merging = None
+        result = self.replay(apply, step, False)
+        self.undoSteps.append(step)
+        return result
+
+    def replay(self, apply, step, reverse):
+        """Call apply with recording off"""
+        self.replaying = True
+        try: return apply(step, reverse)
+        finally: self.replaying = False
+
+    def canUndo(self):
+        """Returns True if there is step to undo"""
+        return bool(self.undoSteps)
+
+    def canRedo(self):
+        """Returns True if there is step to redo"""
+        return bool(self.redoSteps)
+
+    ################
+    # MEMORY
+    def stepSize(self, step):
+        """Returns int estimated bytes of step"""
+        if step["kind"] == "values": return STEP_OVERHEAD + len(step["tokens"]) * step["tokens"].itemsize + len(step["old"]) + len(step["new"])
+        return STEP_OVERHEAD + len(step["removed"] or b"")
+
+    def evict(self):
+        """Drop oldest steps over capacity - ring of recent history"""
+        while self.size > self.capacity and self.undoSteps:
+            self.size -= self.undoSteps.popleft()["size"]
+            self.evictions += 1
+        if not self.undoSteps: self.merging = None
+
+    def dropRedo(self):
+        """Forget undone steps"""
+        for step in self.redoSteps: self.size -= step["size"]
+        self.redoSteps = []
+
+    def clear(self):
+        """Forget all steps - token indexes are no longer valid after text got parsed again"""
+        self.undoSteps.clear()
+        self.redoSteps = []
+        self.size = 0
+        self.merging = None
+
+    def setCapacity(self, capacity):
+        """Set memory cap in bytes, evicts oldest steps over it"""
+        self.capacity = capacity
+        self.evict()
+
+    def getStats(self):
+        """Returns dict with counts of steps and memory use"""
+        return {"undo" : len(self.undoSteps), "redo" : len(self.redoSteps), "size" : self.size, "capacity" : self.capacity, "evictions" : self.evictions}
+################################################################
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+from array import array
+from bisect import bisect_right
+
+################################################################
+class LineIndex():
+    def __init__(self, text=""):
+        self.lineStarts = array('I', [0]) # offset of first char of every line, line 0 starts at 0
+        self.textLength = 0
+        self.build(text)
+
+    ################
+    # BUILD
+    def build(self, text):
+        """Scan text once and store offsets where lines begin"""
+        lineStarts = array('I', [0])
+        find = text.find
+        position = find('\n')
+        while position != -1:
+            lineStarts.append(position + 1) # next line begins right after newline char
+            position = find('\n', position + 1)
+        self.lineStarts = lineStarts
+        self.textLength = len(text)
+
+    def update(self, regionStart, oldRegionEnd, regionText, textLength):
+        """Rescan only region of edited text, region [regionStart, oldRegionEnd) got replaced by regionText"""
+        delta = len(regionText) - (oldRegionEnd - regionStart)
+        lineStarts = self.lineStarts
+        first = bisect_right(lineStarts, regionStart) # line starts inside region or after it
+        last = bisect_right(lineStarts, oldRegionEnd) # line starts after region
+        regionStarts = array('I')
+        find = regionText.find
+        position = find('\n')
+        while position != -1:
+            regionStarts.append(regionStart + position + 1)
+            position = find('\n', position + 1)
+        tail = lineStarts[last:]
+        if delta: tail = array('I', [offset + delta for offset in tail]) # shift lines after edit
+        self.lineStarts = lineStarts[:first] + regionStarts + tail
+        self.textLength = textLength
+
+    def shift(self, offset, delta, textLength):
+        """Move lines starting after offset by delta - text without newlines got inserted or removed at offset"""
+        first = bisect_right(self.lineStarts, offset)
+        if delta: self.lineStarts[first:] = array('I', [start + delta for start in self.lineStarts[first:]])
+        self.textLength = textLength
+
+    ################
+    # QUERIES
+    def getLineCount(self):
+        """Returns int count of lines, empty text has one empty line"""
+        return len(self.lineStarts)
+
+    def lineOf(self, offset):
+        """Returns int zero based line containing offset, bisection over line starts"""
+        return bisect_right(self.lineStarts, offset) - 1
+
+    def offsetOf(self, line):
+        """Returns int offset of first char of line, lines beyond text are clamped to its end"""
+        if line < 0: return 0
+        if line >= len(self.lineStarts): return self.textLength
+        return self.lineStarts[line]
+
+    def lineColumnOf(self, offset):
+        """Returns tuple (line, column) of offset"""
+        line = self.lineOf(offset)
+        return (line, offset - self.lineStarts[line])
+################################################################
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# PAGED GLYPHS
+# Glyph of font higher than 8 pixels is stored column by column, every column has one byte per page - top page first:
+# column 0 page 0, column 0 page 1, ... column 1 page 0 ... Byte values of table are kept in this packed order,
+# column words (all pages of column in one int, bit 0 = top pixel) are assembled only where bits cross pages.
+
+################
+# GEOMETRY
+def pixelPosition(pages, x, y):
+    """Returns tuple (byte index in glyph, bit mask) of pixel x, y"""
+    return (x * pages + (y >> 3), 1 << (y & 7))
+
+def columnCount(byteCount, pages):
+    """Returns int count of whole columns in byteCount bytes"""
+    return byteCount // pages
+
+################
+# PIXELS - one byte operation per pixel
+def getPixel(data, pages, x, y):
+    """Returns True if pixel x, y of glyph data is set"""
+    index, mask = pixelPosition(pages, x, y)
+    return bool(data[index] & mask)
+
+def setPixel(data, pages, x, y, state):
+    """Set or clear pixel x, y of glyph data in place"""
+    index, mask = pixelPosition(pages, x, y)
+    if state: data[index] = data[index] | mask
+    else: data[index] = data[index] & ~mask & 0xFF
+
+def togglePixel(data, pages, x, y):
+    """Invert pixel x, y of glyph data in place"""
+    index, mask = pixelPosition(pages, x, y)
+    data[index] = data[index] ^ mask
+
+################
+# COLUMN WORDS
+def packColumns(data, pages):
+    """Returns list of ints - column words of glyph data, incomplete last column is dropped"""
+    if pages == 1: return list(data)
+    words = []
+    for first in range(0, len(data) - pages + 1, pages):
+        word = 0
+        for page in range(pages - 1, -1, -1): word = (word << 8) | data[first + page]
+        words.append(word)
+    return words
+
+def unpackColumns(words, pages):
+    """Returns list of ints - glyph bytes of column words"""
+    if pages == 1: return [word & 0xFF for word in words]
+    data = []
+    for word in words:
+        for page in range(pages):
+            data.append(word & 0xFF)
+            word >>= 8
+    return data
+
+def shiftColumns(data, pages, amount):
+    """Returns list of ints - glyph data moved by amount pixels down (negative up), bits fall out of glyph"""
+    mask = (1 << (8 * pages)) - 1
+    if amount >= 0: words = [(word << amount) & mask for word in packColumns(data, pages)]
+    else: words = [word >> -amount for word in packColumns(data, pages)]
+    return unpackColumns(words, pages) + list(data[len(words) * pages:]) # incomplete column kept as is
+
+################
+# WIDTH DETECTION
+def pagedWidth(widthDetection, pages):
+    """Returns int bytes per glyph from result of detectByteWidth for font with pages bytes per column
+    Most common width divisible by pages wins, if there is none lines are taken as single pages of glyph"""
+    width = widthDetection["width"]
+    if pages <= 1 or not width or width % pages == 0: return width
+    for alternative in widthDetection["alternatives"]:
+        if alternative["width"] % pages == 0: return alternative["width"]
+    return width * pages
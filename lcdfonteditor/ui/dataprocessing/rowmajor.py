@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+import struct
+
+################
+# HORIZONTAL DATA
+# Glyph of horizontal (row-major) font is stored row by row, every row has rowBytes bytes, bit 7 of first byte is leftmost pixel.
+# Editor renders and transforms column-major data (see pages), conversion goes by 8x8 blocks transposed through lookup tables:
+# every byte is spread to 64 bit word by one table lookup, 8 words shifted and or-ed give whole transposed block.
+
+################
+# TABLES
+ROW_SPREAD = [sum([((value >> (7 - x)) & 1) << (8 * x) for x in range(8)]) for value in range(256)] # row byte -> word, byte x has bit 0 set if pixel x is set
+COLUMN_SPREAD = [sum([((value >> y) & 1) << (8 * y + 7) for y in range(8)]) for value in range(256)] # column byte -> word, byte y has bit 7 set if pixel y is set
+BLOCK = struct.Struct("<Q") # word to 8 bytes, byte 0 first
+
+################
+# GEOMETRY
+def rowPixelPosition(rowBytes, x, y):
+    """Returns tuple (byte index in glyph, bit mask) of pixel x, y"""
+    return (y * rowBytes + (x >> 3), 0x80 >> (x & 7))
+
+def rowGeometry(glyphBytes, rowBytes):
+    """Returns tuple (columns, pages, height) of horizontal glyph - columns and pages of same glyph converted to vertical data"""
+    height = glyphBytes // rowBytes
+    return (rowBytes * 8, (height + 7) // 8, height)
+
+################
+# PIXELS - one byte operation per pixel
+def getRowPixel(data, rowBytes, x, y):
+    """Returns True if pixel x, y of glyph data is set"""
+    index, mask = rowPixelPosition(rowBytes, x, y)
+    return bool(data[index] & mask)
+
+def setRowPixel(data, rowBytes, x, y, state):
+    """Set or clear pixel x, y of glyph data in place"""
+    index, mask = rowPixelPosition(rowBytes, x, y)
+    if state: data[index] = data[index] | mask
+    else: data[index] = data[index] & ~mask & 0xFF
+
+def toggleRowPixel(data, rowBytes, x, y):
+    """Invert pixel x, y of glyph data in place"""
+    index, mask = rowPixelPosition(rowBytes, x, y)
+    data[index] = data[index] ^ mask
+
+################
+# 8x8 BLOCKS
+def transposeRows(rows):
+    """Returns 8 bytes - columns of block given as up to 8 row bytes, top row first"""
+    word = 0
+    for y, value in enumerate(rows): word |= ROW_SPREAD[value] << y
+    return BLOCK.pack(word)
+
+def transposeColumns(columns):
+    """Returns 8 bytes - rows of block given as up to 8 column bytes, leftmost column first"""
+    word = 0
+    for x, value in enumerate(columns): word |= COLUMN_SPREAD[value] >> x
+    return BLOCK.pack(word)
+
+################
+# WHOLE FONT - one pass, one transposed block per 64 pixels
+def rowsToColumns(data, rowBytes, height):
+    """Returns bytearray of vertical data (see pages) - rowBytes * 8 columns, (height + 7) // 8 pages per glyph
+    data - horizontal glyphs of height rows, incomplete last glyph is padded with zeros"""
+    glyphBytes = rowBytes * height
+    if not glyphBytes: return bytearray()
+    columns, pages, height = rowGeometry(glyphBytes, rowBytes)
+    data = bytearray(data)
+    data += bytearray(-len(data) % glyphBytes)
+    columnGlyphBytes = columns * pages
+    result = bytearray((len(data) // glyphBytes) * columnGlyphBytes)
+    for glyph in range(len(data) // glyphBytes):
+        source, target = glyph * glyphBytes, glyph * columnGlyphBytes
+        for page in range(pages):
+            rowsStart = source + page * 8 * rowBytes
+            rowsEnd = source + min(height, page * 8 + 8) * rowBytes
+            for block in range(rowBytes):
+                first = target + block * 8 * pages + page # column 8 * block, page
+                result[first:first + 8 * pages:pages] = transposeRows(data[rowsStart + block:rowsEnd:rowBytes])
+    return result
+
+def columnsToRows(data, columns, pages, rowBytes=None, height=None):
+    """Returns bytearray of horizontal data - rowBytes (enough for columns by default) bytes per row, height (8 * pages by default) rows per glyph
+    data - vertical glyphs of columns * pages bytes, incomplete last glyph is padded with zeros, columns over rowBytes * 8 and rows over height are dropped"""
+    columnGlyphBytes = columns * pages
+    if not columnGlyphBytes: return bytearray()
+    if rowBytes is None: rowBytes = (columns + 7) // 8
+    data = bytearray(data)
+    data += bytearray(-len(data) % columnGlyphBytes)
+    glyphBytes = rowBytes * 8 * pages
+    result = bytearray((len(data) // columnGlyphBytes) * glyphBytes)
+    for glyph in range(len(data) // columnGlyphBytes):
+        source, target = glyph * columnGlyphBytes, glyph * glyphBytes
+        for page in range(pages):
+            for block in range(min(rowBytes, (columns + 7) // 8)):
+                first = source + block * 8 * pages + page
+                last = source + min(columns, block * 8 + 8) * pages # end of columns of block
+                rowsStart = target + page * 8 * rowBytes + block
+                result[rowsStart:rowsStart + 8 * rowBytes:rowBytes] = transposeColumns(data[first:last:pages])
+    if height is None or height >= 8 * pages: return result
+    cropped = bytearray()
+    for target in range(0, len(result), glyphBytes): cropped += result[target:target + rowBytes * height]
+    return cropped
+################################################################
@@ -0,0 +1,155 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# CONSTANTS
+BLOCKSIZE = 4096 # chars per block, blocks twice as large get split
+
+################################################################
+class TextBuffer():
+    """Text split to blocks with lengths indexed by Fenwick tree - splices in O(log n + BLOCKSIZE), string is joined only when asked for"""
+    def __init__(self, text="", blockSize=BLOCKSIZE):
+        self.blockSize = blockSize
+        self.setText(text)
+
+    ################
+    # BUILD
+    def setText(self, text):
+        """Replace whole content"""
+        blocks = [text[i:i + self.blockSize] for i in range(0, len(text), self.blockSize)]
+        self.setBlocks(blocks or [""])
+        self.cache = text # materialized string, None when outdated
+
+    def setBlocks(self, blocks):
+        """Set list of blocks and build the tree of their lengths in linear time"""
+        self.blocks = blocks
+        count = len(blocks)
+        tree = [0] * (count + 1)
+        for index in range(1, count + 1):
+            tree[index] += len(blocks[index - 1])
+            parent = index + (index & -index)
+            if parent <= count: tree[parent] += tree[index]
+        self.tree = tree
+        self.length = sum(len(block) for block in blocks)
+        self.topStep = 1
+        while self.topStep * 2 <= count: self.topStep *= 2 # highest power of two for tree search
+
+    ################
+    # TREE
+    def addLength(self, blockIndex, delta):
+        """Add delta to length of block in tree"""
+        index = blockIndex + 1
+        tree, count = self.tree, len(self.blocks)
+        while index <= count:
+            tree[index] += delta
+            index += index & -index
+
+    def blockStart(self, blockIndex):
+        """Returns int offset of first char of block"""
+        total, index, tree = 0, blockIndex, self.tree
+        while index > 0:
+            total += tree[index]
+            index -= index & -index
+        return total
+
+    def locate(self, offset):
+        """Returns tuple (block index, offset inside block) of offset, end of text maps to end of last block"""
+        if offset >= self.length:
+            last = len(self.blocks) - 1
+            return (last, len(self.blocks[last]))
+        position, remaining, step, tree, count = 0, offset, self.topStep, self.tree, len(self.blocks)
+        while step:
+            if position + step <= count and tree[position + step] <= remaining:
+                position += step
+                remaining -= tree[position]
+            step >>= 1
+        return (position, remaining) # empty blocks are skipped, offset is inside block at position
+
+    ################
+    # EDIT
+    def splice(self, start, end, text):
+        """Replace chars from start up to end with text"""
+        if start == end and not text: return
+        firstBlock, firstOffset = self.locate(start)
+        lastBlock, lastOffset = self.locate(end)
+        blocks = self.blocks
+        newBlock = blocks[firstBlock][:firstOffset] + text + blocks[lastBlock][lastOffset:]
+        for blockIndex in range(firstBlock + 1, lastBlock + 1):
+            # blocks covered by splice get emptied, their content moved to first one
+            self.addLength(blockIndex, -len(blocks[blockIndex]))
+            blocks[blockIndex] = ""
+        self.addLength(firstBlock, len(newBlock) - len(blocks[firstBlock]))
+        blocks[firstBlock] = newBlock
+        self.length += len(text) - (end - start)
+        self.cache = None
+        if len(newBlock) > 2 * self.blockSize:
+            # split large block and rebuild tree, rare - amortized
+            pieces = [newBlock[i:i + self.blockSize] for i in range(0, len(newBlock), self.blockSize)]
+            self.setBlocks(blocks[:firstBlock] + pieces + blocks[firstBlock + 1:])
+
+    ################
+    # READ
+    def getText(self):
+        """Returns str - whole text, joined once after edits"""
+        if self.cache is None:
+            self.cache = "".join(self.blocks)
+            if len(self.blocks) > 1 and len(self.cache) <= self.blockSize: self.setText(self.cache) # drop emptied blocks
+        return self.cache
+
+    def getSlice(self, start, end):
+        """Returns str - part of text without joining the whole"""
+        if self.cache is not None: return self.cache[start:end]
+        start, end = max(0, min(start, self.length)), max(0, min(end, self.length))
+        if start >= end: return ""
+        firstBlock, firstOffset = self.locate(start)
+        lastBlock, lastOffset = self.locate(end)
+        if firstBlock == lastBlock: return self.blocks[firstBlock][firstOffset:lastOffset]
+        return "".join([self.blocks[firstBlock][firstOffset:]] + self.blocks[firstBlock + 1:lastBlock] + [self.blocks[lastBlock][:lastOffset]])
+
+    def chunks(self):
+        """Yields parts of text in order - for streaming writes without joining"""
+        if self.cache is not None:
+            yield self.cache
+            return
+        for block in self.blocks:
+            if block: yield block
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, end, step = index.indices(self.length)
+            if step != 1: return self.getText()[index]
+            return self.getSlice(start, end)
+        if index < 0: index += self.length
+        if index < 0 or index >= self.length: raise IndexError("text index out of range")
+        blockIndex, offset = self.locate(index)
+        return self.blocks[blockIndex][offset]
+################################################################
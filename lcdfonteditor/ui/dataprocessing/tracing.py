@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+import functools
+import json
+import math
+import os
+import time
+
+try: timer = time.perf_counter
+except AttributeError: timer = time.time # python 2
+
+################
+# CONSTANTS
+TRACE_ENVIRONMENT = "LCDFONTEDITOR_TRACE" # set to file path - tracing on from start, histogram written there by writeReport
+
+################################################################
+class Lazy():
+    """Part of debug message evaluated only when printed, eg. Lazy(lambda: self.parsedText) - costs nothing with debug off"""
+    __slots__ = ("function",)
+    def __init__(self, function):
+        self.function = function
+
+    def __str__(self):
+        return str(self.function())
+
+################################################################
+class NullSpan():
+    """Span of disabled tracer - does nothing"""
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exception):
+        return False
+
+NULL_SPAN = NullSpan()
+
+################################################################
+class Span():
+    """Times block of with statement, see Tracer.span"""
+    __slots__ = ("tracer", "name", "started")
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.started = timer()
+        return self
+
+    def __exit__(self, *exception):
+        self.tracer.record(self.name, timer() - self.started)
+        return False
+
+################################################################
+class Tracer():
+    """Named timing spans collected to latency histograms - power of two buckets of microseconds
+    Disabled tracer only checks one attribute per span, traced functions run directly"""
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.spans = {} # name -> dict count, total, min, max, buckets (bit length of microseconds -> count)
+
+    ################
+    # SPANS
+    def span(self, name):
+        """Returns context manager timing its block under name"""
+        if not self.enabled: return NULL_SPAN
+        return Span(self, name)
+
+    def record(self, name, seconds):
+        """Add one measurement of span name"""
+        span = self.spans.get(name)
+        if span is None:
+            span = self.spans[name] = {"count" : 0, "total" : 0.0, "min" : seconds, "max" : seconds, "buckets" : {}}
+        span["count"] += 1
+        span["total"] += seconds
+        if seconds < span["min"]: span["min"] = seconds
+        if seconds > span["max"]: span["max"] = seconds
+        bucket = math.frexp(int(seconds * 1000000))[1] # 0: < 1 us, n: < 2**n us - exponent equals int.bit_length, missing on python 2.6
+        span["buckets"][bucket] = span["buckets"].get(bucket, 0) + 1
+
+    ################
+    # STATE
+    def enable(self, enabled=True):
+        """Switch tracing on or off, collected spans stay"""
+        self.enabled = enabled
+
+    def isEnabled(self):
+        """Returns True if spans are collected"""
+        return self.enabled
+
+    def reset(self):
+        """Drop collected spans"""
+        self.spans = {}
+
+    ################
+    # REPORT
+    def getHistogram(self):
+        """Returns dict span name -> dict count, mean, min, max, p50, p90, p99 in seconds and buckets - list of (upper bound seconds, count)
+        Percentiles are upper bounds of buckets, at most max"""
+        histogram = {}
+        for name, span in self.spans.items():
+            buckets = sorted(span["buckets"].items())
+            histogram[name] = {"count" : span["count"], "total" : span["total"], "mean" : span["total"] / span["count"], "min" : span["min"], "max" : span["max"],
+                "p50" : min(span["max"], percentile(buckets, span["count"], 0.50)), "p90" : min(span["max"], percentile(buckets, span["count"], 0.90)), "p99" : min(span["max"], percentile(buckets, span["count"], 0.99)),
+                "buckets" : [(bucketBound(bucket), count) for bucket, count in buckets]}
+        return histogram
+
+    def formatReport(self):
+        """Returns list of str lines - one per span, slowest total first"""
+        histogram = self.getHistogram()
+        lines = ["%-28s %8s %10s %10s %10s %10s %10s" % ("span", "count", "total ms", "mean ms", "p50 ms", "p99 ms", "max ms")]
+        for name in sorted(histogram, key=lambda name: -histogram[name]["total"]):
+            span = histogram[name]
+            lines.append("%-28s %8d %10.3f %10.3f %10.3f %10.3f %10.3f" % (name, span["count"], span["total"] * 1000, span["mean"] * 1000, span["p50"] * 1000, span["p99"] * 1000, span["max"] * 1000))
+        return lines
+
+    def writeReport(self, path):
+        """Write histogram as JSON to path"""
+        stream = open(path, "w")
+        try: json.dump(self.getHistogram(), stream, indent=1, sort_keys=True)
+        finally: stream.close()
+
+################
+# HELPERS
+def bucketBound(bucket):
+    """Returns float upper bound of histogram bucket in seconds"""
+    return (1 << bucket) / 1000000.0
+
+def percentile(buckets, count, fraction):
+    """Returns float upper bound of bucket holding given fraction of measurements, buckets sorted list of (bucket, count)"""
+    wanted = fraction * count
+    seen = 0
+    for bucket, bucketCount in buckets:
+        seen += bucketCount
+        if seen >= wanted: return bucketBound(bucket)
+    return bucketBound(buckets[-1][0]) if buckets else 0.0
+
+################
+# SHARED TRACER
+TRACER = Tracer(bool(os.environ.get(TRACE_ENVIRONMENT)))
+
+def traced(name):
+    """Decorator timing every call of function as span name, disabled tracer costs one attribute check"""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not TRACER.enabled: return function(*args, **kwargs)
+            started = timer()
+            try: return function(*args, **kwargs)
+            finally: TRACER.record(name, timer() - started)
+        return wrapper
+    return decorate
+################################################################
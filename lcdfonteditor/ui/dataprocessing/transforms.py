@@ -0,0 +1,152 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+from .pages import shiftColumns
+from .rowmajor import columnsToRows
+
+try:
+    import numpy # optional - whole font transformed by array operations
+except ImportError:
+    numpy = None
+
+################
+# CONSTANTS
+SHIFT_UP, SHIFT_DOWN, SHIFT_LEFT, SHIFT_RIGHT = "shift-up", "shift-down", "shift-left", "shift-right"
+FLIP_HORIZONTAL, FLIP_VERTICAL = "flip-horizontal", "flip-vertical"
+ROTATE_CW, ROTATE_CCW, ROTATE_180 = "rotate-cw", "rotate-ccw", "rotate-180"
+INVERT, BOLD = "invert", "bold"
+OPERATIONS = (SHIFT_UP, SHIFT_DOWN, SHIFT_LEFT, SHIFT_RIGHT, FLIP_HORIZONTAL, FLIP_VERTICAL, ROTATE_CW, ROTATE_CCW, ROTATE_180, INVERT, BOLD)
+
+# byte tables - bit 0 is top pixel of page
+REVERSED_BITS = bytearray([int("{0:08b}".format(value)[::-1], 2) for value in range(256)])
+INVERTED_BITS = bytearray([value ^ 0xFF for value in range(256)])
+SHIFTED_UP = [bytearray([value >> amount for value in range(256)]) for amount in range(9)] # by amount pixels
+SHIFTED_DOWN = [bytearray([(value << amount) & 0xFF for value in range(256)]) for amount in range(9)]
+
+################################################################
+# TRANSFORM ENGINE - data is contiguous buffer of whole glyphs, every glyph has columns * pages bytes, see pages
+def transformGlyphs(data, columns, pages, operation, amount=1, useNumpy=True):
+    """Returns bytearray of same length as data with operation applied to every glyph, glyph box stays - pixels moved out are dropped
+    amount - pixels of shift or bold, ignored by other operations"""
+    if operation not in OPERATIONS: raise ValueError("unknown transform: %s" % operation)
+    data = bytearray(data)
+    if not data or not columns: return data
+    if useNumpy and numpy is not None: return transformNumpy(data, columns, pages, operation, amount)
+    return transformTables(data, columns, pages, operation, amount)
+
+def rotationSource(operation, columns, height, x, y):
+    """Returns tuple (x, y) of pixel moved to x, y by rotation, may lie outside glyph box"""
+    if operation == ROTATE_CW: return (y, height - 1 - x)
+    if operation == ROTATE_CCW: return (columns - 1 - y, x)
+    return (columns - 1 - x, height - 1 - y) # ROTATE_180
+
+################
+# PURE PYTHON - byte tables applied by bytearray.translate and strided slices, no loop over bytes in python where avoidable
+def transformTables(data, columns, pages, operation, amount):
+    """Returns bytearray - see transformGlyphs"""
+    stride = columns * pages # bytes per glyph
+    if operation == INVERT: return data.translate(INVERTED_BITS)
+    if operation in (SHIFT_UP, SHIFT_DOWN):
+        if amount >= 8 * pages: return bytearray(len(data))
+        if pages == 1: return data.translate(SHIFTED_UP[amount] if operation == SHIFT_UP else SHIFTED_DOWN[amount])
+        return bytearray(shiftColumns(data, pages, -amount if operation == SHIFT_UP else amount)) # bits cross pages in column words
+    if operation == FLIP_VERTICAL:
+        flipped = data.translate(REVERSED_BITS)
+        if pages == 1: return flipped
+        result = bytearray(len(data))
+        for page in range(pages): result[page::pages] = flipped[pages - 1 - page::pages] # page order reversed in every column
+        return result
+    if operation == ROTATE_180: return transformTables(transformTables(data, columns, pages, FLIP_HORIZONTAL, amount), columns, pages, FLIP_VERTICAL, amount)
+    result = bytearray(len(data))
+    if operation == FLIP_HORIZONTAL:
+        for column in range(columns): moveColumn(result, data, columns - 1 - column, column, pages, stride)
+    elif operation == SHIFT_LEFT:
+        for column in range(amount, columns): moveColumn(result, data, column, column - amount, pages, stride)
+    elif operation == SHIFT_RIGHT:
+        for column in range(columns - amount): moveColumn(result, data, column, column + amount, pages, stride)
+    elif operation == BOLD:
+        result[:] = data
+        for column in range(1, columns):
+            for distance in range(1, min(amount, column) + 1): # columns on the left smeared right
+                for page in range(pages):
+                    target, source = column * pages + page, (column - distance) * pages + page
+                    result[target::stride] = bytearray([a | b for a, b in zip(result[target::stride], data[source::stride])])
+    else: # quarter turns - pixel rows of glyph become columns, transposed by 8x8 block tables of rowmajor
+        if operation == ROTATE_CCW: data = transformTables(data, columns, pages, FLIP_HORIZONTAL, amount)
+        height = 8 * pages
+        # one row of pages bytes, leftmost pixel in bit 0 - same bytes as column of glyph turned, columns over height drop out
+        transposed = columnsToRows(data, columns, pages, pages).translate(REVERSED_BITS)
+        transposedStride = height * pages
+        for column in range(columns):
+            source = height - 1 - column if operation == ROTATE_CW else column # row of original glyph
+            if 0 <= source < height:
+                for page in range(pages): result[column * pages + page::stride] = transposed[source * pages + page::transposedStride]
+    return result
+
+def moveColumn(result, data, source, target, pages, stride):
+    """Copy column source of every glyph of data to column target of result - one strided slice per page"""
+    for page in range(pages): result[target * pages + page::stride] = data[source * pages + page::stride]
+
+################
+# NUMPY - glyphs as array of shape (glyphs, columns, pages)
+def transformNumpy(data, columns, pages, operation, amount):
+    """Returns bytearray - see transformGlyphs"""
+    glyphs = numpy.frombuffer(bytes(data), dtype=numpy.uint8).reshape(-1, columns, pages)
+    if operation == INVERT: result = ~glyphs
+    elif operation in (SHIFT_UP, SHIFT_DOWN):
+        if amount >= 8 * pages: return bytearray(len(data))
+        shifts = numpy.arange(pages, dtype=numpy.uint64) * 8
+        words = (glyphs.astype(numpy.uint64) << shifts).sum(axis=2, dtype=numpy.uint64) # column words, pages never overlap
+        if operation == SHIFT_UP: words = words >> numpy.uint64(amount)
+        else: words = (words << numpy.uint64(amount)) & numpy.uint64((1 << (8 * pages)) - 1)
+        result = ((words[:, :, None] >> shifts) & numpy.uint64(0xFF)).astype(numpy.uint8)
+    elif operation == FLIP_VERTICAL: result = numpy.frombuffer(bytes(REVERSED_BITS), dtype=numpy.uint8)[glyphs][:, :, ::-1]
+    elif operation == FLIP_HORIZONTAL: result = glyphs[:, ::-1, :]
+    elif operation in (SHIFT_LEFT, SHIFT_RIGHT):
+        result = numpy.zeros_like(glyphs)
+        if amount < columns:
+            if operation == SHIFT_LEFT: result[:, :columns - amount] = glyphs[:, amount:]
+            else: result[:, amount:] = glyphs[:, :columns - amount]
+    elif operation == BOLD:
+        result = glyphs.copy()
+        for distance in range(1, min(amount, columns - 1) + 1): result[:, distance:] |= glyphs[:, :columns - distance]
+    else: # rotations - pixels gathered by source map shared with pure python version
+        height = 8 * pages
+        reversedBits = numpy.frombuffer(bytes(REVERSED_BITS), dtype=numpy.uint8) # bit 0 first from default big-endian unpack, bitorder needs numpy 1.17
+        pixels = numpy.unpackbits(reversedBits[glyphs][:, :, :, None], axis=3).reshape(-1, columns, height)
+        x, y = numpy.meshgrid(numpy.arange(columns), numpy.arange(height), indexing="ij")
+        sourceX, sourceY = rotationSource(operation, columns, height, x, y)
+        inside = (sourceX >= 0) & (sourceX < columns) & (sourceY >= 0) & (sourceY < height)
+        rotated = numpy.zeros_like(pixels)
+        rotated[:, inside] = pixels[:, sourceX[inside], sourceY[inside]]
+        result = reversedBits[numpy.packbits(rotated.reshape(-1, columns, pages, 8), axis=3)[:, :, :, 0]]
+    return bytearray(numpy.ascontiguousarray(result, dtype=numpy.uint8).tobytes())
+################################################################
@@ -30,6 +30,9 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ################
 # IMPORTS
 import wx
+from rasterizer import Rasterizer, ROLE_EMPTY
+from dataprocessing.tracing import traced
+from dataprocessing.rowmajor import rowsToColumns, rowGeometry
 
 ################################################################
 class FontWidget(wx.Panel):
@@ -44,12 +47,14 @@ class FontWidget(wx.Panel):
         self.glyphsVertical = 16 # initial, gets set after input got parsed
         self.pixel_diameter = self.modes[self.selectedMode]["zoom"] # how large is a pixel aka zoom
         self.font_bytewidth = bytewidth # bytes per glyph
-        self.data = [0] * (self.fieldSize * self.font_bytewidth) # initial placeholder data, gets loaded after input got parsed
+        self.font_pages = 1 # bytes per column, font height is 8 pixels per page
+        self.font_rowbytes = 0 # bytes per pixel row of horizontal data, 0 - vertical data
+        self.data = bytearray(self.fieldSize * self.font_bytewidth) # initial placeholder data, gets replaced by font model after input got parsed
         self.highlightedCell = (0, 0)
         self.selectedCell = (0, 0)
         # Panel size
-        self.width = bytewidth * self.glyphsHorizontal * self.pixel_diameter
-        self.height = 8 * self.glyphsVertical * self.pixel_diameter
+        self.width = self.getCellWidth() * self.glyphsHorizontal
+        self.height = self.getCellHeight() * self.glyphsVertical
         # Init panel
         wx.Panel.__init__(self, parent, size=(self.width, self.height))
         self.parent = parent
@@ -60,6 +65,9 @@ class FontWidget(wx.Panel):
         self.colourActiveNormal = "#FFFFFF" # DEFAULT
         self.colourActiveSelected = "#FF0000" # DEFAULT
         self.colourActiveHighlight = "#00FF00" # DEFAULT
+        self.rasterizer = Rasterizer() # keeps lookup tables for used colours and modes
+        self.glyphCache = self.mainwindow.glyphCache # rendered cells shared with glyph widget
+        self.CACHED_CELLS_LIMIT = 64 # larger dirty areas are rendered in one pass instead of blit per cell
         # Bind events
         self.Bind(wx.EVT_PAINT, self.OnPaint)
         self.Bind(wx.EVT_LEFT_DOWN, self.onMouseDown)
@@ -74,12 +82,49 @@ class FontWidget(wx.Panel):
         """Set font width"""
         self.font_bytewidth = bytewidth
         # update values, resize panel and layout its sizer
-        self.width = self.font_bytewidth * self.glyphsHorizontal * self.pixel_diameter
-        self.height = 8 * self.glyphsVertical * self.pixel_diameter # 8 hardcoded! -> byte len = font height
+        self.width = self.getCellWidth() * self.glyphsHorizontal
+        self.height = self.getCellHeight() * self.glyphsVertical
         self.SetMinSize(wx.Size(self.width, self.height))
         self.GetParent().Layout()
         self.GetParent().GetParent().Layout()
 
+    def setPages(self, pages):
+        """Set bytes per column - font height / 8"""
+        self.font_pages = pages
+        # update values, resize panel and layout its sizer
+        self.width = self.getCellWidth() * self.glyphsHorizontal
+        self.height = self.getCellHeight() * self.glyphsVertical
+        self.SetMinSize(wx.Size(self.width, self.height))
+        self.GetParent().Layout()
+        self.GetParent().GetParent().Layout()
+
+    def setLayout(self, rowBytes):
+        """Set bytes per pixel row of horizontal data, 0 - vertical data"""
+        self.font_rowbytes = rowBytes
+        # update values, resize panel and layout its sizer
+        self.width = self.getCellWidth() * self.glyphsHorizontal
+        self.height = self.getCellHeight() * self.glyphsVertical
+        self.SetMinSize(wx.Size(self.width, self.height))
+        self.GetParent().Layout()
+        self.GetParent().GetParent().Layout()
+
+    def getRenderGeometry(self):
+        """Returns tuple (bytes per glyph, pages) of rendered vertical data - horizontal data gets converted by rowsToColumns"""
+        if self.font_rowbytes:
+            columns, pages, height = rowGeometry(self.font_bytewidth, self.font_rowbytes)
+            pages = max(pages, 1) # glyph narrower than one row
+            return (columns * pages, pages)
+        return (self.font_bytewidth, self.font_pages)
+
+    def getCellWidth(self):
+        """Returns int width of glyph cell in screen pixels"""
+        bytewidth, pages = self.getRenderGeometry()
+        return (bytewidth // pages) * self.pixel_diameter
+
+    def getCellHeight(self):
+        """Returns int height of glyph cell in screen pixels"""
+        return 8 * self.getRenderGeometry()[1] * self.pixel_diameter
+
     def setFieldSize(self, size):
         """Set field size"""
         if size < 1:
@@ -99,8 +144,8 @@ class FontWidget(wx.Panel):
         self.glyphsHorizontal, self.glyphsVertical = glyphsHorizontal, glyphsVertical
         self.debug("FontWidget", "> new size", size, "> set to", self.glyphsHorizontal, "x", self.glyphsVertical)
         # Calculate size, resize panel and layout its sizer
-        self.width = self.font_bytewidth * self.glyphsHorizontal * self.pixel_diameter
-        self.height = 8 * self.glyphsVertical * self.pixel_diameter # 8 hardcoded! -> byte len = font height
+        self.width = self.getCellWidth() * self.glyphsHorizontal
+        self.height = self.getCellHeight() * self.glyphsVertical
         self.SetMinSize(wx.Size(self.width, self.height))
         self.GetParent().Layout()
         self.GetParent().GetParent().Layout()
@@ -111,6 +156,10 @@ class FontWidget(wx.Panel):
         self.colourActiveSelected = selected
         self.colourActiveHighlight = highlight
 
+    def refreshGlyph(self, index):
+        """Refresh only cell of glyph, data is shared font model - already holds new values"""
+        self.refreshCell(self.indexToCell(index))
+
     ################
     # SET AND GET INDEX
     def setSelectedIndex(self, index):
@@ -136,8 +185,8 @@ class FontWidget(wx.Panel):
         # Panel size
         self.pixel_diameter = self.modes[self.selectedMode]["zoom"]
         # Calculate size, resize panel and layout its sizer
-        self.width = self.font_bytewidth * self.glyphsHorizontal * self.pixel_diameter
-        self.height = 8 * self.glyphsVertical * self.pixel_diameter # 8 hardcoded! -> byte len = font height
+        self.width = self.getCellWidth() * self.glyphsHorizontal
+        self.height = self.getCellHeight() * self.glyphsVertical
         self.SetMinSize(wx.Size(self.width, self.height))
         self.GetParent().Layout()
         self.GetParent().GetParent().Layout()
@@ -149,6 +198,7 @@ class FontWidget(wx.Panel):
 
     ################
     # PAINT EVENT
+    @traced("FontWidget.OnPaint")
     def OnPaint(self, event):
         """Event paint"""
         # return if no data to display
@@ -156,51 +206,71 @@ class FontWidget(wx.Panel):
         else: return
         self.debug("FontWidget", "Event", "Paint")
         dc = wx.PaintDC(self)
-        dc.SetAxisOrientation(True, False)
-
-        for gy in range(0, self.glyphsVertical):
-          for gx in range(0, self.glyphsHorizontal):
-            pixelColour = self.colourActiveNormal # DEFAULT "#FFFFFF"
-            backColour = "#000000"
-
-            if (gx, gy) == self.highlightedCell:
-                pixelColour = self.colourActiveHighlight # DEFAULT "#00FF00"
-                backColour = "#666666" # bylo 333
-
-            if (gx, gy) == self.selectedCell:
-                pixelColour = self.colourActiveSelected # DEFAULT "#FF0000"
-                backColour = "#333333"
-
-            #if self.cellToIndex((gx, gy)) > (self.fieldSize - 1):
-
-            for xx in range(0, self.font_bytewidth):
-              indexx = ((gy * (self.font_bytewidth * self.glyphsHorizontal))+ (self.font_bytewidth * gx)) +xx
-              if indexx < len(self.data):
-                  data = self.data[((gy * (self.font_bytewidth * self.glyphsHorizontal))+ (self.font_bytewidth * gx)) +xx] # may not get out of range
-              else:
-                  data = 0
-                  # mark where is no data > when are one or more items on next line, like 17 glyphs, 16 on line1 , 1 on line2 + 15 empty grey marked
-                  pixelColour = "#4f5049"
-                  backColour = "#4f5049"
-              #self.debug("index", indexx, "data", data)
-              if isinstance(data, str):
-                data = int(data, 16) # int conversion done here, init can be done with list of ints, new data can be given as list of hex strings
-              #self.debug("data type>>>>>>>>>>>", str(type(data)))
-              for yy in range(0, 8):
-                currentColour = backColour
-                if (data & (1<<(yy))) :
-                    currentColour = pixelColour
-                    # drawing only active pixels was not much faster on Atom - left for future tests
-                    #dc.SetPen(wx.Pen(currentColour)) # single pixel colour
-                    #dc.SetBrush(wx.Brush(currentColour)) #
-                    #dc.DrawRectangle((gx*self.font_bytewidth * self.pixel_diameter)+(xx * self.pixel_diameter), (gy*8 * self.pixel_diameter)+(yy * self.pixel_diameter), self.pixel_diameter, self.pixel_diameter)
-                    #dc.DrawPoint((gx*self.font_bytewidth * self.pixel_diameter)+(xx * self.pixel_diameter), (gy*8 * self.pixel_diameter)+(yy * self.pixel_diameter))
-                dc.SetPen(wx.Pen(currentColour))
-                dc.SetBrush(wx.Brush(currentColour))
-                if self.modes[self.selectedMode]["method"] == 0: dc.DrawPoint((gx*self.font_bytewidth * self.pixel_diameter)+(xx * self.pixel_diameter), (gy*8 * self.pixel_diameter)+(yy * self.pixel_diameter))
-                elif self.modes[self.selectedMode]["method"] == 1: dc.DrawRectangle((gx*self.font_bytewidth * self.pixel_diameter)+(xx * self.pixel_diameter), (gy*8 * self.pixel_diameter)+(yy * self.pixel_diameter), self.pixel_diameter, self.pixel_diameter)
-                
-                
+        data = self.data
+        if isinstance(data[0], str):
+            data = [int(item, 16) for item in data] # new data can be given as list of hex strings
+        roles = self.getRoles()
+        cellRoles = self.getCellRoles()
+        # redraw only cells intersecting update region - hover and selection invalidate just their cells
+        regionIterator = wx.RegionIterator(self.GetUpdateRegion())
+        while regionIterator.HaveRects():
+            cells = self.rectToCells(regionIterator.GetRect())
+            regionIterator.Next()
+            if cells is None: continue
+            firstX, firstY, endX, endY = cells
+            if (endX - firstX) * (endY - firstY) <= self.CACHED_CELLS_LIMIT:
+                # few cells - blit bitmaps of glyph cache
+                for cell_y in range(firstY, endY):
+                    for cell_x in range(firstX, endX):
+                        dc.DrawBitmap(self.getCellBitmap(data, (cell_x, cell_y), roles, cellRoles), cell_x * self.getCellWidth(), cell_y * self.getCellHeight())
+            else:
+                # large area - one pass over all cells is faster than blit per cell
+                dc.DrawBitmap(self.renderBitmap(data, cells, roles, cellRoles), firstX * self.getCellWidth(), firstY * self.getCellHeight())
+
+    def renderBitmap(self, data, cells, roles, cellRoles):
+        """Returns wx.Bitmap of cells (first x, first y, end x, end y)"""
+        mode = self.modes[self.selectedMode]
+        bytewidth, pages = self.getRenderGeometry()
+        if self.font_rowbytes:
+            # convert glyph rows of cells only, cells get numbered from first converted glyph
+            firstX, firstY, endX, endY = cells
+            first, end = firstY * self.glyphsHorizontal, endY * self.glyphsHorizontal
+            data = rowsToColumns(data[first * self.font_bytewidth:end * self.font_bytewidth], self.font_rowbytes, max(self.font_bytewidth // self.font_rowbytes, 1))
+            cells = (firstX, 0, endX, endY - firstY)
+            cellRoles = dict([(index - first, role) for index, role in cellRoles.items()])
+        width, height, buffer = self.rasterizer.renderCells(data, bytewidth, self.glyphsHorizontal, cells, mode["zoom"], mode["method"], roles, cellRoles, self.colourToRGB("#000000"), pages)
+        image = wx.ImageFromBuffer(width, height, buffer) # wraps buffer, no copy - buffer must live until converted
+        return image.ConvertToBitmap()
+
+    def getCellBitmap(self, data, cell, roles, cellRoles):
+        """Returns wx.Bitmap of single cell from glyph cache, renders it on miss"""
+        index = self.cellToIndex(cell)
+        role = cellRoles.get(index, "normal")
+        start = index * self.font_bytewidth
+        mode = self.modes[self.selectedMode]
+        key = (bytes(bytearray(data[start:start + self.font_bytewidth])), self.font_bytewidth, self.font_pages, self.font_rowbytes, mode["zoom"], mode["method"], role, roles[role]) # glyph bytes first - see GlyphCache.invalidate
+        bitmap = self.glyphCache.get(key)
+        if bitmap is None:
+            bitmap = self.renderBitmap(data, (cell[0], cell[1], cell[0] + 1, cell[1] + 1), roles, cellRoles)
+            self.glyphCache.put(key, bitmap, bitmap.GetWidth() * bitmap.GetHeight() * 3)
+        return bitmap
+
+    def getRoles(self):
+        """Returns dict role name -> tuple (pixel colour, background colour) as RGB tuples"""
+        return {
+            "normal" : (self.colourToRGB(self.colourActiveNormal), self.colourToRGB("#000000")),
+            "highlight" : (self.colourToRGB(self.colourActiveHighlight), self.colourToRGB("#666666")),
+            "selected" : (self.colourToRGB(self.colourActiveSelected), self.colourToRGB("#333333")),
+            ROLE_EMPTY : (self.colourToRGB("#4f5049"), self.colourToRGB("#4f5049")) # mark where is no data, like 17 glyphs > 15 empty grey marked
+        }
+
+    def getCellRoles(self):
+        """Returns dict cell index -> role name of highlighted and selected cell"""
+        cellRoles = {}
+        if self.highlightedCell is not None: cellRoles[self.cellToIndex(self.highlightedCell)] = "highlight"
+        if self.selectedCell is not None: cellRoles[self.cellToIndex(self.selectedCell)] = "selected" # selected wins over highlighted
+        return cellRoles
+
     ################
     # MOUSE EVENTS
     def onMouseEnter(self, event):
@@ -211,7 +281,9 @@ class FontWidget(wx.Panel):
     def onMouseLeave(self, event):
         """Event mouse left widget"""
         self._mouseIn = False
+        previousHighlighted = self.highlightedCell
         self.highlightedCell = None
+        self.refreshCell(previousHighlighted)
         self.debug("FontWidget", "Event", "MouseLeave")
 
     def onMouseMove(self, event):
@@ -237,7 +309,8 @@ class FontWidget(wx.Panel):
 
         if self.highlightedCell != previousHighlighted:
             self.debug("FontWidget", "Event", "MouseMove", "previousHighlighted", previousHighlighted, "current highlightedCell", self.highlightedCell, "> refresh")
-            self.Refresh()
+            self.refreshCell(previousHighlighted)
+            self.refreshCell(self.highlightedCell)
 
 
     def onMouseDown(self, event):
@@ -265,23 +338,49 @@ class FontWidget(wx.Panel):
         # new
         self.debug("FontWidget", "Event", "MouseUp > pixel",pt, "> index", selected, "> cell", self.indexToCell(selected))
         self.debug("FontWidget", "info:", "Selected glyph index >", selected)
+        previousSelected = self.selectedCell
         self.selectedCell = self.indexToCell(selected)
-        self.Refresh()
+        if self.selectedCell != previousSelected:
+            self.refreshCell(previousSelected)
+            self.refreshCell(self.selectedCell)
+
+    ################
+    # DIRTY CELLS
+    def refreshCell(self, cell):
+        """Invalidate area of single cell, None is ignored"""
+        if cell is None: return
+        self.RefreshRect(self.cellToRect(cell), False) # no background erase - cell gets fully covered
+
+    def cellToRect(self, cell):
+        """Returns wx.Rect covering cell"""
+        cell_x, cell_y = cell
+        cellWidth, cellHeight = self.getCellWidth(), self.getCellHeight()
+        return wx.Rect(cell_x * cellWidth, cell_y * cellHeight, cellWidth, cellHeight)
+
+    def rectToCells(self, rect):
+        """Returns tuple (first x, first y, end x, end y) of cells intersecting wx.Rect, None if there is none"""
+        cellWidth, cellHeight = self.getCellWidth(), self.getCellHeight()
+        firstX = max(rect.GetX() // cellWidth, 0)
+        firstY = max(rect.GetY() // cellHeight, 0)
+        endX = min((rect.GetX() + rect.GetWidth() - 1) // cellWidth + 1, self.glyphsHorizontal)
+        endY = min((rect.GetY() + rect.GetHeight() - 1) // cellHeight + 1, self.glyphsVertical)
+        if firstX >= endX or firstY >= endY: return None
+        return (firstX, firstY, endX, endY)
 
     ################
     # HELPERS
     def screenPositionToCell(self, pt):
         """Returns tuple"""
         xx, yy = pt
-        cell_x = xx/(self.font_bytewidth * self.pixel_diameter)
-        cell_y = yy/(8 * self.pixel_diameter) # 88888888888888 HaRDCODED
+        cell_x = xx // self.getCellWidth()
+        cell_y = yy // self.getCellHeight()
         return(cell_x, cell_y)
 
     def screenPositionToIndex(self, pt):
         """Returns int"""
         xx, yy = pt
-        cell_x = xx / (self.font_bytewidth * self.pixel_diameter)
-        cell_y = yy / (8 * self.pixel_diameter) # 88888888888888 HaRDCODED
+        cell_x = xx // self.getCellWidth()
+        cell_y = yy // self.getCellHeight()
         index = (cell_y * self.glyphsHorizontal) + cell_x
         #self.debug("FontWidget", "hover over index", index)
         return index
@@ -294,6 +393,11 @@ class FontWidget(wx.Panel):
         #self.debug("FontWidget", "cellToIndex cell", cell , "index", index)
         return index
 
+    def colourToRGB(self, colour):
+        """Returns tuple (r, g, b) of colour given as string or wx.Colour"""
+        colour = wx.Colour(colour)
+        return (colour.Red(), colour.Green(), colour.Blue())
+
     def indexToCell(self, index):
         """Returns tuple"""
         #if index == None: return None
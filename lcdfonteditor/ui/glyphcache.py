@@ -0,0 +1,160 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+from collections import deque
+
+################
+# CONSTANTS
+DEFAULT_CAPACITY = 4 * 1024 * 1024 # bytes of cached rasters, 16x16 zoom 8 pixel glyph bitmap is about 48kB
+
+################################################################
+class InsertionOrderDict():
+    """Dict iterated in insertion order, just the part of OrderedDict used by GlyphCache - for python 2.6 without OrderedDict
+    Order is kept in deque of (stamp, key), entries replaced or popped stay there until skipped, deque is compacted when half is stale"""
+    def __init__(self):
+        self.items = {} # key -> (stamp, value)
+        self.order = deque() # (stamp, key), oldest first
+        self.stamp = 0
+
+    def __setitem__(self, key, value):
+        self.stamp += 1
+        self.items[key] = (self.stamp, value)
+        self.order.append((self.stamp, key))
+        if len(self.order) > 2 * len(self.items) + 16: self.order = deque([(stamp, key) for stamp, key in self.order if self.isCurrent(stamp, key)])
+
+    def __getitem__(self, key):
+        return self.items[key][1]
+
+    def __contains__(self, key):
+        return key in self.items
+
+    def __len__(self):
+        return len(self.items)
+
+    def __iter__(self):
+        for stamp, key in self.order:
+            if self.isCurrent(stamp, key): yield key
+
+    def isCurrent(self, stamp, key):
+        """Returns True if order entry belongs to key stored now"""
+        item = self.items.get(key)
+        return item is not None and item[0] == stamp
+
+    def pop(self, key, default=None):
+        """Remove key, returns its value or default"""
+        item = self.items.pop(key, None)
+        if item is None: return default
+        while self.order and not self.isCurrent(*self.order[0]): self.order.popleft() # drop stale head, oldest stays first
+        return item[1]
+
+try: from collections import OrderedDict
+except ImportError: OrderedDict = InsertionOrderDict # python 2.6
+
+################################################################
+class GlyphCache():
+    """LRU cache of rendered glyphs shared by widgets, key is tuple starting with glyph bytes followed by zoom, mode, colour role..."""
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self.capacity = capacity # bytes
+        self.entries = OrderedDict() # key -> (value, size), oldest first
+        self.keysByGlyph = {} # glyph bytes -> set of keys, see invalidate
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    ################
+    # ACCESS
+    def get(self, key):
+        """Returns cached value or None, refreshes its age"""
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries[key] = entry # move to newest
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, size):
+        """Store value of given size in bytes, evicts least recently used entries over capacity"""
+        if size > self.capacity: return # would evict everything and still not fit
+        self.remove(key)
+        self.entries[key] = (value, size)
+        self.keysByGlyph.setdefault(key[0], set()).add(key)
+        self.size += size
+        while self.size > self.capacity:
+            oldest = next(iter(self.entries))
+            self.remove(oldest)
+            self.evictions += 1
+
+    def remove(self, key):
+        """Drop single entry if present"""
+        entry = self.entries.pop(key, None)
+        if entry is None: return
+        self.size -= entry[1]
+        keys = self.keysByGlyph.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys: del self.keysByGlyph[key[0]]
+
+    ################
+    # INVALIDATION
+    def invalidate(self, glyphBytes):
+        """Drop all rasters of glyph with given bytes - in every zoom, mode and colour role
+        Keys hold glyph content so rasters never get outdated by edits, this only frees memory before LRU eviction would"""
+        for key in list(self.keysByGlyph.get(bytes(bytearray(glyphBytes)), ())):
+            self.remove(key)
+
+    def clear(self):
+        """Drop everything, counters are kept"""
+        self.entries = OrderedDict()
+        self.keysByGlyph = {}
+        self.size = 0
+
+    def setCapacity(self, capacity):
+        """Set memory cap in bytes, evicts over capacity"""
+        self.capacity = capacity
+        while self.size > self.capacity:
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+
+    ################
+    # STATISTICS
+    def getStats(self):
+        """Returns dict with hit and miss counters and memory use for tuning of capacity"""
+        lookups = self.hits + self.misses
+        return {"hits" : self.hits, "misses" : self.misses, "evictions" : self.evictions, "entries" : len(self.entries), "size" : self.size, "capacity" : self.capacity, "hitRatio" : (float(self.hits) / lookups) if lookups else 0.0}
+
+    def resetStats(self):
+        """Zero counters"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+################################################################
@@ -30,6 +30,9 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 ################
 # IMPORTS
 import wx
+from dataprocessing import pages, rowmajor
+from dataprocessing.tracing import traced, Lazy
+from rasterizer import Rasterizer, METHOD_GRID, METHOD_RECT, ROLE_EMPTY
 
 ################################################################
 class GlyphWidget(wx.Panel):
@@ -39,14 +42,17 @@ class GlyphWidget(wx.Panel):
         # Initial values
         self.modes = [{"id" : 0, "zoom" : 16, "name" : "Big pixels & grid", "method" : 0}, {"id" : 1, "zoom" : 16, "name" : "Big pixels & no grid", "method" : 1}, {"id" : 2, "zoom" : 8, "name" : "Mid pixels & grid", "method" : 0}, {"id" : 3, "zoom" : 8, "name" : "Mid pixels & no grid", "method" : 1}, {"id" : 4, "zoom" : 4, "name" : "Small pixels & no grid", "method" : 1}]
         self.selectedMode = mode # mode selected by init
-        self.data = [65, 33, 17, 9, 7] # initial placeholder data, gets loaded after input got parsed
+        self.data = bytearray([65, 33, 17, 9, 7]) # initial placeholder data, gets replaced by view of font model after input got parsed
         self.font_bytewidth = bytewidth  # bytes per glyph
+        self.font_pages = 1 # bytes per column, font height is 8 pixels per page
+        self.font_rowbytes = 0 # bytes per pixel row of horizontal data, 0 - vertical data
         self.pixel_diameter = self.modes[self.selectedMode]["zoom"] # how large is a pixel aka zoom
         self.highlightedPixel = None
         self.lastLeftDown = None
         # Panel size
-        self.width = self.font_bytewidth * self.pixel_diameter
-        self.height = 8 * self.pixel_diameter # 8 hardcoded! -> byte len = font height
+        columns, rows = self.getPixelSize()
+        self.width = columns * self.pixel_diameter
+        self.height = rows * self.pixel_diameter
         parent.GetParent().GetParent().debugInfo("GlyphWidget", "> initial size", self.width, self.height)
         # Init panel
         wx.Panel.__init__(self, parent, size=(self.width, self.height))
@@ -55,6 +61,8 @@ class GlyphWidget(wx.Panel):
         self.debug = self.mainwindow.debugInfo # debug info goes to main
         # colours
         self.SetBackgroundColour("#4f5049") # hardcoded colour to match underlying panel
+        self.rasterizer = Rasterizer()
+        self.glyphCache = self.mainwindow.glyphCache # rendered glyphs shared with font widget
         # Bind events
         self.Bind(wx.EVT_PAINT, self.OnPaint)
         self.Bind(wx.EVT_LEFT_DOWN, self.onMouseDown)
@@ -68,12 +76,33 @@ class GlyphWidget(wx.Panel):
     def setByteWidth(self, bytewidth):
         """Set glyph width"""
         self.font_bytewidth = bytewidth
-        self.width = self.font_bytewidth * self.pixel_diameter
-        self.height = 8 * self.pixel_diameter # 8 hardcoded! -> byte len = font height
+        columns, rows = self.getPixelSize()
+        self.width = columns * self.pixel_diameter
+        self.height = rows * self.pixel_diameter
         self.SetMinSize(wx.Size(self.width, self.height))
         self.debug("GlyphWidget", "> SetMinSize", self.width, self.height)
         self.GetParent().Layout()
 
+    def setPages(self, pages):
+        """Set bytes per column - font height / 8"""
+        self.font_pages = pages
+        self.setByteWidth(self.font_bytewidth) # resize
+
+    def setLayout(self, rowBytes):
+        """Set bytes per pixel row of horizontal data, 0 - vertical data"""
+        self.font_rowbytes = rowBytes
+        self.setByteWidth(self.font_bytewidth) # resize
+
+    def getPixelSize(self):
+        """Returns tuple (columns, rows) - size of glyph in pixels"""
+        if self.font_rowbytes: return (self.font_rowbytes * 8, self.font_bytewidth // self.font_rowbytes)
+        return (self.font_bytewidth // self.font_pages, 8 * self.font_pages)
+
+    def setData(self, values):
+        """Write values into glyph data - view of font model, missing values are zero, extra dropped"""
+        values = list(values)[:len(self.data)]
+        self.data[:] = values + [0] * (len(self.data) - len(values))
+
     def getModesAvailable(self):
         """Returns list of dicts containing display modes"""
         return self.modes
@@ -84,8 +113,9 @@ class GlyphWidget(wx.Panel):
         # Panel size
         self.pixel_diameter = self.modes[self.selectedMode]["zoom"]
         # Calculate size, resize panel and layout its sizer
-        self.width = self.font_bytewidth * self.pixel_diameter
-        self.height = 8 * self.pixel_diameter # 8 hardcoded! -> byte len = font height
+        columns, rows = self.getPixelSize()
+        self.width = columns * self.pixel_diameter
+        self.height = rows * self.pixel_diameter
         self.SetMinSize(wx.Size(self.width, self.height))
         self.GetParent().Layout()
         self.GetParent().GetParent().Layout()
@@ -97,6 +127,7 @@ class GlyphWidget(wx.Panel):
         
     ################
     # PAINT EVENT
+    @traced("GlyphWidget.OnPaint")
     def OnPaint(self, event):
         """Event paint"""
         # return if no data to display
@@ -104,28 +135,61 @@ class GlyphWidget(wx.Panel):
         else: return
         self.debug("GlyphWidget", "Event", "Paint", self.data)
         dc = wx.PaintDC(self)
-        dc.SetAxisOrientation(True, False)
-
-        # for xx in range(0, self.font_bytewidth): fails when not enough data
-        for xx in range(0, len(self.data)):
-            data = self.data[xx] #
-
-            if isinstance(data, str):
-                data = int(data, 16) # int conversion done here to support bytearray input which gets sliced to str above
-            #self.debug("data type>>>>>>>>>>>", str(type(data)))
-            for yy in range(0, 8): # 8 hardcoded!
-                backColour = "#000000"
-                foreColour = "#FFFFFF"
-                if (xx, yy) == self.highlightedPixel:
-                    backColour = "#333333"
-                    foreColour = "#999999"
-                currentColour = backColour
-                if (data & (1<<(yy))) : currentColour = foreColour # if bit is set - colour current pixel
+        data = self.data
+        if isinstance(data[0], str):
+            data = [int(item, 16) for item in data] # int conversion done here to support bytearray input which gets sliced to str
+        # whole glyph blitted from glyph cache, shared with font widget
+        dc.DrawBitmap(self.getGlyphBitmap(data), 0, 0)
+        # highlighted pixel drawn over
+        if self.highlightedPixel is not None:
+            xx, yy = self.highlightedPixel
+            if self.hasPixel(xx, yy):
                 if self.modes[self.selectedMode]["method"] == 0: dc.SetPen(wx.Pen("#333333")) # set colour of grid between pixels
                 elif self.modes[self.selectedMode]["method"] == 1: dc.SetPen(wx.TRANSPARENT_PEN) # No grid
-                dc.SetBrush(wx.Brush(currentColour)) # set colour to fill rect
+                if self.getPixel(xx, yy): dc.SetBrush(wx.Brush("#999999")) # if bit is set
+                else: dc.SetBrush(wx.Brush("#333333"))
                 dc.DrawRectangle(xx * self.pixel_diameter, yy * self.pixel_diameter, self.pixel_diameter, self.pixel_diameter)
 
+    def getGlyphBitmap(self, data):
+        """Returns wx.Bitmap of glyph from glyph cache, renders it on miss"""
+        mode = self.modes[self.selectedMode]
+        key = (bytes(bytearray(data)), len(data), self.font_pages, self.font_rowbytes, mode["zoom"], mode["method"], "glyph") # glyph bytes first - see GlyphCache.invalidate
+        bitmap = self.glyphCache.get(key)
+        if bitmap is None:
+            method = METHOD_GRID if mode["method"] == 0 else METHOD_RECT
+            roles = {"normal" : ((255, 255, 255), (0, 0, 0)), ROLE_EMPTY : ((0x4f, 0x50, 0x49), (0x4f, 0x50, 0x49))}
+            renderPages = self.font_pages
+            if self.font_rowbytes:
+                height = max(self.font_bytewidth // self.font_rowbytes, 1)
+                renderPages = (height + 7) // 8
+                data = rowmajor.rowsToColumns(data, self.font_rowbytes, height) # horizontal data rendered as vertical
+            glyphBytes = len(data) - len(data) % renderPages # whole columns
+            width, height, buffer = self.rasterizer.renderCells(data, glyphBytes, 1, (0, 0, 1, 1), mode["zoom"], method, roles, {}, (0x33, 0x33, 0x33), renderPages)
+            image = wx.ImageFromBuffer(width, height, buffer) # wraps buffer, no copy - buffer must live until converted
+            bitmap = image.ConvertToBitmap()
+            self.glyphCache.put(key, bitmap, width * height * 3)
+        return bitmap
+
+    def hasPixel(self, x, y):
+        """Returns True if pixel x, y is inside data - last glyph may be incomplete"""
+        if self.font_rowbytes: return x < 8 * self.font_rowbytes and (y + 1) * self.font_rowbytes <= len(self.data)
+        return (x + 1) * self.font_pages <= len(self.data) and y < 8 * self.font_pages
+
+    def getPixel(self, x, y):
+        """Returns True if pixel x, y is set"""
+        if self.font_rowbytes: return rowmajor.getRowPixel(self.data, self.font_rowbytes, x, y)
+        return pages.getPixel(self.data, self.font_pages, x, y)
+
+    def setPixel(self, x, y, state):
+        """Set or clear pixel x, y - single byte operation, see pages and rowmajor"""
+        if self.font_rowbytes: rowmajor.setRowPixel(self.data, self.font_rowbytes, x, y, state)
+        else: pages.setPixel(self.data, self.font_pages, x, y, state)
+
+    def togglePixel(self, x, y):
+        """Invert pixel x, y - single byte operation, see pages and rowmajor"""
+        if self.font_rowbytes: rowmajor.toggleRowPixel(self.data, self.font_rowbytes, x, y)
+        else: pages.togglePixel(self.data, self.font_pages, x, y)
+
     ################
     # USER EVENTS
     def _onMouseEnter(self, event):
@@ -148,18 +212,17 @@ class GlyphWidget(wx.Panel):
         if xx > (self.width-1): return # event sometimes gives values outside draw area, maybe border? --1 stands for last pix or another check with == would be required
         if yy > (self.height-1): return # event sometimes gives values outside draw area, maybe border?
 
-        pixel_x = xx/self.pixel_diameter
-        pixel_y = (yy/self.pixel_diameter)
+        pixel_x = xx // self.pixel_diameter
+        pixel_y = yy // self.pixel_diameter
         previousHighlighted = self.highlightedPixel
         self.highlightedPixel = (pixel_x, pixel_y)
         self.debug("GlyphWidget", "Event", "MouseMove > pixel", xx, yy, "> cell", self.highlightedPixel)
         if self.highlightedPixel != previousHighlighted:
             if self.lastLeftDown is not None:
                 lastLeftX, lastLeftY = self.lastLeftDown
+                if not self.hasPixel(pixel_x, pixel_y): return
                 # set all next pixels same colour as clicked one
-                if (self.data[lastLeftX] & (1<<lastLeftY)):
-                    self.data[pixel_x] = (self.data[pixel_x] | (1<<pixel_y))
-                else: self.data[pixel_x] &= ~(self.data[pixel_x] & (1<<pixel_y))
+                self.setPixel(pixel_x, pixel_y, self.getPixel(lastLeftX, lastLeftY))
 
                 self.Refresh()
                 return True
@@ -179,17 +242,17 @@ class GlyphWidget(wx.Panel):
         if xx > (self.width-1): return # event sometimes gives values outside draw area, maybe border? --1 stands for last pix or another check with == would be required
         if yy > (self.height-1): return # event sometimes gives values outside draw area, maybe border?
 
-        pixel_x = xx/self.pixel_diameter # cell x
-        pixel_y = (yy/self.pixel_diameter) # cell y
+        pixel_x = xx // self.pixel_diameter # cell x
+        pixel_y = yy // self.pixel_diameter # cell y
+        if not self.hasPixel(pixel_x, pixel_y): return # incomplete last glyph
 
         self.lastLeftDown = pixel_x, pixel_y
         self.debug("GlyphWidget", "Event", "MouseUp > pixel",pt, "> cell", pixel_x, pixel_y)
         
-        self.data[pixel_x] = (self.data[pixel_x] ^ (1<<pixel_y)) # NEW DATA!
+        self.togglePixel(pixel_x, pixel_y) # NEW DATA! written into font model
 
         # print the data
-        printable = ""
-        printable += ( ', '.join("0x%02X" % (x) for x in self.data) )
+        printable = Lazy(lambda: ', '.join("0x%02X" % (x) for x in self.data)) # joined only when debug prints it
         self.debug("GlyphWidget", "info:", "new data:", self.data, ">", printable)
 
         self.Refresh()
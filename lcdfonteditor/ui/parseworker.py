@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+import threading
+import time
+import traceback
+
+from .dataprocessing.core import DataProcessing, ParseCancelled
+
+################################################################
+class ParseWorker():
+    def __init__(self, post, onResult, delay=0.15, onError=None):
+        self.post = post # function passing call to ui thread - wx.CallAfter, keeps this module free of wx
+        self.onResult = onResult # called in ui thread with (generation, text, processing) of finished parse
+        self.onError = onError # called in ui thread with (generation, text, message) of failed parse
+        self.delay = delay # seconds of quiet after last submitted text before parse starts - coalesces rapid text events
+
+        self.condition = threading.Condition()
+        self.pendingText = None # newest text waiting to be parsed
+        self.pendingArray = 0 # index of array to parse in pending text
+        self.pendingPages = 1 # bytes per glyph column of pending text
+        self.pendingRowBytes = 0 # bytes per glyph row of pending horizontal text, 0 - vertical
+        self.submittedAt = 0.0
+        self.generation = 0 # raised with every submit, parse of older generation gets cancelled
+        self.busy = False # parse running
+        self.running = True
+
+        self.thread = threading.Thread(target=self.run, name="ParseWorker")
+        self.thread.daemon = True # never block application exit
+        self.thread.start()
+
+    ################
+    # UI THREAD API
+    def submit(self, text, selectedArray=0, pages=1, rowBytes=0):
+        """Queue text for parsing, replaces text not parsed yet and cancels running parse, returns int generation"""
+        with self.condition:
+            self.generation += 1
+            self.pendingText = text
+            self.pendingArray = selectedArray
+            self.pendingPages = pages
+            self.pendingRowBytes = rowBytes
+            self.submittedAt = time.time()
+            self.condition.notify()
+            return self.generation
+
+    def cancel(self):
+        """Drop pending text and cancel running parse"""
+        with self.condition:
+            self.generation += 1
+            self.pendingText = None
+
+    def isBusy(self):
+        """Returns True while text is pending or being parsed"""
+        with self.condition:
+            return self.busy or self.pendingText is not None
+
+    def getGeneration(self):
+        """Returns int generation of newest submitted text"""
+        return self.generation
+
+    def stop(self):
+        """Stop thread, running parse gets cancelled"""
+        with self.condition:
+            self.running = False
+            self.generation += 1
+            self.condition.notify()
+        self.thread.join(1.0)
+
+    ################
+    # WORKER THREAD
+    def run(self):
+        """Thread loop - wait for text, debounce, parse, post result"""
+        while True:
+            with self.condition:
+                while self.running and self.pendingText is None:
+                    self.condition.wait()
+                # debounce - wait until no newer text arrives for self.delay
+                while self.running and self.pendingText is not None:
+                    remaining = self.delay - (time.time() - self.submittedAt)
+                    if remaining <= 0: break
+                    self.condition.wait(remaining)
+                if not self.running: return
+                if self.pendingText is None: continue # cancelled while waiting
+                text, selectedArray, pages, rowBytes, generation = self.pendingText, self.pendingArray, self.pendingPages, self.pendingRowBytes, self.generation
+                self.pendingText = None
+                self.busy = True
+
+            processing, message = None, None
+            try:
+                processing = self.parse(text, generation, selectedArray, pages, rowBytes)
+            except Exception: # any failure of parse must not end the loop - ui would wait for result forever
+                message = traceback.format_exc()
+            finally:
+                with self.condition:
+                    self.busy = False
+                    current = (generation == self.generation)
+            if message is not None:
+                if self.onError is not None: self.post(self.onError, generation, text, message)
+            elif processing is not None and current:
+                self.post(self.onResult, generation, text, processing)
+
+    def parse(self, text, generation, selectedArray=0, pages=1, rowBytes=0):
+        """Returns DataProcessing with parsed text or None if cancelled, no wx object is touched here"""
+        processing = DataProcessing(None, 0) # own instance - ui instance is never shared between threads
+        processing.setSelectedArray(selectedArray)
+        processing.setFontPages(pages)
+        processing.setFontRowBytes(rowBytes)
+        processing.cancelCheck = lambda: generation != self.generation
+        try:
+            processing.importData(text)
+        except ParseCancelled:
+            return None
+        return processing
+################################################################
@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Copyright (c) 2020, Lukas Vyhnalek aka KiLLA
+All rights reserved.
+
+Redistribution and use in source and binary forms, with or without
+modification, are permitted provided that the following conditions are met:
+
+* Redistributions of source code must retain the above copyright notice, this
+  list of conditions and the following disclaimer.
+
+* Redistributions in binary form must reproduce the above copyright notice,
+  this list of conditions and the following disclaimer in the documentation
+  and/or other materials provided with the distribution.
+
+THIS SOFTWARE IS PROVIDED BY THE COPYRIGHT HOLDERS AND CONTRIBUTORS "AS IS"
+AND ANY EXPRESS OR IMPLIED WARRANTIES, INCLUDING, BUT NOT LIMITED TO, THE
+IMPLIED WARRANTIES OF MERCHANTABILITY AND FITNESS FOR A PARTICULAR PURPOSE ARE
+DISCLAIMED. IN NO EVENT SHALL THE COPYRIGHT HOLDER OR CONTRIBUTORS BE LIABLE
+FOR ANY DIRECT, INDIRECT, INCIDENTAL, SPECIAL, EXEMPLARY, OR CONSEQUENTIAL
+DAMAGES (INCLUDING, BUT NOT LIMITED TO, PROCUREMENT OF SUBSTITUTE GOODS OR
+SERVICES; LOSS OF USE, DATA, OR PROFITS; OR BUSINESS INTERRUPTION) HOWEVER
+CAUSED AND ON ANY THEORY OF LIABILITY, WHETHER IN CONTRACT, STRICT LIABILITY,
+OR TORT (INCLUDING NEGLIGENCE OR OTHERWISE) ARISING IN ANY WAY OUT OF THE USE
+OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
+"""
+
+################
+# IMPORTS
+import struct
+
+################
+# CONSTANTS
+METHOD_POINT = 0 # pixel drawn as single point at top left of zoomed cell, rest is gap colour
+METHOD_RECT = 1 # pixel drawn as filled square of zoom size
+METHOD_GRID = 2 # pixel drawn as filled square with one pixel border of gap colour
+ROLE_EMPTY = "empty" # no data for column - one colour for set and unset bits
+
+################################################################
+class Rasterizer():
+    """Converts column bytes of font to RGB buffer in one pass using 256 item lookup tables - no wx here, widgets wrap the buffer
+    Fonts higher than 8 pixels have pages bytes per column (see dataprocessing.pages), every page is read as one strided slice"""
+    def __init__(self):
+        self.luts = {} # (foreground, background, gap, zoom, method) -> list of 8 tables, one per bit row
+
+    ################
+    # LOOKUP TABLES
+    def getLut(self, foreground, background, gap, zoom, method):
+        """Returns list of 8 lists of 256 byte strings - pixels of one column for bit row 0-7 and every byte value"""
+        key = (foreground, background, gap, zoom, method)
+        lut = self.luts.get(key)
+        if lut is None:
+            set, unset, gapPixel = rgbBytes(foreground), rgbBytes(background), rgbBytes(gap)
+            if method == METHOD_RECT:
+                setPixel, unsetPixel = set * zoom, unset * zoom
+            elif method == METHOD_GRID:
+                setPixel, unsetPixel = gapPixel + set * (zoom - 2) + gapPixel, gapPixel + unset * (zoom - 2) + gapPixel
+            else:
+                setPixel, unsetPixel = set + gapPixel * (zoom - 1), unset + gapPixel * (zoom - 1)
+            lut = [[(setPixel if (value & (1 << bit)) else unsetPixel) for value in range(256)] for bit in range(8)]
+            self.luts[key] = lut
+        return lut
+
+    def clear(self):
+        """Drop lookup tables, eg. after colours changed many times"""
+        self.luts = {}
+
+    ################
+    # RENDER
+    def renderFont(self, data, bytewidth, glyphsHorizontal, glyphsVertical, zoom, method, roles, cellRoles, gap, pages=1):
+        """Returns tuple (width, height, bytearray RGB buffer) of whole font sheet
+        data - sequence of column bytes, roles - dict role name -> (foreground, background) RGB tuples, must contain 'normal' and ROLE_EMPTY
+        cellRoles - dict cell index -> role name of cells drawn with other than 'normal' colours, gap - RGB tuple between points
+        pages - bytes per column, bytewidth must be its multiple"""
+        return self.renderCells(data, bytewidth, glyphsHorizontal, (0, 0, glyphsHorizontal, glyphsVertical), zoom, method, roles, cellRoles, gap, pages)
+
+    def renderCells(self, data, bytewidth, glyphsHorizontal, cells, zoom, method, roles, cellRoles, gap, pages=1):
+        """Returns tuple (width, height, bytearray RGB buffer) of part of font sheet
+        cells - tuple (first cell x, first cell y, end cell x, end cell y), other arguments as renderFont"""
+        firstX, firstY, endX, endY = cells
+        width = (bytewidth // pages) * (endX - firstX) * zoom
+        height = 8 * pages * (endY - firstY) * zoom
+        luts = {}
+        for role in roles:
+            foreground, background = roles[role]
+            luts[role] = self.getLut(foreground, background, gap, zoom, method)
+        gapRow = rgbBytes(gap) * width
+        dataLength = len(data) - len(data) % pages # whole columns only
+        rows = []
+        for glyphRow in range(firstY, endY):
+            runs = self.rowRuns(glyphRow, firstX, endX, bytewidth, glyphsHorizontal, dataLength, cellRoles)
+            for pixelRow in range(8 * pages):
+                page, bit = pixelRow >> 3, pixelRow & 7
+                parts = []
+                for role, start, end in runs:
+                    lut = luts[role][bit]
+                    if role == ROLE_EMPTY: parts.append(lut[0] * ((end - start) // pages))
+                    else: parts.append(b"".join(map(lut.__getitem__, data[start + page:end:pages]))) # page of whole run of columns in one call
+                line = b"".join(parts)
+                if method == METHOD_GRID: rows.extend([gapRow] + [line] * (zoom - 2) + [gapRow]) # top and bottom border of pixel
+                elif method == METHOD_RECT: rows.extend([line] * zoom)
+                else: rows.extend([line] + [gapRow] * (zoom - 1))
+        return (width, height, bytearray(b"".join(rows)))
+
+    def rowRuns(self, glyphRow, firstX, endX, bytewidth, glyphsHorizontal, dataLength, cellRoles):
+        """Returns list of tuples (role, first byte, end byte) - columns of cells firstX to endX of glyph row with same colours merged"""
+        runs = []
+        rowStart = glyphRow * bytewidth * glyphsHorizontal
+        for glyphColumn in range(firstX, endX):
+            role = cellRoles.get(glyphRow * glyphsHorizontal + glyphColumn, "normal")
+            start = rowStart + glyphColumn * bytewidth
+            end = start + bytewidth
+            if start >= dataLength: pieces = [(ROLE_EMPTY, start, end)] # mark where is no data
+            elif end > dataLength: pieces = [(role, start, dataLength), (ROLE_EMPTY, dataLength, end)] # incomplete last glyph
+            else: pieces = [(role, start, end)]
+            for piece in pieces:
+                if runs and runs[-1][0] == piece[0] and runs[-1][2] == piece[1]:
+                    runs[-1] = (piece[0], runs[-1][1], piece[2]) # continue run
+                else: runs.append(piece)
+        return runs
+################################################################
+
+################
+# HELPERS
+def rgbBytes(colour):
+    """Returns 3 byte string of RGB tuple"""
+    return struct.pack("BBB", colour[0], colour[1], colour[2])
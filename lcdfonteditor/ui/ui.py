@@ -31,20 +31,28 @@ OF THIS SOFTWARE, EVEN IF ADVISED OF THE POSSIBILITY OF SUCH DAMAGE.
 # IMPORTS
 import os
 import sys
+import traceback
 
 import wx
 
 import dataprocessing.core
+from dataprocessing.arrayindex import ArrayIndex
+from dataprocessing import transforms
+from dataprocessing.tracing import TRACER, TRACE_ENVIRONMENT, traced
 
 from glyphwidget import GlyphWidget
 from fontwidget import FontWidget
 from ui_options import OptionsFrame
+from parseworker import ParseWorker
+from glyphcache import GlyphCache, DEFAULT_CAPACITY
+from dataprocessing.journal import DEFAULT_CAPACITY as UNDO_CAPACITY
 
 ################
 # DEBUG
 DEBUG = False # True / False
 showInspectionWindow = False # True / False
 if DEBUG and showInspectionWindow: import wx.lib.inspection # import widgets inspection tool
+if DEBUG: TRACER.enable() # timing spans, histogram printed on close
 
 ################################################################
 ######################### MAIN WINDOW ##########################
@@ -74,6 +82,15 @@ class MainFrame(wx.Frame):
         DEFAULT_BYTEWIDTH = 5 # DEFAULT CONSTANT VALUE > for fonts 5 bytes/pixels wide
 
         self.processing = dataprocessing.core.DataProcessing(self, DEFAULT_BYTEWIDTH) # pass self - main window
+        self.parsing = False # worker thread parses text, see setParsingState
+        self.SYNC_PARSE_LIMIT = 65536 # chars, larger text that can not be parsed incrementally goes to worker thread
+        self.parseWorker = ParseWorker(wx.CallAfter, self.onParseResult, onError=self.onParseError) # full parses of large text run outside ui thread
+        self.arrayIndex = ArrayIndex(self) # arrays of input with more fonts, parse of each is kept when switching
+        self.undoCapacity = UNDO_CAPACITY # bytes of undo history of each array
+
+        ################
+        # GLYPH CACHE
+        self.glyphCache = GlyphCache(DEFAULT_CAPACITY) # rendered glyphs shared by glyph and font widget
 
         ################
         # WINDOW with OPTIONS & SETTINGS
@@ -237,6 +254,9 @@ class MainFrame(wx.Frame):
         # TEXT FIELD
         self.textCtrlModes = self.modes = [{"id" : 0, "name" : "Smart (fast)", "method" : 0}, {"id" : 1, "name" : "Simple (failsafe)", "method" : 1}, {"id" : 2, "name" : "Full redraw (slow)", "method" : 2}]
         self.selectedTextCtrlMode = 0 # DEFAULT mode > Smart
+        self.transformModes = [{"id" : 0, "name" : "Shift up", "operation" : transforms.SHIFT_UP}, {"id" : 1, "name" : "Shift down", "operation" : transforms.SHIFT_DOWN}, {"id" : 2, "name" : "Shift left", "operation" : transforms.SHIFT_LEFT}, {"id" : 3, "name" : "Shift right", "operation" : transforms.SHIFT_RIGHT}, {"id" : 4, "name" : "Flip horizontal", "operation" : transforms.FLIP_HORIZONTAL}, {"id" : 5, "name" : "Flip vertical", "operation" : transforms.FLIP_VERTICAL}, {"id" : 6, "name" : "Rotate clockwise", "operation" : transforms.ROTATE_CW}, {"id" : 7, "name" : "Rotate counterclockwise", "operation" : transforms.ROTATE_CCW}, {"id" : 8, "name" : "Rotate 180", "operation" : transforms.ROTATE_180}, {"id" : 9, "name" : "Invert", "operation" : transforms.INVERT}, {"id" : 10, "name" : "Bold", "operation" : transforms.BOLD}]
+        self.fontPagesModes = [{"id" : 0, "name" : "8 pixels", "pages" : 1}, {"id" : 1, "name" : "16 pixels", "pages" : 2}, {"id" : 2, "name" : "24 pixels", "pages" : 3}, {"id" : 3, "name" : "32 pixels", "pages" : 4}] # font height, bytes per column
+        self.dataLayoutModes = [{"id" : 0, "name" : "Vertical (columns)", "rowbytes" : 0}, {"id" : 1, "name" : "Horizontal, 8 pixels wide", "rowbytes" : 1}, {"id" : 2, "name" : "Horizontal, 16 pixels wide", "rowbytes" : 2}, {"id" : 3, "name" : "Horizontal, 24 pixels wide", "rowbytes" : 3}, {"id" : 4, "name" : "Horizontal, 32 pixels wide", "rowbytes" : 4}] # bytes per pixel row, 0 - vertical data
         self.ignoreTextEvent = False
 
         self.textCtrl = wx.TextCtrl(self.mainPanel, size = (320,320), style = wx.TE_MULTILINE | wx.TE_RICH) # another windows hack -> wx.TE_RICH
@@ -259,6 +279,12 @@ class MainFrame(wx.Frame):
         self.icon = wx.IconFromBitmap(wx.Bitmap(os.path.join(self.basePath, "icons", "edit-square.png"), wx.BITMAP_TYPE_PNG))
         self.SetIcon(self.icon)
         self.Centre()
+        self.Bind(wx.EVT_CLOSE, self.onClose)
+        # Undo / Redo shortcuts
+        undoId, redoId = wx.NewId(), wx.NewId()
+        self.Bind(wx.EVT_MENU, lambda event: self.undo(), id=undoId)
+        self.Bind(wx.EVT_MENU, lambda event: self.redo(), id=redoId)
+        self.SetAcceleratorTable(wx.AcceleratorTable([(wx.ACCEL_CTRL, ord('Z'), undoId), (wx.ACCEL_CTRL, ord('Y'), redoId), (wx.ACCEL_CTRL | wx.ACCEL_SHIFT, ord('Z'), redoId)]))
         #self.mainSizer.Fit(self) # make sizer resize parent window to best size # optional, hardcoded size looks better, on 600px screen height window size fits itself
 
 ################################################################
@@ -273,28 +299,28 @@ class MainFrame(wx.Frame):
         """Process events of all buttons including Options window"""
         btn = event.GetEventObject()
         self.debugInfo("ui", "Event", "Button > %s" % (event.GetEventObject().identifier))
+        if self.isParsing() and event.GetEventObject().identifier not in ("copy", "more"):
+            self.debugInfo("ui", "Warning:", "Button ignored while parsing")
+            return
 
         # recognize button and performa action
         if event.GetEventObject().identifier == "copy":
             self.debugInfo("ui", "info:", "Button", "copy data >", self.glyphWidget.data)
-            self.clipboard = list(self.glyphWidget.data) # copy data
+            self.clipboard = list(self.glyphWidget.data) # copy data, view would follow later edits
 
         elif event.GetEventObject().identifier == "paste":
             if self.clipboard == None: return
-            #self.glyphWidget.data = list(self.clipboard) # copy data with no check - future use with SetData
-            self.glyphWidget.data = list(self.clipboard) + [0] * (self.processing.getFontByteWidth() - len(list(self.clipboard))) # add missing data if font byte width changed between copy/paste
+            self.glyphWidget.setData(self.clipboard) # missing data added if font byte width changed between copy/paste
             self.debugInfo("ui", "info:", "Button", "paste data >", self.clipboard, "> new data", self.glyphWidget.data)
             self.glyphWidget.Refresh()
             self.updateSelectedGlyph()
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
+            self.updateFontWidgetGlyph() # patch only selected glyph of font sheet
 
         elif event.GetEventObject().identifier == "clear":
-            self.glyphWidget.data = [0] * self.processing.getFontByteWidth() # set zero
+            self.glyphWidget.setData([]) # set zero
             self.glyphWidget.Refresh()
             self.updateSelectedGlyph()
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
+            self.updateFontWidgetGlyph() # patch only selected glyph of font sheet
 
         elif event.GetEventObject().identifier == "more":
             if not self.optionsWindow:
@@ -307,34 +333,22 @@ class MainFrame(wx.Frame):
                 self.optionsWindow.Close()
 
         elif event.GetEventObject().identifier == "moveup":
-            self.glyphWidget.data = [ (byte>>1) for byte in self.glyphWidget.data]  # DESTRUCTIVE
-            self.glyphWidget.Refresh()
-            self.updateSelectedGlyph()
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
+            self.transformSelectedGlyph(transforms.SHIFT_UP) # DESTRUCTIVE
 
         elif event.GetEventObject().identifier == "movedown":
-            self.glyphWidget.data = [ ((byte<<1)& 0xFF) for byte in self.glyphWidget.data]  # DESTRUCTIVE
-            self.glyphWidget.Refresh()
-            self.updateSelectedGlyph()
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
+            self.transformSelectedGlyph(transforms.SHIFT_DOWN) # DESTRUCTIVE
 
         elif event.GetEventObject().identifier == "moveleft":
-            #self.glyphWidget.data = self.glyphWidget.data[1:] + [self.glyphWidget.data[0]] # NONDESTRUCTIVE
-            self.glyphWidget.data = self.glyphWidget.data[1:] + [0] # DESTRUCTIVE
-            self.glyphWidget.Refresh()
-            self.updateSelectedGlyph()
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
+            self.transformSelectedGlyph(transforms.SHIFT_LEFT) # DESTRUCTIVE
 
         elif event.GetEventObject().identifier == "moveright":
-            #self.glyphWidget.data = [self.glyphWidget.data[-1]] + self.glyphWidget.data[:-1] # NONDESTRUCTIVE
-            self.glyphWidget.data = [0] + self.glyphWidget.data[:-1] # DESTRUCTIVE
-            self.glyphWidget.Refresh()
-            self.updateSelectedGlyph()
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
+            self.transformSelectedGlyph(transforms.SHIFT_RIGHT) # DESTRUCTIVE
+
+        elif event.GetEventObject().identifier == "undo":
+            self.undo()
+
+        elif event.GetEventObject().identifier == "redo":
+            self.redo()
 
         elif event.GetEventObject().identifier == "insertright":
             self.processing.insertToRight()
@@ -384,21 +398,23 @@ class MainFrame(wx.Frame):
     # MOUSE EVENTS
     def onGlyphWidgetMouseDown(self, event):
         """onMouseDown-parent"""
+        if self.isParsing(): return # offsets of data outdated until parse result arrives
+        self.processing.getJournal().seal() # new stroke
         self.glyphWidget.onMouseDown(event)
-        self.updateSelectedGlyph()
-        self.loadFontWidgetImageData()
-        self.fontWidget.Refresh()
+        self.updateSelectedGlyph(("paint", self.processing.getSelectedGlyphIndex()))
+        self.updateFontWidgetGlyph() # patch only selected glyph of font sheet
 
     def onGlyphWidgetMouseUp(self, event):
         """onMouseUp-parent"""
         self.glyphWidget.onMouseUp(event)
+        self.processing.getJournal().seal() # whole stroke is single undo step
 
     def onGlyphWidgetMouseMove(self, event):
         """onMouseMove-parent"""
+        if self.isParsing(): return
         if self.glyphWidget.onMouseMove(event):
-            self.updateSelectedGlyph()
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
+            self.updateSelectedGlyph(("paint", self.processing.getSelectedGlyphIndex())) # merged with step of mouse down
+            self.updateFontWidgetGlyph() # patch only selected glyph of font sheet
 
     def onFontWidgetMouseUp(self, event):
         """onFontWidgetMouseUp"""
@@ -406,8 +422,7 @@ class MainFrame(wx.Frame):
         self.processing.setSelectedGlyphIndex(self.fontWidget.getSelectedIndex()) #
         self.selectedLabel.SetLabel(self.indicatorPanelLabelFormat(self.processing.getSelectedGlyphIndex()))
         self.loadGlyphWidgetImageData() # load glyph image
-        self.fontWidget.Refresh()
-        self.glyphWidget.Refresh()
+        self.glyphWidget.Refresh() # font widget refreshes previous and new selected cell itself
 
         self.selectedLabel.GetParent().GetContainingSizer().Layout()
         self.fontWidget.GetContainingSizer().Layout()
@@ -424,8 +439,7 @@ class MainFrame(wx.Frame):
         """ """
         self.fontWidget.onMouseLeave(event)
         self.hoverLabel.SetLabel("") # Empty
-        self.hoverLabel.GetParent().GetContainingSizer().Layout()
-        self.fontWidget.Refresh()
+        self.hoverLabel.GetParent().GetContainingSizer().Layout() # font widget refreshes previously highlighted cell itself
 
     def onIndicatorPanelMouseUp(self, event):
         """Toggle mode of indicator panel"""
@@ -439,6 +453,7 @@ class MainFrame(wx.Frame):
 
     ################
     # TEXT FIELD EVENTS
+    @traced("ui.OnKeyTyped")
     def OnKeyTyped(self, event):
         """TextCtrl changed event, parse new data"""
         #self.debugInfo("ui", "Event", "OnKeyTyped") # ultra verbose while text updates
@@ -448,27 +463,117 @@ class MainFrame(wx.Frame):
             self.debugInfo("New textfield input\n", tempData, "\n")
 
             # process import
-            self.processing.importData(tempData) #  <-------------------------------------------------------- import -> parse data
-            self.setWidgetsByteWidth()
-            self.fontWidget.setFieldSize(self.processing.getGlyphCount()) # SET FONT WIDGET SIZE
-            self.fontWidget.setSelectedIndex(self.processing.getSelectedGlyphIndex())
-            
-            self.loadGlyphWidgetImageData()
-            self.glyphWidget.Refresh()
-
-            self.loadFontWidgetImageData()
-            self.fontWidget.Refresh()
-
-            self.selectedLabel.SetLabel(self.indicatorPanelLabelFormat(self.processing.getSelectedGlyphIndex()))
-            self.selectedLabel.GetParent().GetContainingSizer().Layout()
+            if self.parseWorker.isBusy():
+                self.parseWorker.submit(tempData, self.processing.getSelectedArray(), self.processing.getFontPages(), self.processing.getFontRowBytes()) # newer text supersedes the one being parsed
+                return
+            allowFull = len(tempData) <= self.SYNC_PARSE_LIMIT # small text is parsed at once, no need to wait for worker
+            if self.processing.importDataIncremental(tempData, allowFull) is None: #  <--------------------- import -> parse edited lines or all data
+                self.setParsingState(True)
+                self.parseWorker.submit(tempData, self.processing.getSelectedArray(), self.processing.getFontPages(), self.processing.getFontRowBytes()) # large text, parse in worker thread, result comes to onParseResult
+                return
+            self.refreshAfterImport()
         else:
             pass
             #self.debugInfo("Text event skip!") # very verbose while TextCtrl updates
 
+    def onParseResult(self, generation, text, processing):
+        """Worker thread finished parse - called by wx.CallAfter in ui thread"""
+        if generation != self.parseWorker.getGeneration(): return # newer text already submitted
+        if text != self.textCtrl.GetValue():
+            self.parseWorker.submit(self.textCtrl.GetValue(), self.processing.getSelectedArray(), self.processing.getFontPages(), self.processing.getFontRowBytes()) # text changed meanwhile
+            return
+        self.debugInfo("ui", "info:", "Parse result of generation", generation, "glyph count", processing.getGlyphCount())
+        self.processing.adoptParse(processing)
+        self.setParsingState(False)
+        self.refreshAfterImport()
+
+    def onParseError(self, generation, text, message):
+        """Worker thread failed to parse text - called by wx.CallAfter in ui thread
+        Text is imported again here, previous data never stays - its offsets do not match text of TextCtrl"""
+        self.debugInfo("ui", "Error:", "Parse of generation", generation, "failed\n", message)
+        if generation != self.parseWorker.getGeneration(): return # newer text already submitted, its result clears parsing state
+        self.setParsingState(False)
+        try:
+            self.processing.importData(self.textCtrl.GetValue())
+        except Exception:
+            self.debugInfo("ui", "Error:", "Import failed\n", traceback.format_exc())
+            self.processing.importData("") # no data left to edit at outdated offsets
+            self.SetTitle("LCD Font Editor - parse failed")
+        self.refreshAfterImport()
+
+    @traced("ui.refreshAfterImport")
+    def refreshAfterImport(self):
+        """Update widgets after new data got parsed"""
+        self.processing.getJournal().setCapacity(self.undoCapacity) # processing may be new one - worker result or another array
+        self.setWidgetsByteWidth()
+        self.fontWidget.setFieldSize(self.processing.getGlyphCount()) # SET FONT WIDGET SIZE
+        self.fontWidget.setSelectedIndex(self.processing.getSelectedGlyphIndex())
+
+        self.loadGlyphWidgetImageData()
+        self.glyphWidget.Refresh()
+
+        self.loadFontWidgetImageData()
+        self.fontWidget.Refresh()
+
+        self.selectedLabel.SetLabel(self.indicatorPanelLabelFormat(self.processing.getSelectedGlyphIndex()))
+        self.selectedLabel.GetParent().GetContainingSizer().Layout()
+
+    def setParsingState(self, parsing):
+        """Show parsing state in title, edits of glyphs are blocked meanwhile - offsets are outdated"""
+        self.parsing = parsing
+        if parsing: self.SetTitle("LCD Font Editor - parsing...")
+        else: self.SetTitle("LCD Font Editor")
+
+    def isParsing(self):
+        """Returns True while worker parses text"""
+        return self.parsing
+
+    def onClose(self, event):
+        """Stop worker thread before window gets destroyed"""
+        self.parseWorker.stop()
+        self.debugInfo("ui", "info:", "glyph cache >", self.getGlyphCacheStats())
+        if TRACER.isEnabled():
+            for line in TRACER.formatReport(): self.debugInfo("ui", "info:", line)
+            if os.environ.get(TRACE_ENVIRONMENT): TRACER.writeReport(os.environ[TRACE_ENVIRONMENT])
+        event.Skip()
+
     ################################
     # SETTERS AND GETTERS
+    def getGlyphCacheStats(self):
+        """Returns dict with hit / miss counters and memory use of glyph cache"""
+        return self.glyphCache.getStats()
+
+    def setGlyphCacheCapacity(self, capacity):
+        """Set memory cap of glyph cache in bytes"""
+        self.glyphCache.setCapacity(capacity)
+
+    def getUndoStats(self):
+        """Returns dict with counts of undo / redo steps and memory use of undo history"""
+        return self.processing.getJournal().getStats()
+
+    def setUndoCapacity(self, capacity):
+        """Set memory cap of undo history in bytes, oldest steps are dropped over it"""
+        self.undoCapacity = capacity
+        self.processing.getJournal().setCapacity(capacity)
+
+    def setTracing(self, enabled):
+        """Switch collecting of timing spans on or off - see tracing"""
+        TRACER.enable(enabled)
+
+    def getTraceReport(self):
+        """Returns dict span name -> latency histogram"""
+        return TRACER.getHistogram()
+
+    def getExportSizes(self):
+        """Returns dict export format -> int flash bytes of edited font, None where format can not hold it - see exporters"""
+        return self.processing.getExportSizes()
+
     def setWidgetsByteWidth(self):
-        """Sets byte width to all widgets using it to match data"""
+        """Sets byte width, pages and data layout to all widgets using it to match data"""
+        self.glyphWidget.setPages(self.processing.getFontPages())
+        self.fontWidget.setPages(self.processing.getFontPages())
+        self.glyphWidget.setLayout(self.processing.getFontRowBytes())
+        self.fontWidget.setLayout(self.processing.getFontRowBytes())
         self.glyphWidget.setByteWidth(self.processing.getFontByteWidth())
         self.fontWidget.setByteWidth(self.processing.getFontByteWidth())
 
@@ -511,6 +616,90 @@ class MainFrame(wx.Frame):
         self.hoverLabel.GetParent().GetContainingSizer().Layout()
 
     # TextCtrl
+    def getArraysAvailable(self):
+        """For purpose of Options window - returns list of str names of arrays found in text"""
+        self.arrayIndex.scan(self.textCtrl.GetValue(), self.processing) # pre-scan only, arrays are parsed when selected
+        return [array["name"] for array in self.arrayIndex.getArrays()]
+
+    def getSelectedArray(self):
+        """Returns int index of array being edited"""
+        return self.processing.getSelectedArray()
+
+    def setSelectedArray(self, index):
+        """Switch editing to another array of text, parse of array selected before is reused"""
+        if self.isParsing(): return # worker result would belong to previous array
+        self.arrayIndex.scan(self.textCtrl.GetValue(), self.processing)
+        if index >= self.arrayIndex.getCount(): return
+        self.processing = self.arrayIndex.getProcessing(index)
+        self.debugInfo("ui", "info:", "Selected array", index, self.arrayIndex.getArrays()[index]["name"], "parsed arrays kept", self.arrayIndex.getCacheSize())
+        self.refreshAfterImport()
+
+    def getTransformsAvailable(self):
+        """For purpose of Options window - returns list of dicts"""
+        return self.transformModes
+
+    def getFontPagesAvailable(self):
+        """For purpose of Options window - returns list of dicts"""
+        return self.fontPagesModes
+
+    def getFontPages(self):
+        """Returns int bytes per glyph column"""
+        return self.processing.getFontPages()
+
+    def setFontPages(self, pages):
+        """Set font height in pages of 8 pixels, text is parsed again - glyph width gets detected for new height"""
+        if self.isParsing(): return
+        self.processing.setFontPages(pages)
+        self.arrayIndex.setFontPages(pages)
+        text = self.processing.getCompleteString()
+        if len(text) > self.SYNC_PARSE_LIMIT:
+            self.setParsingState(True)
+            self.parseWorker.submit(text, self.processing.getSelectedArray(), pages, self.processing.getFontRowBytes()) # result comes to onParseResult
+            return
+        self.processing.importData(text)
+        self.refreshAfterImport()
+
+    def getDataLayoutsAvailable(self):
+        """For purpose of Options window - returns list of dicts"""
+        return self.dataLayoutModes
+
+    def getDataLayout(self):
+        """Returns int bytes per pixel row, 0 for vertical data"""
+        return self.processing.getFontRowBytes()
+
+    def setDataLayout(self, rowBytes):
+        """Set how data is read - vertical, or horizontal with rowBytes bytes per row, text is parsed again"""
+        if self.isParsing(): return
+        self.processing.setFontRowBytes(rowBytes)
+        self.arrayIndex.setFontRowBytes(rowBytes)
+        text = self.processing.getCompleteString()
+        if len(text) > self.SYNC_PARSE_LIMIT:
+            self.setParsingState(True)
+            self.parseWorker.submit(text, self.processing.getSelectedArray(), self.processing.getFontPages(), rowBytes) # result comes to onParseResult
+            return
+        self.processing.importData(text)
+        self.refreshAfterImport()
+
+    def convertDataLayout(self):
+        """Convert data of array to other layout - vertical to horizontal and back, text is written again"""
+        if self.isParsing(): return
+        if not self.processing.convertLayout(not self.processing.getFontRowBytes()): return
+        self.arrayIndex.setFontPages(self.processing.getFontPages())
+        self.arrayIndex.setFontRowBytes(self.processing.getFontRowBytes())
+        self.textCtrl.ChangeValue(self.processing.getCompleteString()) # whole array written again, no text event
+        self.refreshAfterImport()
+
+    def getDuplicateGroups(self):
+        """Returns list of lists of indexes of identical glyphs - see GlyphIndex"""
+        return self.processing.getGlyphIndex().getDuplicateGroups()
+
+    def deduplicateGlyphs(self):
+        """Drop repeated glyphs of array, text is written again"""
+        if self.isParsing(): return
+        if self.processing.deduplicateGlyphs() is None: return
+        self.textCtrl.ChangeValue(self.processing.getCompleteString()) # whole array written again, no text event
+        self.refreshAfterImport()
+
     def getTextCtrlModesAvailable(self):
         """For purpose of Options window - returns list of dicts"""
         return self.textCtrlModes
@@ -550,12 +739,13 @@ class MainFrame(wx.Frame):
             if data < 32: return controlCharacters[data]
             else: return chr(data).decode(self.indicatorPanelEncodings[self.selectedIndicatorPanelEncoding]["name"], "replace") # 
 
-    def updateSelectedGlyph(self):
-        """UPDATES SLECTED GLYPH IN BOTH TEXTFIELD AND PARSED DATA"""
-        completeGlyphList = self.processing.getCompleteGlyphList()
+    @traced("ui.updateSelectedGlyph")
+    def updateSelectedGlyph(self, merge=None):
+        """UPDATES SLECTED GLYPH IN BOTH TEXTFIELD AND PARSED DATA
+        merge - key of undo step, see DataProcessing.commitValues"""
         selectedGlyphIndex = self.processing.getSelectedGlyphIndex()
 
-        if len(completeGlyphList) > 0:
+        if self.processing.getGlyphCount() > 0:
             # need at least one glyph
             pass
         else:
@@ -564,45 +754,103 @@ class MainFrame(wx.Frame):
 
         self.debugInfo("\n\n================================= DATA UPDATE START =======================================")
 
-        showPosition = completeGlyphList[selectedGlyphIndex][0]["start"] # move textfield cursor to first byte of selected glyph
+        showPosition = self.processing.getGlyphOffset(selectedGlyphIndex) # move textfield cursor to first byte of selected glyph
 
         self.ignoreTextEvent = True
-        for byteindex in range(0,len(completeGlyphList[selectedGlyphIndex])):
-            if len(completeGlyphList) > 0:
-                tempDict = completeGlyphList[selectedGlyphIndex][byteindex]
-            else: break
-            startpos = tempDict["start"]
-            endpos = tempDict["end"]
-            data = self.glyphWidget.data[byteindex]
-            self.debugInfo("ui", "UPDATE DATA > startpos", startpos, "> endpos", endpos, "> data", data, "> base 16 > 0x%02X" % (data)) # 
-            self.processing.updateCurrentDataset(startpos, endpos, data)
-            # Simple method - no colours
-            if self.textCtrlModes[self.selectedTextCtrlMode]["method"] == 0: self.updateTextCtrlDataSmart(startpos, endpos, data)
-
-        if self.textCtrlModes[self.selectedTextCtrlMode]["method"] == 1:
+        changes = self.processing.commitValues(merge) # glyph widget writes into font model, text follows in one update
+        self.debugInfo("ui", "UPDATE DATA > glyph", selectedGlyphIndex, "> data", self.glyphWidget.data, "> changes", changes)
+        self.updateTextCtrl(changes, showPosition)
+
+        self.debugInfo("====================================== DATA UPDATE END ===================================\n\n")
+        self.ignoreTextEvent = False
+
+    @traced("ui.updateTextCtrl")
+    def updateTextCtrl(self, changes, showPosition):
+        """Write changed text ranges to TextCtrl by selected mode"""
+        if self.textCtrlModes[self.selectedTextCtrlMode]["method"] == 0:
+            for change in changes: self.updateTextCtrlDataSmart(change)
+
+        elif self.textCtrlModes[self.selectedTextCtrlMode]["method"] == 1:
             self.textCtrl.ChangeValue(self.processing.getCompleteString())
             #self.textCtrl.ShowPosition(0) # move to start, append leaves cursor at the end
-            self.textCtrl.ShowPosition(self.processing.startOffset + showPosition) # move to selected position + add offset
+            self.showTextPosition(showPosition) # move to selected position
 
         elif self.textCtrlModes[self.selectedTextCtrlMode]["method"] == 2:
             self.recreateTextfieldFromCurrentData()
             #self.textCtrl.ShowPosition(0) # move to start, append leaves cursor at the end
-            self.textCtrl.ShowPosition(self.processing.startOffset + showPosition) # move to selected position + add offset
+            self.showTextPosition(showPosition) # move to selected position
 
-        self.debugInfo("====================================== DATA UPDATE END ===================================\n\n")
+    def transformSelectedGlyph(self, operation):
+        """Apply transform to selected glyph - see transformGlyphs"""
+        selectedGlyphIndex = self.processing.getSelectedGlyphIndex()
+        self.transformGlyphs(operation, selectedGlyphIndex, selectedGlyphIndex + 1)
+
+    def transformGlyphs(self, operation, first=None, end=None):
+        """Apply transform to glyphs first up to end, to whole font by default - one pass over font model, one text update"""
+        if self.isParsing() or not self.processing.getGlyphCount(): return
+        self.ignoreTextEvent = True
+        changes = self.processing.transformGlyphs(operation, 1, first, end)
+        self.updateTextCtrl(changes, self.processing.getGlyphOffset(self.processing.getSelectedGlyphIndex()))
         self.ignoreTextEvent = False
+        if first is not None and end == first + 1 and first == self.processing.getSelectedGlyphIndex():
+            self.updateFontWidgetGlyph() # patch only selected glyph of font sheet
+        else:
+            self.loadFontWidgetImageData()
+            self.fontWidget.Refresh()
+        self.glyphWidget.Refresh() # view of font model, already holds new values
+
+    def undo(self):
+        """Revert last edit of font data - pixels, moves, columns..."""
+        if self.isParsing(): return
+        self.refreshAfterJournal(self.processing.undo())
+
+    def redo(self):
+        """Repeat last undone edit of font data"""
+        if self.isParsing(): return
+        self.refreshAfterJournal(self.processing.redo())
+
+    def refreshAfterJournal(self, result):
+        """Update text and widgets after undo or redo - see DataProcessing.applyStep"""
+        if result is None: return # nothing to undo / redo
+        self.debugInfo("ui", "info:", "Journal", result["kind"], "> glyphs", result["glyphs"], "> journal", self.processing.getJournal().getStats())
+        if result["changes"] is None:
+            # columns inserted or erased, whole text changed
+            self.setWidgetsByteWidth()
+            self.loadFontWidgetImageData()
+            self.fontWidget.Refresh()
+            self.loadGlyphWidgetImageData()
+            self.glyphWidget.Refresh()
+            self.textCtrl.ChangeValue(self.processing.getCompleteString())
+            return
+        glyphs = result["glyphs"]
+        if glyphs and self.processing.getSelectedGlyphIndex() not in glyphs:
+            # show glyph where the change happened
+            self.processing.setSelectedGlyphIndex(glyphs[0])
+            self.fontWidget.refreshGlyph(self.fontWidget.getSelectedIndex()) # previous selection
+            self.fontWidget.setSelectedIndex(glyphs[0])
+            self.selectedLabel.SetLabel(self.indicatorPanelLabelFormat(glyphs[0]))
+            self.loadGlyphWidgetImageData()
+        self.ignoreTextEvent = True
+        self.updateTextCtrl(result["changes"], self.processing.getGlyphOffset(self.processing.getSelectedGlyphIndex()))
+        self.ignoreTextEvent = False
+        for index in glyphs: self.fontWidget.refreshGlyph(index) # font model already holds new values
+        self.glyphWidget.Refresh()
+
+    def showTextPosition(self, offset):
+        """Scroll TextCtrl to offset in parsed text, line index of core makes it independent of newline chars length"""
+        column, line = self.processing.getTextPosition(offset)
+        self.textCtrl.ShowPosition(self.textCtrl.XYToPosition(column, line))
 
     # FASTEST - most preferred way
-    def updateTextCtrlDataSmart(self, startpos, endpos, data):
-        """Fastest method, -> newline chars must be fixed before"""
-        textfieldStartpos = startpos + self.processing.startOffset
-        textfieldEndpos = endpos + self.processing.startOffset
-        
+    def updateTextCtrlDataSmart(self, change):
+        """Fastest method, replaces changed range of text in one call -> newline chars must be fixed before"""
         word_colour = wx.TextAttr(wx.RED, wx.LIGHT_GREY) # optional bg: wx.NullColour
-        self.textCtrl.Replace(textfieldStartpos, textfieldEndpos, "0x%02X" % (data))
-        self.textCtrl.SetStyle(textfieldStartpos, textfieldEndpos, word_colour)
+        self.textCtrl.Replace(change["start"], change["end"], change["text"])
+        for textfieldStartpos, textfieldEndpos in change["tokens"]:
+            self.textCtrl.SetStyle(textfieldStartpos, textfieldEndpos, word_colour) # mark changed values
 
     # OPTIONAL Super SLOW - most featured
+    @traced("ui.recreateTextfield")
     def recreateTextfieldFromCurrentData(self):
         """Fully recreates the textfield, every single value can have its colour depending on state -> using two states, futureproof"""
         self.textCtrl.SetValue("")
@@ -636,19 +884,25 @@ class MainFrame(wx.Frame):
     ################################
     # WIDGET IMAGE DATA LOADERS
     def loadGlyphWidgetImageData(self):
-        if not self.processing.glyphList:
+        if not self.processing.getGlyphCount():
             self.debugInfo("ui", "Warning:", "self.processing.glyphList is empty!")
             pass # return
         else:
-            self.glyphWidget.data = [ int(sub['hexdata'], 16) for sub in self.processing.glyphList[self.processing.getSelectedGlyphIndex()] ]
+            self.glyphWidget.data = self.processing.getGlyphSlice(self.processing.getSelectedGlyphIndex()) # view into font model, no copy
             self.debugInfo("ui", "info:", "self.glyphWidget.data loaded with >", self.glyphWidget.data) #
 
+    def updateFontWidgetGlyph(self):
+        """Refresh cell of selected glyph only, font widget shares font model - independent of font size"""
+        selectedGlyphIndex = self.processing.getSelectedGlyphIndex()
+        if selectedGlyphIndex >= self.processing.getGlyphCount(): return
+        self.fontWidget.refreshGlyph(selectedGlyphIndex)
+
     def loadFontWidgetImageData(self):
-        if not self.processing.glyphList:
+        if not self.processing.getGlyphCount():
             self.debugInfo("ui", "Warning:", "self.processing.glyphList is empty!")
             pass # return
         else:
-            self.fontWidget.data = [ int(sub['hexdata'], 16) for glyph in self.processing.glyphList for sub in glyph ]
+            self.fontWidget.data = self.processing.getFontValues() # font model itself, no copy
             self.debugInfo("ui", "info:", "self.fontWidget.data loaded with >", len(self.fontWidget.data), "items.") #
 
     ################################
@@ -50,6 +50,10 @@ class OptionsFrame(wx.Frame):
         self.settingsLabel = wx.StaticText(mainPanel, label="Settings")
         self.settingsLabel.SetForegroundColour("#FFFFFF")
         self.settingsLabel.SetFont(font)
+        sizes = self.parent.getExportSizes()
+        self.exportSizesLabel = wx.StaticText(mainPanel, label="Flash bytes\n" + "\n".join(["%s: %s" % (exportFormat, sizes[exportFormat] if sizes[exportFormat] is not None else "n/a") for exportFormat in sorted(sizes)]))
+        self.exportSizesLabel.SetForegroundColour("#FFFFFF")
+        self.exportSizesLabel.SetToolTip(wx.ToolTip("Size of font exported by lcdfonteditor-cli --export"))
 
         ################
         # INSERTION BUTTONS
@@ -61,6 +65,46 @@ class OptionsFrame(wx.Frame):
         self.addLeftButton.identifier = "insertleft"
         self.Bind(wx.EVT_BUTTON, self.onButton, self.addLeftButton)
 
+        ################
+        # TRANSFORM COMBOBOX & BUTTONS
+        self.transforms = self.parent.getTransformsAvailable()
+        transformNames = [transform['name'] for transform in self.transforms]
+        self.selectTransform = wx.ComboBox(mainPanel, value = transformNames[0], choices=transformNames, style=wx.CB_READONLY)
+        self.selectTransform.SetToolTip(wx.ToolTip("Transform"))
+
+        self.transformGlyphButton = wx.Button(mainPanel,id = wx.ID_ANY, label="Transform glyph")
+        self.transformGlyphButton.identifier = "transformglyph"
+        self.Bind(wx.EVT_BUTTON, self.onTransform, self.transformGlyphButton)
+
+        self.transformFontButton = wx.Button(mainPanel,id = wx.ID_ANY, label="Transform all glyphs")
+        self.transformFontButton.identifier = "transformfont"
+        self.Bind(wx.EVT_BUTTON, self.onTransform, self.transformFontButton)
+
+        ################
+        # UNDO / REDO BUTTONS
+        self.undoButton = wx.Button(mainPanel,id = wx.ID_ANY, label="Undo")
+        self.undoButton.identifier = "undo"
+        self.undoButton.SetToolTip(wx.ToolTip("Undo last edit (Ctrl+Z)"))
+        self.Bind(wx.EVT_BUTTON, self.onButton, self.undoButton)
+
+        self.redoButton = wx.Button(mainPanel,id = wx.ID_ANY, label="Redo")
+        self.redoButton.identifier = "redo"
+        self.redoButton.SetToolTip(wx.ToolTip("Redo undone edit (Ctrl+Y)"))
+        self.Bind(wx.EVT_BUTTON, self.onButton, self.redoButton)
+
+        ################
+        # DATA LAYOUT BUTTON
+        self.convertLayoutButton = wx.Button(mainPanel,id = wx.ID_ANY, label="Convert data layout")
+        self.convertLayoutButton.SetToolTip(wx.ToolTip("Rewrite data vertical <-> horizontal"))
+        self.Bind(wx.EVT_BUTTON, self.onConvertLayout, self.convertLayoutButton)
+
+        ################
+        # DUPLICATES BUTTON
+        duplicateGroups = self.parent.getDuplicateGroups()
+        self.deduplicateButton = wx.Button(mainPanel,id = wx.ID_ANY, label="Remove duplicate glyphs (%d)" % sum([len(group) - 1 for group in duplicateGroups]))
+        self.deduplicateButton.SetToolTip(wx.ToolTip("Identical glyphs in %d groups, glyphs after removed ones move" % len(duplicateGroups)))
+        self.Bind(wx.EVT_BUTTON, self.onDeduplicate, self.deduplicateButton)
+
         ################
         # REMOVAL BUTTONS
         self.removeRightButton = wx.Button(mainPanel,id = wx.ID_ANY, label="Remove rightmost line")
@@ -99,6 +143,33 @@ class OptionsFrame(wx.Frame):
         self.selectEncoding.Bind(wx.EVT_COMBOBOX, self.onSelectEncoding)
         self.selectEncoding.SetToolTip(wx.ToolTip("Indicator Encoding"))
 
+        ################
+        # SELECT ARRAY COMBOBOX
+        arrays = self.parent.getArraysAvailable()
+        if not arrays: arrays = ["no array found"]
+        self.selectArray = wx.ComboBox(mainPanel, value = arrays[min(self.parent.getSelectedArray(), len(arrays) - 1)], choices=arrays, style=wx.CB_READONLY)
+        self.selectArray.Bind(wx.EVT_COMBOBOX, self.onSelectArray)
+        self.selectArray.SetToolTip(wx.ToolTip("Array to edit"))
+
+        ################
+        # SELECT FONT HEIGHT COMBOBOX
+        self.fontPagesModes = self.parent.getFontPagesAvailable()
+        heights = [mode['name'] for mode in self.fontPagesModes]
+        selectedHeight = [mode['pages'] for mode in self.fontPagesModes].index(self.parent.getFontPages()) if self.parent.getFontPages() <= len(heights) else 0
+        self.selectFontHeight = wx.ComboBox(mainPanel, value = heights[selectedHeight], choices=heights, style=wx.CB_READONLY)
+        self.selectFontHeight.Bind(wx.EVT_COMBOBOX, self.onSelectFontHeight)
+        self.selectFontHeight.SetToolTip(wx.ToolTip("Font height"))
+
+        ################
+        # SELECT DATA LAYOUT COMBOBOX
+        self.dataLayoutModes = self.parent.getDataLayoutsAvailable()
+        layouts = [mode['name'] for mode in self.dataLayoutModes]
+        rowBytes = [mode['rowbytes'] for mode in self.dataLayoutModes]
+        selectedLayout = rowBytes.index(self.parent.getDataLayout()) if self.parent.getDataLayout() in rowBytes else 0
+        self.selectDataLayout = wx.ComboBox(mainPanel, value = layouts[selectedLayout], choices=layouts, style=wx.CB_READONLY)
+        self.selectDataLayout.Bind(wx.EVT_COMBOBOX, self.onSelectDataLayout)
+        self.selectDataLayout.SetToolTip(wx.ToolTip("Data layout"))
+
         ################
         # OPTIONS
         sizerOptions = wx.BoxSizer(wx.VERTICAL)
@@ -108,6 +179,13 @@ class OptionsFrame(wx.Frame):
         sizerOptions.Add(self.addLeftButton, 0, wx.EXPAND | wx.ALL, 20)
         sizerOptions.Add(self.removeRightButton, 0, wx.EXPAND | wx.ALL, 20)
         sizerOptions.Add(self.removeLeftButton, 0, wx.EXPAND | wx.ALL, 20)
+        sizerOptions.Add(self.selectTransform, 0, wx.EXPAND | wx.ALL, 20)
+        sizerOptions.Add(self.transformGlyphButton, 0, wx.EXPAND | wx.ALL, 20)
+        sizerOptions.Add(self.transformFontButton, 0, wx.EXPAND | wx.ALL, 20)
+        sizerOptions.Add(self.undoButton, 0, wx.EXPAND | wx.ALL, 20)
+        sizerOptions.Add(self.redoButton, 0, wx.EXPAND | wx.ALL, 20)
+        sizerOptions.Add(self.convertLayoutButton, 0, wx.EXPAND | wx.ALL, 20)
+        sizerOptions.Add(self.deduplicateButton, 0, wx.EXPAND | wx.ALL, 20)
 
         #self.separator = wx.StaticLine(mainPanel)
         #vbox.Add(self.separator, 0, wx.EXPAND | wx.ALL, 20)
@@ -122,6 +200,10 @@ class OptionsFrame(wx.Frame):
         sizerSettings.Add(self.selectFontWidgetMode, 0, wx.EXPAND | wx.ALL, 20)
         sizerSettings.Add(self.selectTextMode, 0, wx.EXPAND | wx.ALL, 20)
         sizerSettings.Add(self.selectEncoding, 0, wx.EXPAND | wx.ALL, 20)
+        sizerSettings.Add(self.selectArray, 0, wx.EXPAND | wx.ALL, 20)
+        sizerSettings.Add(self.selectFontHeight, 0, wx.EXPAND | wx.ALL, 20)
+        sizerSettings.Add(self.selectDataLayout, 0, wx.EXPAND | wx.ALL, 20)
+        sizerSettings.Add(self.exportSizesLabel, 0, wx.EXPAND | wx.ALL, 20)
 
         ################
         # MAIN PANEL SIZER
@@ -141,6 +223,12 @@ class OptionsFrame(wx.Frame):
         """Process button events"""
         self.parent.onButtons(event) # Button events are sent to main ui
 
+    def onTransform(self, event):
+        """Process transform buttons - operation selected in combo is applied to selected glyph or whole font"""
+        operation = self.transforms[max(0, self.selectTransform.GetCurrentSelection())]["operation"]
+        if event.GetEventObject().identifier == "transformfont": self.parent.transformGlyphs(operation)
+        else: self.parent.transformSelectedGlyph(operation)
+
     def onSelectEncoding(self, event):
         """Process Indicator Panel encoding combo event"""
         combo = event.GetEventObject()
@@ -154,6 +242,34 @@ class OptionsFrame(wx.Frame):
         modeIndex = combo.GetCurrentSelection()
         self.parent.setTextCtrlMode(modeIndex)
         
+    def onSelectArray(self, event):
+        """Process array combo event"""
+        combo = event.GetEventObject()
+        self.parent.setSelectedArray(combo.GetCurrentSelection())
+
+    def onSelectFontHeight(self, event):
+        """Process font height combo event"""
+        combo = event.GetEventObject()
+        self.parent.setFontPages(self.fontPagesModes[combo.GetCurrentSelection()]["pages"])
+
+    def onSelectDataLayout(self, event):
+        """Process data layout combo event"""
+        combo = event.GetEventObject()
+        self.parent.setDataLayout(self.dataLayoutModes[combo.GetCurrentSelection()]["rowbytes"])
+
+    def onConvertLayout(self, event):
+        """Process convert data layout button - combos follow converted data"""
+        self.parent.convertDataLayout()
+        rowBytes = [mode['rowbytes'] for mode in self.dataLayoutModes]
+        if self.parent.getDataLayout() in rowBytes: self.selectDataLayout.SetSelection(rowBytes.index(self.parent.getDataLayout()))
+        pages = [mode['pages'] for mode in self.fontPagesModes]
+        if self.parent.getFontPages() in pages: self.selectFontHeight.SetSelection(pages.index(self.parent.getFontPages()))
+
+    def onDeduplicate(self, event):
+        """Process remove duplicate glyphs button"""
+        self.parent.deduplicateGlyphs()
+        self.deduplicateButton.SetLabel("Remove duplicate glyphs (%d)" % sum([len(group) - 1 for group in self.parent.getDuplicateGroups()]))
+
     def onSelectGlyphWidgetMode(self, event):
         """Process Glyph Widget mode combo event"""
         combo = event.GetEventObject()
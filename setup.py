@@ -77,8 +77,9 @@ setuptools.setup(
     package_data={"lcdfonteditor.ui": ["icons/*.png"]},
     data_files=os_files,
     python_requires='>=2.6',
-    scripts=["bin/lcdfonteditor"],
+    scripts=["bin/lcdfonteditor", "bin/lcdfonteditor-cli"],
     install_requires=requirements,
+    extras_require={"numpy" : ["numpy"]}, # optional, faster whole font transforms
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Intended Audience :: Developers',
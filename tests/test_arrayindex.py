@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Array index - arrays of multi-font source found without tokenizing, parsed on selection and kept
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.arrayindex import ArrayIndex
+from lcdfonteditor.ui.dataprocessing.core import findArrays
+
+################
+# SOURCE
+SOURCE = """// two fonts and a function
+static const uint8_t small[][3] PROGMEM = {
+    {0x01, 0x02, 0x03},
+    {0x04, 0x05, 0x06},
+};
+void draw(void) { if (x) { y = 0; } }
+const unsigned char big[] = {
+    0x10, 0x20, 0x30, 0x40, 0x50,
+    0x60, 0x70, 0x80, 0x90, 0xA0,
+};
+"""
+
+################
+# TESTS
+class FindArraysTest(unittest.TestCase):
+    def testArrays(self):
+        arrays = findArrays(SOURCE)
+        self.assertEqual([(array["name"], array["bytes"], array["width"]) for array in arrays], [("small", 6, 3), ("big", 10, 5)]) # function body skipped
+        self.assertEqual(SOURCE[arrays[1]["declaration"]:].split(" ")[0], "big[]")
+
+    def testUnmatchedBrace(self):
+        self.assertEqual(findArrays("{ 0x01, 0x02 "), [])
+
+class ArrayIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = ArrayIndex()
+        self.index.scan(SOURCE)
+
+    def testParseOnSelection(self):
+        self.assertEqual(self.index.getCount(), 2)
+        self.assertEqual(self.index.getCacheSize(), 0)
+        big = self.index.getProcessing(1)
+        self.assertEqual((big.getFontByteWidth(), big.getGlyphCount()), (5, 2))
+        self.assertTrue(self.index.getProcessing(1) is big) # kept for next selection
+        self.assertEqual(self.index.getProcessing(0).getFontByteWidth(), 3)
+        self.assertEqual(self.index.getCacheSize(), 2)
+
+    def testEditedArrayKept(self):
+        small = self.index.getProcessing(0)
+        small.updateGlyph(0, [0x0A, 0x0B, 0x0C])
+        text = small.getCompleteString()
+        self.index.scan(text, small)
+        self.assertTrue(self.index.getProcessing(0) is small)
+        self.assertEqual(list(self.index.getProcessing(1).getFontValues())[:2], [0x10, 0x20])
+
+    def testChangedArrayParsedAgain(self):
+        small = self.index.getProcessing(0)
+        self.index.scan(SOURCE.replace("0x04", "0x44"))
+        self.assertFalse(self.index.getProcessing(0) is small)
+        self.assertEqual(list(self.index.getProcessing(0).getFontValues()), [1, 2, 3, 0x44, 5, 6])
+
+    def testLayoutDropsParses(self):
+        self.index.getProcessing(0)
+        self.index.setFontPages(2)
+        self.assertEqual(self.index.getCacheSize(), 0)
+        self.index.setFontRowBytes(1)
+        self.assertEqual(self.index.getProcessing(1).getFontRowBytes(), 1)
+
+if __name__ == '__main__':
+    unittest.main()
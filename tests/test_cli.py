@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Command line converter - files in temporary directory, exit status and written results
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor import cli
+from lcdfonteditor.ui.dataprocessing.core import DataProcessing
+
+################
+# FONTS
+FONT = "const uint8_t font[] = {\n    0x01, 0x02, 0x03,\n    0x04, 0x05, 0x06,\n    0x01, 0x02, 0x03,\n};\n"
+
+################
+# TESTS
+class CliTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.font = self.path("font.h")
+        self.write(self.font, FONT)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def write(self, path, text):
+        stream = io.open(path, "w", encoding="utf-8")
+        try: stream.write(cli.textType(text))
+        finally: stream.close()
+
+    def read(self, path, mode="r"):
+        stream = open(path, mode)
+        try: return stream.read()
+        finally: stream.close()
+
+    def runCli(self, *arguments):
+        return cli.main(["--quiet"] + list(arguments))
+
+    def parse(self, path):
+        """Returns DataProcessing of written file"""
+        processing = DataProcessing(None, 0)
+        processing.importData(self.read(path))
+        return processing
+
+    def testColumnOperationsInOrder(self):
+        output = self.path("out.h")
+        self.assertEqual(self.runCli("--insert-left", "2", "--erase-right", "1", self.font, "-o", output), 0)
+        processing = self.parse(output)
+        self.assertEqual(list(processing.getFontValues()), [0, 0, 1, 2, 0, 0, 4, 5, 0, 0, 1, 2])
+        self.assertTrue(self.read(output).startswith("const uint8_t font[] = {"))
+
+    def testCheck(self):
+        self.assertEqual(self.runCli("--check", self.font), 0)
+        broken = self.path("broken.h")
+        self.write(broken, "{\n0x01, 0x02,\n0x03, 0x04,\n0x05,\n}\n")
+        self.assertEqual(self.runCli("--width", "2", "--check", broken), 1) # last glyph incomplete
+
+    def testErrorStatus(self):
+        self.assertEqual(self.runCli("--check", self.path("missing.h")), 2)
+
+    def testReformat(self):
+        self.write(self.font, "{0x01,0x02,0x03,0x04}\n")
+        self.assertEqual(self.runCli("--width", "2", "--reformat", "--in-place", self.font), 0)
+        self.assertEqual(self.read(self.font), "{\n    0x01, 0x02,\n    0x03, 0x04\n}\n")
+
+    def testOutputDirAndParallelJobs(self):
+        second = self.path("second.h")
+        self.write(second, FONT.replace("0x06", "0x07"))
+        output = self.path("out")
+        os.mkdir(output)
+        summary = self.path("summary.tsv")
+        self.assertEqual(self.runCli("--jobs", "2", "--insert-right", "1", "--output-dir", output, "--summary", summary, self.font, second), 0)
+        self.assertEqual(sorted(os.listdir(output)), ["font.h", "second.h"])
+        self.assertEqual(self.parse(os.path.join(output, "second.h")).getFontByteWidth(), 4)
+        lines = self.read(summary).splitlines()
+        self.assertEqual([line.split("\t")[0] for line in lines[1:3]], ["ok", "ok"]) # header, line per file and total
+        self.assertTrue(lines[3].startswith("# 2 files"))
+
+    def testDedupAndRemap(self):
+        output, remap = self.path("out.h"), self.path("remap.h")
+        self.assertEqual(self.runCli("--dedup", "--remap", remap, self.font, "-o", output), 0)
+        self.assertEqual(self.parse(output).getGlyphCount(), 2)
+        self.assertTrue("0, 1, 0" in self.read(remap))
+
+    def testExport(self):
+        output = self.path("font.bin")
+        self.assertEqual(self.runCli("--export", "bin", self.font, "-o", output), 0)
+        self.assertEqual(bytearray(self.read(output, "rb")), bytearray([1, 2, 3, 4, 5, 6, 1, 2, 3]))
+        output = self.path("font_gfx.h")
+        self.assertEqual(self.runCli("--export", "gfx", "--name", "Small", "--first-char", "32", self.font, "-o", output), 0)
+        self.assertTrue("const GFXfont Small PROGMEM" in self.read(output))
+
+    def testTrace(self):
+        trace = self.path("trace.json")
+        self.assertEqual(self.runCli("--trace", trace, "--check", self.font), 0)
+        self.assertTrue("core.importData" in json.loads(self.read(trace)))
+
+    def testOptionErrors(self):
+        stderr = sys.stderr
+        sys.stderr = io.StringIO() if sys.version_info[0] > 2 else io.BytesIO()
+        try:
+            for arguments in (["--height", "12"], ["--export", "bin", "--in-place"], ["--insert-right", "0"]):
+                self.assertRaises(SystemExit, self.runCli, *(arguments + [self.font]))
+        finally: sys.stderr = stderr
+
+if __name__ == '__main__':
+    unittest.main()
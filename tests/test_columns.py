@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Column engine - insert and erase of columns in token table, positions out of glyph are refused
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing import columns
+from lcdfonteditor.ui.dataprocessing.core import DataProcessing, HEXPATTERN
+from lcdfonteditor.ui.dataprocessing.glyphtable import GlyphTable
+
+################
+# HELPERS
+def scanTable(text, bytewidth):
+    """Returns GlyphTable of text"""
+    table = GlyphTable(bytewidth)
+    table.scan(text, HEXPATTERN)
+    return table
+
+def assertTableMatchesText(test, text, table):
+    """Offsets and values of table must equal fresh scan of text"""
+    fresh = scanTable(text, table.bytewidth)
+    test.assertEqual(list(table.starts), list(fresh.starts))
+    test.assertEqual(list(table.ends), list(fresh.ends))
+    test.assertEqual(table.values, fresh.values)
+
+################
+# TESTS
+class ColumnEngineTest(unittest.TestCase):
+    text = "0x01, 0x02, 0x03,\n0x04, 0x05, 0x06,\n0x07, 0x08"
+
+    def testInsert(self):
+        for position in range(4):
+            newText, newTable = columns.insertColumns(self.text, scanTable(self.text, 3), position, 2, 0xAA)
+            self.assertEqual(newTable.bytewidth, 5)
+            assertTableMatchesText(self, newText, newTable)
+        newText, newTable = columns.insertColumns(self.text, scanTable(self.text, 3), 1)
+        self.assertEqual(list(newTable.values), [1, 0, 2, 3, 4, 0, 5, 6, 7, 0, 8])
+
+    def testInsertIncompleteLastGlyph(self):
+        newText, newTable = columns.insertColumns(self.text, scanTable(self.text, 3), 3)
+        self.assertEqual(list(newTable.values), [1, 2, 3, 0, 4, 5, 6, 0, 7, 8]) # last glyph ends before position
+        assertTableMatchesText(self, newText, newTable)
+
+    def testErase(self):
+        newText, newTable = columns.eraseColumns(self.text, scanTable(self.text, 3), 1, 2)
+        self.assertEqual(newTable.bytewidth, 1)
+        self.assertEqual(list(newTable.values), [1, 4, 7])
+        assertTableMatchesText(self, newText, newTable)
+        newText, newTable = columns.eraseColumns(self.text, scanTable(self.text, 3), 2)
+        self.assertEqual(list(newTable.values), [1, 2, 4, 5, 7, 8])
+        assertTableMatchesText(self, newText, newTable)
+
+    def testOutOfRange(self):
+        table = scanTable(self.text, 3)
+        for position, count in ((-1, 1), (4, 1), (0, 0)):
+            self.assertRaises(ValueError, columns.insertColumns, self.text, table, position, count)
+        for position, count in ((-1, 1), (3, 1), (2, 2), (0, 3), (1, 0)):
+            self.assertRaises(ValueError, columns.eraseColumns, self.text, table, position, count)
+
+class ColumnEditTest(unittest.TestCase):
+    """Column edits of DataProcessing - positions in columns of fontPages bytes"""
+
+    def setUp(self):
+        self.processing = DataProcessing(None, 0)
+        self.processing.importData("{\n0x01, 0x02, 0x03,\n0x04, 0x05, 0x06,\n}")
+        self.text = self.processing.getCompleteString()
+
+    def assertUnchanged(self):
+        self.assertEqual(self.processing.getFontByteWidth(), 3)
+        self.assertEqual(self.processing.getCompleteString(), self.text)
+
+    def testInsertOutOfRange(self):
+        self.assertFalse(self.processing.insertColumns(5, 1))
+        self.assertFalse(self.processing.insertColumns(-1, 1))
+        self.assertFalse(self.processing.insertColumns(1, 0))
+        self.assertUnchanged()
+        self.assertTrue(self.processing.insertColumns(3, 1))
+        self.assertEqual(list(self.processing.getFontValues()), [1, 2, 3, 0, 4, 5, 6, 0])
+
+    def testEraseOutOfRange(self):
+        self.assertFalse(self.processing.eraseColumns(3, 1))
+        self.assertFalse(self.processing.eraseColumns(-1, 1))
+        self.assertFalse(self.processing.eraseColumns(0, 3)) # no column would be left
+        self.assertUnchanged()
+
+    def testEraseCountClamped(self):
+        self.assertTrue(self.processing.eraseColumns(2, 2))
+        self.assertEqual(self.processing.getFontByteWidth(), 2)
+        self.assertEqual(list(self.processing.getFontValues()), [1, 2, 4, 5])
+        self.processing.undo()
+        self.assertEqual(self.processing.getFontByteWidth(), 3)
+        self.assertEqual(list(self.processing.getFontValues()), [1, 2, 3, 4, 5, 6])
+
+    def testUndoRedo(self):
+        self.processing.insertToLeft()
+        self.processing.eraseFromRight()
+        self.assertEqual(list(self.processing.getFontValues()), [0, 1, 2, 0, 4, 5])
+        self.processing.undo()
+        self.processing.undo()
+        self.assertEqual(list(self.processing.getFontValues()), [1, 2, 3, 4, 5, 6]) # separators may differ from original text
+        self.processing.redo()
+        self.assertEqual(list(self.processing.getFontValues()), [0, 1, 2, 3, 0, 4, 5, 6])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Regression tests of data processing core - no wxPython needed
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.core import DataProcessing
+
+################
+# FONTS
+def fontText(glyphs=10, width=5):
+    """Returns str - C array of glyphs, one glyph of width values per line"""
+    lines = ["    %s,\n" % ", ".join(["0x%02X" % ((glyph * width + value) & 0xFF) for value in range(width)]) for glyph in range(glyphs)]
+    return "const uint8_t font[] = {\n%s};\n" % "".join(lines)
+
+def editToken(text, old, new):
+    """Returns str - text with first token old replaced by new"""
+    assert old in text
+    return text.replace(old, new, 1)
+
+################
+# TESTS
+class IncrementalImportTest(unittest.TestCase):
+    """Text edits after operations that replace token table without importData"""
+
+    def setUp(self):
+        self.processing = DataProcessing(None, 0)
+        self.processing.importData(fontText())
+
+    def assertMatchesFullImport(self, text):
+        """Data after incremental import must equal data of fresh full import"""
+        fresh = DataProcessing(None, 0)
+        fresh.importData(text)
+        self.assertEqual(self.processing.getFontByteWidth(), fresh.getFontByteWidth())
+        self.assertEqual(self.processing.getGlyphTable().values, fresh.getGlyphTable().values)
+
+    def testColumnEditThenIncremental(self):
+        self.processing.insertToRight()
+        self.assertEqual(self.processing.getFontByteWidth(), 6)
+        text = editToken(self.processing.getCompleteString(), "0x05", "0x55")
+        self.assertEqual(self.processing.importDataIncremental(text), True)
+        self.assertMatchesFullImport(text)
+
+    def testColumnEraseThenIncremental(self):
+        self.processing.eraseFromLeft()
+        self.assertEqual(self.processing.getWidthDetection()["width"], 4)
+        text = editToken(self.processing.getCompleteString(), "0x06", "0x66")
+        self.assertEqual(self.processing.importDataIncremental(text), True)
+        self.assertMatchesFullImport(text)
+
+    def testUndoColumnEditThenIncremental(self):
+        self.processing.insertToRight()
+        self.assertNotEqual(self.processing.undo(), None)
+        self.assertEqual(self.processing.getFontByteWidth(), 5)
+        text = editToken(self.processing.getCompleteString(), "0x05", "0x55")
+        self.assertEqual(self.processing.importDataIncremental(text), True)
+        self.assertMatchesFullImport(text)
+
+    def testRedoColumnEraseThenIncremental(self):
+        self.processing.eraseFromRight()
+        self.processing.undo()
+        self.assertNotEqual(self.processing.redo(), None)
+        self.assertEqual(self.processing.getFontByteWidth(), 4)
+        text = editToken(self.processing.getCompleteString(), "0x05", "0x55")
+        self.assertEqual(self.processing.importDataIncremental(text), True)
+        self.assertMatchesFullImport(text)
+
+    def testStaleHistogramFallsBackToFullImport(self):
+        self.processing.widthDetection = {"width" : 5, "confidence" : 1.0, "alternatives" : [], "lines" : 1, "histogram" : {7 : 1}}
+        text = editToken(self.processing.getCompleteString(), "0x05", "0x55")
+        self.assertEqual(self.processing.importDataIncremental(text, allowFull=False), None)
+        self.assertEqual(self.processing.importDataIncremental(text), False)
+        self.assertMatchesFullImport(text)
+
+if __name__ == '__main__':
+    unittest.main()
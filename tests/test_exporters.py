@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Exporters - decoded glyphs must equal font model, NumPy and pure python paths must give same output
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import io
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing import exporters
+from lcdfonteditor.ui.dataprocessing.rowmajor import columnsToRows
+
+################
+# DECODERS - pixels as set of (x, y), y from top of glyph box of font
+def fontPixels(font, index):
+    """Returns set of set pixels of glyph of font model"""
+    columns = font["columns"]
+    return set([(x, y) for y, row in enumerate(exporters.glyphRows(font, index)) for x in range(columns) if (row >> (columns - 1 - x)) & 1])
+
+def gfxPixels(bitmap, glyph, baseline):
+    """Returns set of pixels of GFXglyph given as record dict of encodeGfx"""
+    pixels, bit = set(), 0
+    for y in range(glyph["height"]):
+        for x in range(glyph["width"]):
+            if (bitmap[glyph["offset"] + (bit >> 3)] >> (7 - (bit & 7))) & 1: pixels.add((glyph["x"] + x, baseline + glyph["y"] + y))
+            bit += 1
+    return pixels
+
+class BitReader():
+    """Reads values least significant bit first as u8g2 decoder does"""
+    def __init__(self, data, position):
+        self.data, self.position = data, position
+
+    def read(self, bits):
+        value = 0
+        for bit in range(bits):
+            value |= ((self.data[self.position >> 3] >> (self.position & 7)) & 1) << bit
+            self.position += 1
+        return value
+
+    def readSigned(self, bits):
+        return self.read(bits) - (1 << (bits - 1))
+
+def u8g2Pixels(font, encoding, baseline):
+    """Returns tuple (set of pixels, advance) of glyph with encoding, None if font has no such glyph"""
+    data = bytearray(font)
+    position = exporters.U8G2_HEADER_BYTES
+    while data[position] != encoding:
+        if not data[position + 1]: return None
+        position += data[position + 1]
+    header = data[:9] # count, mode, zero bits, one bits, width, height, x, y, advance bits
+    reader = BitReader(data, (position + 2) * 8)
+    width, height = reader.read(header[4]), reader.read(header[5])
+    left, bottom, advance = reader.readSigned(header[6]), reader.readSigned(header[7]), reader.readSigned(header[8])
+    pixels, cursor = set(), 0 # cursor counts pixels of box row by row
+    while width and cursor < width * height:
+        zeros, ones = reader.read(header[2]), reader.read(header[3])
+        while True:
+            cursor += zeros
+            for pixel in range(cursor, cursor + ones): pixels.add((left + pixel % width, baseline - bottom - height + pixel // width))
+            cursor += ones
+            if not reader.read(1): break # no repeat of pair
+    return (pixels, advance)
+
+def randomFont(rand, first=32):
+    """Returns dict of font with mostly empty bytes, vertical or horizontal"""
+    pages, columns, glyphs = rand.randrange(1, 4), rand.randrange(1, 20), rand.randrange(1, 30)
+    values = bytearray([rand.choice([0, 0, rand.randrange(256)]) for i in range(columns * pages * glyphs)])
+    if rand.random() < 0.3:
+        rowBytes = (columns + 7) // 8
+        return exporters.describeFont(columnsToRows(values, columns, pages, rowBytes), rowBytes * 8 * pages, 1, rowBytes, first)
+    return exporters.describeFont(values, columns * pages, pages, 0, first)
+
+################
+# TESTS
+class HelperTest(unittest.TestCase):
+    def testBitLength(self):
+        for value in (0, 1, 2, 3, 255, 256, 1 << 70, (1 << 70) - 1):
+            self.assertEqual(exporters.bitLength(value), len(bin(value)) - 2 if value else 0)
+        self.assertEqual(exporters.unsignedBits(0), 1)
+        self.assertEqual(exporters.unsignedBits(8), 4)
+
+    def testGlyphBox(self):
+        self.assertEqual(exporters.glyphBox([0, 0b0110, 0b0100, 0], 4), (1, 1, 2, 2))
+        self.assertEqual(exporters.glyphBox([0, 0], 4), None)
+        self.assertEqual(exporters.glyphBox([1 << 69, 1], 70), (0, 0, 70, 2)) # wider than float mantissa
+
+class ExportTest(unittest.TestCase):
+    """Formats decoded back to pixels"""
+
+    def testBin(self):
+        values = bytearray(range(256)) * 300
+        stream = io.BytesIO()
+        self.assertEqual(exporters.exportFont(exporters.describeFont(values, 8), exporters.FORMAT_BIN, stream), len(values))
+        self.assertEqual(stream.getvalue(), bytes(values))
+
+    def testGfx(self):
+        rand = random.Random(2)
+        for trial in range(50):
+            font = randomFont(rand)
+            glyphs = []
+            bitmap = bytearray(b"".join(exporters.encodeGfx(font, glyphs)))
+            self.assertEqual(exporters.gfxSize(font), len(bitmap) + exporters.GFX_GLYPH_BYTES * len(glyphs) + exporters.GFX_FONT_BYTES)
+            for index, glyph in enumerate(glyphs):
+                self.assertEqual(gfxPixels(bitmap, glyph, font["baseline"]), fontPixels(font, index))
+                self.assertEqual(glyph["encoding"], 32 + index)
+
+    def testU8g2(self):
+        rand = random.Random(3)
+        for trial in range(50):
+            font = randomFont(rand)
+            data = b"".join(exporters.encodeU8g2(font))
+            self.assertEqual(len(data), exporters.exportSizes(font)[exporters.FORMAT_U8G2])
+            for index in range(font["count"]):
+                self.assertEqual(u8g2Pixels(data, 32 + index, font["baseline"]), (fontPixels(font, index), font["columns"]))
+            self.assertEqual(u8g2Pixels(data, 32 + font["count"], font["baseline"]), None)
+
+    def testFormatLimits(self):
+        font = exporters.describeFont(bytearray(8 * 300), 8, first=0)
+        self.assertRaises(ValueError, exporters.planU8g2, font) # encodings over 255
+        stream = io.StringIO()
+        self.assertTrue(exporters.exportFont(exporters.describeFont(bytearray(8 * 95), 8, first=32), exporters.FORMAT_GFX, stream, "Font") > 0)
+        self.assertTrue("const GFXfont Font PROGMEM" in stream.getvalue())
+
+class DictExportTest(unittest.TestCase):
+    """Column dictionary of random fonts"""
+
+    def testPackIndexes(self):
+        rand = random.Random(0)
+        for bits in range(1, 25):
+            indexes = [rand.randrange(1 << bits) for i in range(rand.randrange(1, 40))]
+            packed = exporters.packIndexes(indexes, bits, useNumpy=False)
+            word = 0
+            for position, value in enumerate(bytearray(packed)): word |= value << (8 * position)
+            self.assertEqual([(word >> (position * bits)) & ((1 << bits) - 1) for position in range(len(indexes))], indexes)
+            if exporters.numpy is not None: self.assertEqual(exporters.packIndexes(indexes, bits, useNumpy=True), packed)
+
+    def testNumpyPlanMatchesPython(self):
+        if exporters.numpy is None: return # optional dependency
+        rand = random.Random(1)
+        for trial in range(20):
+            unit, columns, glyphs = rand.randrange(1, 4), rand.randrange(1, 9), rand.randrange(1, 100)
+            pool = [bytearray([rand.randrange(256) for i in range(unit)]) for i in range(rand.randrange(1, 50))]
+            values = bytearray()
+            for i in range(columns * glyphs): values += rand.choice(pool)
+            font = exporters.describeFont(values, columns * unit, unit)
+            self.assertEqual(exporters.planDict(font, useNumpy=True), exporters.planDict(font, useNumpy=False))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glyph cache - LRU eviction and invalidation, with OrderedDict and with python 2.6 fallback
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui import glyphcache
+
+################
+# TESTS
+class GlyphCacheTest(unittest.TestCase):
+    ordered = glyphcache.OrderedDict
+
+    def setUp(self):
+        self.original = glyphcache.OrderedDict
+        glyphcache.OrderedDict = self.ordered
+        self.cache = glyphcache.GlyphCache(capacity=30)
+
+    def tearDown(self):
+        glyphcache.OrderedDict = self.original
+
+    def testLeastRecentlyUsedEvicted(self):
+        for name in ("a", "b", "c"): self.cache.put((name, 1), name, 10)
+        self.assertEqual(self.cache.get(("a", 1)), "a") # a becomes newest
+        self.cache.put(("d", 1), "d", 10)
+        self.assertEqual(self.cache.get(("b", 1)), None)
+        self.assertEqual([self.cache.get((name, 1)) for name in ("a", "c", "d")], ["a", "c", "d"])
+        self.assertEqual(self.cache.getStats()["evictions"], 1)
+        self.cache.setCapacity(10)
+        self.assertEqual(list(self.cache.entries), [("d", 1)])
+
+    def testInvalidateDropsEveryKeyOfGlyph(self):
+        self.cache.put((b"\x01", 1), "zoom 1", 5)
+        self.cache.put((b"\x01", 2), "zoom 2", 5)
+        self.cache.put((b"\x02", 1), "other", 5)
+        self.cache.invalidate(bytearray([1]))
+        self.assertEqual(list(self.cache.entries), [(b"\x02", 1)])
+        self.assertEqual(self.cache.getStats()["size"], 5)
+
+    def testManyRefreshes(self):
+        self.cache.setCapacity(1000)
+        for name in range(10): self.cache.put((name,), name, 1)
+        for repeat in range(100):
+            for name in range(10): self.cache.get((name,))
+        self.assertEqual(list(self.cache.entries), [(name,) for name in range(10)])
+
+class InsertionOrderDictTest(GlyphCacheTest):
+    ordered = glyphcache.InsertionOrderDict
+
+    def testStaleOrderIsCompacted(self):
+        entries = glyphcache.InsertionOrderDict()
+        for repeat in range(100): entries["key"] = repeat
+        self.assertEqual(list(entries), ["key"])
+        self.assertEqual(entries["key"], 99)
+        self.assertTrue(len(entries.order) < 20)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Glyph index - duplicate groups kept up to date by writes, near duplicates and deduplication
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.glyphindex import GlyphIndex, hammingDistance
+from lcdfonteditor.ui.dataprocessing.core import DataProcessing
+
+################
+# TESTS
+class GlyphIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.values = bytearray([0, 0, 1, 1, 0, 0, 1, 3, 0]) # 2 bytes per glyph, incomplete last glyph
+        self.index = GlyphIndex()
+        self.index.attach(self.values, 2)
+
+    def testGroups(self):
+        self.assertEqual(self.index.getDuplicateGroups(), [[0, 2]])
+        self.assertEqual(self.index.getGroup(2), [0, 2])
+        self.assertEqual((self.index.getRedundantCount(), self.index.getUniqueCount()), (1, 4))
+
+    def testUpdateGlyphs(self):
+        self.index.ensure()
+        self.values[2:4] = bytearray([0, 0])
+        self.index.updateGlyphs([1])
+        self.assertEqual(self.index.getDuplicateGroups(), [[0, 1, 2]])
+        self.values[0:2] = bytearray([9, 9])
+        self.values[4:6] = bytearray([9, 9])
+        self.index.updateGlyphs([0, 2])
+        self.assertEqual(self.index.getDuplicateGroups(), [[0, 2]])
+        self.index.updateGlyphs([7]) # glyph count changed - rebuilt on next query
+        self.assertTrue(self.index.stale)
+
+    def testNear(self):
+        self.assertEqual(hammingDistance(b"\x01\x03", b"\x00\x00"), 3)
+        self.assertEqual(self.index.findNear(1, 1), [(3, 1)])
+        self.assertEqual(self.index.findNear(1, 2), [(3, 1), (0, 2), (2, 2)]) # nearest first, shorter last glyph never compared
+        self.assertEqual(self.index.findNearGroups(1), [(1, 3, 1)])
+
+    def testDeduplicate(self):
+        values, remap = self.index.deduplicate()
+        self.assertEqual(values, bytearray([0, 0, 1, 1, 1, 3, 0]))
+        self.assertEqual(remap, [0, 1, 0, 2, 3])
+
+class DeduplicateGlyphsTest(unittest.TestCase):
+    def testDataProcessing(self):
+        processing = DataProcessing(None, 0)
+        processing.importData("{\n0x00, 0x01,\n0x02, 0x03,\n0x00, 0x01,\n}")
+        processing.updateGlyph(1, [0x00, 0x01]) # index follows write
+        self.assertEqual(processing.getGlyphIndex().getDuplicateGroups(), [[0, 1, 2]])
+        self.assertEqual(processing.deduplicateGlyphs(), [0, 0, 0])
+        self.assertEqual((processing.getGlyphCount(), list(processing.getFontValues())), (1, [0, 1]))
+        self.assertEqual(processing.deduplicateGlyphs(), None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Undo journal - merging of strokes, undo / redo order and eviction over capacity
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.journal import UndoJournal, STEP_OVERHEAD
+from lcdfonteditor.ui.dataprocessing.core import DataProcessing
+
+################
+# TESTS
+class UndoJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.journal = UndoJournal()
+        self.applied = []
+
+    def apply(self, step, reverse):
+        """Stands for DataProcessing.applyStep, records calls and tries to record during replay"""
+        self.journal.recordValues([0], [1], [2])
+        self.applied.append((step["kind"], reverse))
+        return step
+
+    def testMergeKeepsFirstOldAndLastNew(self):
+        self.journal.recordValues([3, 1], [10, 20], [11, 21], merge="stroke")
+        self.journal.recordValues([1, 5], [21, 50], [22, 51], merge="stroke")
+        self.assertEqual(self.journal.getStats()["undo"], 1)
+        step = self.journal.undoSteps[-1]
+        self.assertEqual((list(step["tokens"]), list(step["old"]), list(step["new"])), ([1, 3, 5], [20, 10, 50], [22, 11, 51]))
+        self.journal.seal()
+        self.journal.recordValues([1], [22], [23], merge="stroke")
+        self.assertEqual(self.journal.getStats()["undo"], 2)
+
+    def testMergeRevertedStrokeDropsStep(self):
+        self.journal.recordValues([4], [0], [1], merge="stroke")
+        self.journal.recordValues([4], [1], [0], merge="stroke")
+        self.assertFalse(self.journal.canUndo())
+        self.assertEqual(self.journal.getStats()["size"], 0)
+
+    def testUndoRedo(self):
+        self.journal.recordValues([0], [0], [1])
+        self.journal.recordColumns("insert", 2, 1)
+        self.assertEqual(self.journal.undo(self.apply)["kind"], "insert")
+        self.assertEqual(self.journal.undo(self.apply)["kind"], "values")
+        self.assertEqual(self.journal.undo(self.apply), None)
+        self.assertEqual(self.journal.redo(self.apply)["kind"], "values")
+        self.assertEqual(self.applied, [("insert", True), ("values", True), ("values", False)])
+        self.assertEqual(self.journal.getStats()["undo"], 1) # replayed changes are not recorded
+        self.journal.recordValues([1], [0], [1])
+        self.assertFalse(self.journal.canRedo())
+
+    def testEviction(self):
+        stepSize = STEP_OVERHEAD + 4 + 2 # one token
+        self.journal.setCapacity(3 * stepSize)
+        for token in range(5): self.journal.recordValues([token], [0], [1])
+        stats = self.journal.getStats()
+        self.assertEqual((stats["undo"], stats["evictions"], stats["size"]), (3, 2, 3 * stepSize))
+        self.assertEqual(self.journal.undoSteps[0]["tokens"][0], 2) # oldest dropped first
+        self.journal.setCapacity(stepSize)
+        self.assertEqual(self.journal.getStats()["undo"], 1)
+
+    def testClear(self):
+        self.journal.recordValues([0], [0], [1])
+        self.journal.undo(self.apply)
+        self.journal.clear()
+        self.assertEqual(self.journal.getStats(), {"undo" : 0, "redo" : 0, "size" : 0, "capacity" : self.journal.capacity, "evictions" : 0})
+
+class DataProcessingUndoTest(unittest.TestCase):
+    def testGlyphEditUndoRedo(self):
+        processing = DataProcessing(None, 0)
+        processing.importData("{\n0x01, 0x02,\n0x03, 0x04,\n}")
+        original = processing.getCompleteString()
+        processing.updateGlyph(1, [0xAA, 0xBB])
+        edited = processing.getCompleteString()
+        self.assertEqual(processing.undo()["glyphs"], [1])
+        self.assertEqual(processing.getCompleteString(), original)
+        processing.redo()
+        self.assertEqual(processing.getCompleteString(), edited)
+        self.assertEqual(list(processing.getFontValues()), [1, 2, 0xAA, 0xBB])
+
+if __name__ == '__main__':
+    unittest.main()
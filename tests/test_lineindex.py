@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Line index - offsets of lines after full builds, region updates and shifts
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.lineindex import LineIndex
+
+################
+# HELPERS
+def lineStarts(text):
+    """Returns list of offsets where lines of text begin"""
+    return [0] + [offset + 1 for offset, char in enumerate(text) if char == "\n"]
+
+################
+# TESTS
+class LineIndexTest(unittest.TestCase):
+    def testQueries(self):
+        index = LineIndex("ab\ncd\n\nef")
+        self.assertEqual(index.getLineCount(), 4)
+        self.assertEqual([index.lineOf(offset) for offset in range(9)], [0, 0, 0, 1, 1, 1, 2, 3, 3])
+        self.assertEqual((index.offsetOf(-1), index.offsetOf(3), index.offsetOf(9)), (0, 7, 9))
+        self.assertEqual(index.lineColumnOf(4), (1, 1))
+        self.assertEqual(LineIndex().getLineCount(), 1)
+
+    def testRegionUpdates(self):
+        rand = random.Random(0)
+        text = "".join([rand.choice("ab\n") for i in range(300)])
+        index = LineIndex(text)
+        for edit in range(300):
+            starts = lineStarts(text)
+            # edit region is made of whole lines, as incremental import rescans them
+            first = rand.randrange(len(starts))
+            last = min(len(starts) - 1, first + rand.randrange(3))
+            regionStart = starts[first]
+            regionEnd = text.find("\n", starts[last])
+            if regionEnd == -1: regionEnd = len(text)
+            regionText = "".join([rand.choice("ab\n") for i in range(rand.randrange(12))])
+            text = text[:regionStart] + regionText + text[regionEnd:]
+            index.update(regionStart, regionEnd, regionText, len(text))
+            self.assertEqual(list(index.lineStarts), lineStarts(text))
+
+    def testShift(self):
+        text = "0x01,\n0x02,\n0x03"
+        index = LineIndex(text)
+        index.shift(7, 3, len(text) + 3) # text without newline inserted inside second line
+        self.assertEqual(list(index.lineStarts), lineStarts(text[:7] + "abc" + text[7:]))
+
+if __name__ == '__main__':
+    unittest.main()
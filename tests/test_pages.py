@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Paged glyphs - pixels, column words and page shifts of fonts higher than 8 pixels
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing import pages, transforms
+
+################
+# TESTS
+class PagesTest(unittest.TestCase):
+    def testPixels(self):
+        data = bytearray(4) # 2 columns of 2 pages
+        pages.setPixel(data, 2, 1, 9, True)
+        self.assertEqual(list(data), [0, 0, 0, 2])
+        self.assertTrue(pages.getPixel(data, 2, 1, 9))
+        pages.togglePixel(data, 2, 0, 0)
+        pages.setPixel(data, 2, 1, 9, False)
+        self.assertEqual(list(data), [1, 0, 0, 0])
+
+    def testColumnWords(self):
+        data = [0x01, 0x80, 0xFF, 0x00, 0x12]
+        self.assertEqual(pages.packColumns(data, 2), [0x8001, 0x00FF]) # incomplete column dropped
+        self.assertEqual(pages.unpackColumns([0x8001, 0x00FF], 2), data[:4])
+
+    def testShiftColumns(self):
+        data = [0x80, 0x01, 0x12] # column bit 7 and bit 8 set, incomplete column
+        self.assertEqual(pages.shiftColumns(data, 2, 1), [0x00, 0x03, 0x12])
+        self.assertEqual(pages.shiftColumns(data, 2, -8), [0x01, 0x00, 0x12])
+        self.assertEqual(pages.shiftColumns(data, 2, 9), [0x00, 0x00, 0x12]) # bits fall out
+
+    def testShiftTransforms(self):
+        rand = random.Random(0)
+        data = bytearray([rand.randrange(256) for i in range(3 * 5 * 4)])
+        for amount in (1, 7, 8, 13, 24):
+            up = transforms.transformGlyphs(data, 5, 3, transforms.SHIFT_UP, amount, useNumpy=False)
+            self.assertEqual(list(up), pages.shiftColumns(data, 3, -amount))
+            if transforms.numpy is not None:
+                self.assertEqual(up, transforms.transformGlyphs(data, 5, 3, transforms.SHIFT_UP, amount, useNumpy=True))
+                self.assertEqual(transforms.transformGlyphs(data, 5, 3, transforms.SHIFT_DOWN, amount, useNumpy=False), transforms.transformGlyphs(data, 5, 3, transforms.SHIFT_DOWN, amount, useNumpy=True))
+
+    def testPagedWidth(self):
+        detection = {"width" : 5, "alternatives" : [{"width" : 7}, {"width" : 10}]}
+        self.assertEqual(pages.pagedWidth(detection, 1), 5)
+        self.assertEqual(pages.pagedWidth(detection, 2), 10) # alternative divisible by pages
+        self.assertEqual(pages.pagedWidth({"width" : 5, "alternatives" : []}, 3), 15) # lines taken as single pages
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Parse worker thread - results and failures reach ui thread, thread survives failed parse
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.parseworker import ParseWorker
+
+################
+# HELPERS
+class FailingWorker(ParseWorker):
+    """Worker whose parse of text "fail" raises"""
+
+    def parse(self, text, generation, selectedArray=0, pages=1, rowBytes=0):
+        if text == "fail": raise ValueError("broken parse")
+        return ParseWorker.parse(self, text, generation, selectedArray, pages, rowBytes)
+
+################
+# TESTS
+class ParseWorkerTest(unittest.TestCase):
+    def setUp(self):
+        self.done = threading.Event()
+        self.results, self.errors = [], []
+        self.worker = FailingWorker(self.post, self.onResult, delay=0.0, onError=self.onError)
+
+    def tearDown(self):
+        self.worker.stop()
+
+    def post(self, function, *args):
+        """Stands for wx.CallAfter - call right in worker thread"""
+        function(*args)
+        self.done.set()
+
+    def onResult(self, generation, text, processing):
+        self.results.append((generation, processing.getGlyphCount()))
+
+    def onError(self, generation, text, message):
+        self.errors.append((generation, message))
+
+    def waitForPost(self):
+        self.done.wait(5.0) # returns None on python 2.6, callbacks are checked by caller
+        self.done.clear()
+
+    def testFailedParseKeepsWorkerAlive(self):
+        generation = self.worker.submit("fail")
+        self.waitForPost()
+        self.assertEqual(len(self.errors), 1)
+        self.assertEqual(self.errors[0][0], generation)
+        self.assertTrue("broken parse" in self.errors[0][1])
+        self.assertFalse(self.worker.isBusy())
+        generation = self.worker.submit("{ 0x01, 0x02,\n0x03, 0x04 }")
+        self.waitForPost()
+        self.assertEqual(self.results, [(generation, 2)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Horizontal data - 8x8 block transposition between row-major and column-major glyphs
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing import rowmajor
+from lcdfonteditor.ui.dataprocessing.pages import getPixel
+from lcdfonteditor.ui.dataprocessing.core import DataProcessing
+
+################
+# TESTS
+class RowMajorTest(unittest.TestCase):
+    def testBlocks(self):
+        rows = bytearray([0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01]) # diagonal
+        self.assertEqual(bytearray(rowmajor.transposeRows(rows)), bytearray([1, 2, 4, 8, 16, 32, 64, 128]))
+        self.assertEqual(bytearray(rowmajor.transposeColumns(rowmajor.transposeRows(rows))), rows)
+        self.assertEqual(bytearray(rowmajor.transposeRows([0xFF])), bytearray([1] * 8)) # top row only
+
+    def testPixelsMatchColumns(self):
+        rand = random.Random(0)
+        for trial in range(20):
+            rowBytes, height, glyphs = rand.randrange(1, 4), rand.randrange(1, 20), rand.randrange(1, 5)
+            data = bytearray([rand.randrange(256) for i in range(rowBytes * height * glyphs)])
+            columns, pages, height = rowmajor.rowGeometry(rowBytes * height, rowBytes)
+            vertical = rowmajor.rowsToColumns(data, rowBytes, height)
+            self.assertEqual(len(vertical), columns * pages * glyphs)
+            for glyph in range(glyphs):
+                rows, cols = data[glyph * rowBytes * height:], vertical[glyph * columns * pages:]
+                for x in range(columns):
+                    for y in range(height): self.assertEqual(rowmajor.getRowPixel(rows, rowBytes, x, y), getPixel(cols, pages, x, y))
+            self.assertEqual(rowmajor.columnsToRows(vertical, columns, pages, rowBytes, height), data) # round trip
+
+    def testIncompleteAndCropped(self):
+        self.assertEqual(rowmajor.rowsToColumns(bytearray([0xFF]), 1, 2), bytearray([1] * 8)) # last glyph padded
+        self.assertEqual(rowmajor.columnsToRows(bytearray([0x01, 0x02, 0x04]), 3, 1), bytearray([0x80, 0x40, 0x20, 0, 0, 0, 0, 0]))
+        self.assertEqual(rowmajor.columnsToRows(bytearray([0x01, 0x02, 0x04]), 3, 1, height=2), bytearray([0x80, 0x40]))
+
+    def testRowPixels(self):
+        data = bytearray(4) # 2 bytes per row, 2 rows
+        rowmajor.setRowPixel(data, 2, 9, 1, True)
+        self.assertEqual(list(data), [0, 0, 0, 0x40])
+        rowmajor.toggleRowPixel(data, 2, 9, 1)
+        self.assertEqual(list(data), [0, 0, 0, 0])
+
+class ConvertLayoutTest(unittest.TestCase):
+    def testRoundTrip(self):
+        processing = DataProcessing(None, 0)
+        processing.importData("{\n0x01, 0x02, 0x04, 0x08, 0x10,\n0xFF, 0x00, 0x81, 0x42, 0x24,\n}")
+        original = bytearray(processing.getFontValues())
+        self.assertTrue(processing.convertLayout(True))
+        self.assertEqual((processing.getFontRowBytes(), processing.getFontByteWidth()), (1, 8))
+        self.assertEqual(list(processing.getFontValues())[:8], [0x80, 0x40, 0x20, 0x10, 0x08, 0, 0, 0])
+        self.assertFalse(processing.insertToRight()) # columns of horizontal data are bits
+        self.assertTrue(processing.convertLayout(False))
+        self.assertEqual(processing.getFontByteWidth(), 8) # box rounded up to whole bytes
+        values = bytearray(processing.getFontValues())
+        self.assertEqual(values[:5] + values[8:13], original)
+
+if __name__ == '__main__':
+    unittest.main()
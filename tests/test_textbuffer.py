@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Block text buffer - random splices compared with plain string
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.textbuffer import TextBuffer
+
+################
+# TESTS
+class TextBufferTest(unittest.TestCase):
+    def testRandomSplices(self):
+        rand = random.Random(0)
+        text = "".join([rand.choice("0x1F, \n") for i in range(500)])
+        buffer = TextBuffer(text, blockSize=16) # small blocks - splices cross blocks and split them
+        for edit in range(500):
+            start = rand.randrange(len(text) + 1)
+            end = min(len(text), start + rand.randrange(40))
+            inserted = "".join([rand.choice("abc\n") for i in range(rand.randrange(50))])
+            buffer.splice(start, end, inserted)
+            text = text[:start] + inserted + text[end:]
+            self.assertEqual(len(buffer), len(text))
+            first = rand.randrange(len(text) + 1)
+            self.assertEqual(buffer.getSlice(first, first + 30), text[first:first + 30])
+            if edit % 50 == 0: self.assertEqual(buffer.getText(), text)
+        self.assertEqual("".join(buffer.chunks()), text)
+        self.assertEqual(buffer.getText(), text)
+
+    def testIndexing(self):
+        buffer = TextBuffer("abcdefgh", blockSize=3)
+        buffer.splice(2, 5, "XY")
+        self.assertEqual((buffer[0], buffer[2], buffer[-1]), ("a", "X", "h"))
+        self.assertEqual((buffer[1:4], buffer[::2]), ("bXY", "aXfh"))
+        self.assertRaises(IndexError, buffer.__getitem__, 7)
+
+    def testEmpty(self):
+        buffer = TextBuffer()
+        self.assertEqual((len(buffer), buffer.getText(), buffer.getSlice(0, 5)), (0, "", ""))
+        buffer.splice(0, 0, "text")
+        self.assertEqual(buffer.getText(), "text")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Tracing - latency buckets of recorded spans
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing.tracing import Tracer, bucketBound
+
+################
+# TESTS
+class TracerTest(unittest.TestCase):
+    def testBuckets(self):
+        tracer = Tracer(enabled=True)
+        for seconds in (0.0, 0.0000005, 0.000001, 0.000003, 0.000004, 0.001):
+            tracer.record("span", seconds)
+        self.assertEqual(tracer.spans["span"]["buckets"], {0 : 2, 1 : 1, 2 : 1, 3 : 1, 10 : 1}) # n: below 2**n us
+        self.assertEqual(bucketBound(10), 1024 / 1000000.0)
+
+    def testHistogram(self):
+        tracer = Tracer(enabled=True)
+        for seconds in (0.001, 0.002, 0.003): tracer.record("span", seconds)
+        span = tracer.getHistogram()["span"]
+        self.assertEqual(span["count"], 3)
+        self.assertAlmostEqual(span["mean"], 0.002)
+        self.assertEqual(span["max"], 0.003)
+        self.assertTrue(span["p50"] <= span["p99"] <= span["max"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Whole font transforms - NumPy path must give same bytes as byte tables
+
+    python -m unittest discover tests
+"""
+
+################
+# IMPORTS
+import os
+import random
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")) # run from source tree without install
+from lcdfonteditor.ui.dataprocessing import transforms
+from lcdfonteditor.ui.dataprocessing.pages import getPixel, setPixel
+
+################
+# HELPERS
+def rotatePixels(data, columns, pages, operation):
+    """Returns bytearray - glyphs rotated pixel by pixel, reference for transforms"""
+    height, stride = 8 * pages, columns * pages
+    result = bytearray(len(data))
+    for first in range(0, len(data), stride):
+        glyph, rotated = data[first:first + stride], bytearray(stride)
+        for x in range(columns):
+            for y in range(height):
+                sourceX, sourceY = transforms.rotationSource(operation, columns, height, x, y)
+                if 0 <= sourceX < columns and 0 <= sourceY < height: setPixel(rotated, pages, x, y, getPixel(glyph, pages, sourceX, sourceY))
+        result[first:first + stride] = rotated
+    return result
+
+################
+# TESTS
+class RotationTest(unittest.TestCase):
+    """Rotations of random glyphs of various columns and pages"""
+
+    def testTablesMatchPixels(self):
+        rand = random.Random(1)
+        for trial in range(30):
+            columns, pages, glyphs = rand.randrange(1, 20), rand.randrange(1, 5), rand.randrange(1, 8)
+            data = bytearray([rand.randrange(256) for i in range(columns * pages * glyphs)])
+            for operation in (transforms.ROTATE_CW, transforms.ROTATE_CCW, transforms.ROTATE_180):
+                self.assertEqual(transforms.transformGlyphs(data, columns, pages, operation, useNumpy=False), rotatePixels(data, columns, pages, operation))
+
+    def testFourQuarterTurns(self):
+        data = bytearray(range(64)) # 2 glyphs of 16 columns by 2 pages - square
+        result = data
+        for turn in range(4): result = transforms.transformGlyphs(result, 16, 2, transforms.ROTATE_CW, useNumpy=False)
+        self.assertEqual(result, data)
+
+    def testNumpyMatchesTables(self):
+        if transforms.numpy is None: return # optional dependency
+        rand = random.Random(0)
+        for trial in range(30):
+            columns, pages, glyphs = rand.randrange(1, 12), rand.randrange(1, 5), rand.randrange(1, 16)
+            data = bytearray([rand.randrange(256) for i in range(columns * pages * glyphs)])
+            for operation in (transforms.ROTATE_CW, transforms.ROTATE_CCW, transforms.ROTATE_180):
+                self.assertEqual(transforms.transformGlyphs(data, columns, pages, operation, useNumpy=True), transforms.transformGlyphs(data, columns, pages, operation, useNumpy=False))
+
+if __name__ == '__main__':
+    unittest.main()